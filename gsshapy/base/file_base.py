@@ -8,11 +8,17 @@
 ********************************************************************************
 """
 
-from io import open as io_open
 import logging
 import os
+import time
 
+from sqlalchemy import inspect
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..lib import instrumentation
+from ..lib.bulk_tools import bulk_insert
+from ..lib.write_tools import open_output
 
 __all__ = ['GsshaPyFileObjectBase']
 
@@ -28,6 +34,14 @@ class GsshaPyFileObjectBase:
     # Error Messages
     COMMIT_ERROR_MESSAGE = 'Ensure the file is not empty and try again.'
 
+    # File objects that can be parsed without a database session (when spatial is False) set this to True, which
+    # allows ProjectFile to parse them in a worker process and attach the result to the session afterwards. Their
+    # _read method must not depend on the replacement parameters, which are not available to the worker.
+    PARALLEL_READ_SAFE = False
+
+    # Rows queued for bulk insert during a bulk read, keyed by class
+    _bulkRows = None
+
     def __init__(self):
         """
         Constructor
@@ -35,7 +49,7 @@ class GsshaPyFileObjectBase:
         self.fileExtension = ''
 
     def read(self, directory, filename, session, spatial=False,
-             spatialReferenceID=4236, replaceParamFile=None, **kwargs):
+             spatialReferenceID=4236, replaceParamFile=None, bulk=False, **kwargs):
         """
         Generic read file into database method.
 
@@ -49,29 +63,32 @@ class GsshaPyFileObjectBase:
                 spatial is True. Defaults to srid 4236.
             replaceParamFile (:class:`gsshapy.orm.ReplaceParamFile`, optional): ReplaceParamFile instance. Use this if
                 the file you are reading contains replacement parameters.
+            bulk (bool, optional): If True, high volume supporting objects (e.g.: time series values) are written to
+                the database with bulk inserts instead of being created as ORM objects. They remain available through
+                the relationships of the file object after the commit. Defaults to False.
         """
 
         # Read parameter derivatives
-        path = os.path.join(directory, filename)
-        filename_split = filename.split('.')
-        name = filename_split[0]
-
-        # Default file extension
-        extension = ''
-
-        if len(filename_split) >= 2:
-            extension = filename_split[-1]
+        path, name, extension = self._readParameters(directory, filename)
 
         if os.path.isfile(path):
             # Add self to session
             session.add(self)
 
+            if bulk:
+                self._bulkRows = dict()
+
             # Read
+            start = time.time()
             self._read(directory, filename, session, path, name, extension,
                        spatial, spatialReferenceID, replaceParamFile, **kwargs)
+            parseTime = time.time() - start
+            objects = self._countReadObjects(session.new)
 
             # Commit to database
+            start = time.time()
             self._commit(session, self.COMMIT_ERROR_MESSAGE)
+            self._emitReadEvent(path, parseTime, objects, time.time() - start)
         else:
             # Rollback the session if the file doesn't exist
             session.rollback()
@@ -79,6 +96,50 @@ class GsshaPyFileObjectBase:
             # Print warning
             log.warning('Could not find file named {0}. File not read.'.format(filename))
 
+    def readDetached(self, directory, filename, spatialReferenceID=4236, bulk=False, **kwargs):
+        """
+        Parse a file into this object without a database connection.
+
+        Only file objects with ``PARALLEL_READ_SAFE`` set to True support this method. The file is parsed using a
+        scratch session that is not bound to a database, so the object and its supporting objects are returned
+        detached. Attach them to a session (e.g.: ``session.add(instance)``) and commit to persist them.
+
+        Args:
+            directory (str): Directory containing the file to be read.
+            filename (str): Name of the file which will be read (e.g.: 'example.gag').
+            spatialReferenceID (int, optional): Integer id of spatial reference system for the model. Defaults to
+                srid 4236.
+            bulk (bool, optional): If True, high volume supporting objects are queued as rows and inserted with bulk
+                inserts when the object is committed. Defaults to False.
+
+        Returns:
+            list: This object followed by its supporting objects in the order they were created or None if the file
+            could not be found.
+        """
+        if not self.PARALLEL_READ_SAFE:
+            raise TypeError('{0} cannot be read without a database session.'.format(type(self).__name__))
+
+        path, name, extension = self._readParameters(directory, filename)
+
+        if not os.path.isfile(path):
+            log.warning('Could not find file named {0}. File not read.'.format(filename))
+            return None
+
+        scratchSession = Session()
+        scratchSession.add(self)
+
+        if bulk:
+            self._bulkRows = dict()
+
+        self._read(directory, filename, scratchSession, path, name, extension,
+                   False, spatialReferenceID, None, **kwargs)
+
+        # Record creation order before the objects are released from the scratch session
+        created = sorted(scratchSession.new, key=lambda obj: inspect(obj).insert_order)
+        scratchSession.expunge_all()
+
+        return created
+
     def write(self, session, directory, name, replaceParamFile=None, **kwargs):
         """
         Write from database back to file.
@@ -91,6 +152,21 @@ class GsshaPyFileObjectBase:
                 the file you are writing contains replacement parameters.
         """
 
+        filePath = self._getWritePath(directory, name)
+
+        with open_output(filePath) as openFile:
+            # Write Lines
+            self._write(session=session,
+                        openFile=openFile,
+                        replaceParamFile=replaceParamFile,
+                        **kwargs)
+
+        self._emitWriteEvent(openFile)
+
+    def _getWritePath(self, directory, name):
+        """
+        Derive the path of the file to be written from the name given to the write method.
+        """
         # Assemble Path to file
         name_split = name.split('.')
         name = name_split[0]
@@ -112,20 +188,31 @@ class GsshaPyFileObjectBase:
         else:
             filename = '{0}.{1}'.format(name, extension)
 
-        filePath = os.path.join(directory, filename)
+        return os.path.join(directory, filename)
 
-        with io_open(filePath, 'w') as openFile:
-            # Write Lines
-            self._write(session=session,
-                        openFile=openFile,
-                        replaceParamFile=replaceParamFile,
-                        **kwargs)
+    def _readParameters(self, directory, filename):
+        """
+        Derive the path, name and extension of the file to be read.
+        """
+        path = os.path.join(directory, filename)
+        filename_split = filename.split('.')
+        name = filename_split[0]
+
+        # Default file extension
+        extension = ''
+
+        if len(filename_split) >= 2:
+            extension = filename_split[-1]
+
+        return path, name, extension
 
     def _commit(self, session, errorMessage):
         """
         Custom commit function for file objects
         """
         try:
+            if self._bulkRows:
+                self._insertBulkRows(session)
             session.commit()
         except IntegrityError:
             # Raise special error if the commit fails due to empty files
@@ -134,6 +221,59 @@ class GsshaPyFileObjectBase:
             # Raise other errors as normal
             raise
 
+    def _countReadObjects(self, objects):
+        """
+        Count the objects created by a read, including the rows queued for bulk insert.
+        """
+        return len(objects) + sum(len(rows) for rows in (self._bulkRows or {}).values())
+
+    def _emitReadEvent(self, path, parseTime, objects, commitTime):
+        """
+        Send an instrumentation event for a file that was read.
+        """
+        if instrumentation.is_enabled():
+            instrumentation.emit(**{'operation': 'read',
+                                    'class': type(self).__name__,
+                                    'path': os.path.abspath(path),
+                                    'bytes': os.path.getsize(path),
+                                    'parse_time': parseTime,
+                                    'objects': objects,
+                                    'commit_time': commitTime})
+
+    def _emitWriteEvent(self, openFile):
+        """
+        Send an instrumentation event for a file that was written with ``open_output``.
+        """
+        if instrumentation.is_enabled():
+            instrumentation.emit(**{'operation': 'write',
+                                    'class': type(self).__name__,
+                                    'path': os.path.abspath(openFile.name),
+                                    'bytes': openFile.bytes_written,
+                                    'write_time': openFile.elapsed})
+
+    def _addBulkRow(self, fileIO, **values):
+        """
+        Queue a row for bulk insert into the table of the given class. Foreign key values may be given as the parent
+        objects, which are replaced with their ids when the rows are inserted.
+        """
+        self._bulkRows.setdefault(fileIO, []).append(values)
+
+    def _insertBulkRows(self, session):
+        """
+        Insert the rows queued during a bulk read. The session is flushed first to assign ids to the parent objects.
+        """
+        session.flush()
+
+        for fileIO, rows in self._bulkRows.items():
+            for row in rows:
+                for key, value in row.items():
+                    if hasattr(value, '_sa_instance_state'):
+                        row[key] = value.id
+
+            bulk_insert(session, fileIO.__table__, rows)
+
+        self._bulkRows = None
+
     def _read(self, directory, filename, session, path, name, extension, spatial, spatialReferenceID, replaceParamFile):
         """
         Private file object read method. Classes that inherit from this base class must implement this method.
@@ -8,12 +8,22 @@
 ********************************************************************************
 """
 
+import json
+import math
 import os
-from zipfile import ZipFile
+
+import numpy as np
+from sqlalchemy import event
 
 from mapkit.ColorRampGenerator import ColorRampEnum
 from mapkit.RasterConverter import RasterConverter
 
+from ..lib.grass_ascii import parse_grass_ascii, parse_header, read_header, format_grass_ascii, iter_grass_ascii, \
+    geotransform_to_header, build_row_index, read_window, slice_window
+from ..lib.raster_cache import load_raster_array
+from ..lib.raster_render import render_rgba, encode_png, warp_to_lat_lon, get_kml_ground_overlay, get_kml_grid, \
+    get_kml_clusters, write_kmz
+
 __all__ = ['RasterObjectBase']
 
 class RasterObjectBase:
@@ -29,13 +39,338 @@ class RasterObjectBase:
     raster = None              # Raster column
     defaultNoDataValue = 0     # Set the default no data value
     discreet = False           # Whether rasters typically have discreet values or not
+    rasterPath = None          # Path to the file with the raster text when it is not stored in the database
+    arrayDataType = 'float32'  # NumPy data type of the array returned by as_array
+    _rasterArray = None        # Cached (source, array, geotransform) of as_array
+    _rowIndex = None           # Cached (source, row index) of read_window
+    _rasterFileText = None     # Cached (source, text) of the text read on demand from rasterPath
+    _pendingArray = None       # (array, geotransform, precision) of from_array until the text is formatted
+    WRITE_CHUNK_CELLS = 65536  # Number of cells formatted at a time when the text is streamed from the array
+    statMinimum = None         # Statistics columns filled by getStatistics
+    statMaximum = None
+    statMean = None
+    statStandardDeviation = None
+    statHistogram = None
+
+    def _getRasterText(self):
+        """
+        Getter for the rasterText synonym. If the text is not stored in the database, it is read on demand from the file
+        referenced by rasterPath. The text read from the file is cached until the size or modification time of the file
+        changes, so consumers that access it repeatedly (e.g.: the writers) don't read the whole file each time. If the
+        raster was replaced with from_array, the text is formatted from the array on first access.
+        """
+        self._formatPendingArray()
+
+        if self._rasterText is None and self.rasterPath is not None:
+            source = self._getRasterArraySource()
+
+            if self._rasterFileText is None or source is None or self._rasterFileText[0] != source:
+                with open(self.rasterPath, 'r') as f:
+                    self._rasterFileText = (source, f.read())
+
+            return self._rasterFileText[1]
+
+        return self._rasterText
+
+    def _setRasterText(self, rasterText):
+        """
+        Setter for the rasterText synonym.
+        """
+        self._rasterText = rasterText
+        self._pendingArray = None
+        self._rasterArray = None
+        self._rasterFileText = None
+        self._clearStatistics()
+
+    def _loadRasterHeader(self, path, readRasterText=True):
+        """
+        Read the text of a GRASS ASCII raster file and fill the extent columns from its header. If readRasterText is
+        False, only the header is read and a reference to the file is stored, so the text is read when it is accessed.
+        """
+        if readRasterText:
+            # Open file and read plain text
+            with open(path, 'r') as f:
+                rasterText = f.read()
+
+            self.rasterText = rasterText
+            header, _ = parse_header(rasterText.split('\n', 16)[:16])
+        else:
+            self._pendingArray = None
+            self.rasterPath = os.path.abspath(path)
+            header = read_header(path)
+
+        # Retrieve metadata from header
+        self.north = header.get('north')
+        self.south = header.get('south')
+        self.east = header.get('east')
+        self.west = header.get('west')
+        self.rows = header.get('rows')
+        self.columns = header.get('cols')
+
+    def as_array(self):
+        """
+        Retrieve the raster values as a NumPy array parsed from the GRASS ASCII text of the raster. The array is cached
+        until the text changes. This does not require the PostGIS raster. If the text is read on demand from the raster
+        file (see rasterPath) and the raster cache is enabled (see ``gsshapy.lib.raster_cache``), the array is
+        memory-mapped from the cache instead of parsed.
+
+        Returns:
+            tuple: Array with shape (rows, columns) and the data type given by arrayDataType and the GDAL-style
+            geotransform (west, cell width, 0, north, 0, -cell height) of the raster. None if the raster has no text.
+        """
+        if self._pendingArray is not None:
+            return self._pendingArray[0], self._pendingArray[1]
+
+        source = self._getRasterArraySource()
+
+        if source is None:
+            return None
+
+        if self._rasterArray is None or self._rasterArray[0] != source:
+            if isinstance(source, tuple):
+                array, geotransform = load_raster_array(self.rasterPath, dtype=self.arrayDataType)
+            else:
+                array, geotransform = parse_grass_ascii(self.rasterText, dtype=self.arrayDataType)
+
+            # Prevent changes to the array from going unnoticed in the cached copy
+            array.flags.writeable = False
+            self._rasterArray = (source, array, geotransform)
+
+        return self._rasterArray[1], self._rasterArray[2]
+
+    def from_array(self, array, geotransform, precision=None, noDataValue=None):
+        """
+        Replace the raster with the values of a NumPy array. The GRASS ASCII text and the extent of the raster are
+        updated. The PostGIS raster is cleared, so that the new values are written to file without querying the
+        database. The array is kept and the text is only formatted when it is accessed or flushed to the database, so
+        writing the map before the session is flushed streams the text from the array in chunks.
+
+        Args:
+            array (:class:`numpy.ndarray`): Two dimensional array of the raster values. It is cast to arrayDataType.
+            geotransform (tuple): GDAL-style geotransform (west, cell width, 0, north, 0, -cell height) of the raster.
+            precision (int, optional): Number of decimal places written for floating point values. Defaults to the
+                number of significant digits that reproduce the values exactly.
+            noDataValue (float, optional): Value that replaces masked, NaN and infinite values. Defaults to
+                defaultNoDataValue.
+        """
+        if noDataValue is None:
+            noDataValue = self.defaultNoDataValue
+
+        array = np.ma.filled(np.ma.masked_invalid(array), noDataValue).astype(self.arrayDataType)
+        rows, columns = array.shape
+        header = geotransform_to_header(geotransform, rows, columns)
+
+        geotransform = tuple(geotransform)
+
+        if hasattr(type(self), '_rasterText'):
+            # Only classes with the rasterText synonym format the text on demand
+            self._setRasterText(None)
+            array.flags.writeable = False
+            self._pendingArray = (array, geotransform, precision)
+        else:
+            self.rasterText = format_grass_ascii(array, geotransform, precision=precision)
+            array.flags.writeable = False
+            self._rasterArray = (self._getRasterArraySource(), array, geotransform)
+
+        self.rasterPath = None
+        self.raster = None
+        self.north = header['north']
+        self.south = header['south']
+        self.east = header['east']
+        self.west = header['west']
+        self.rows = rows
+        self.columns = columns
+
+    def _formatPendingArray(self):
+        """
+        Format the array given to from_array as the text of the raster. The array stays cached for as_array.
+        """
+        if self._pendingArray is not None:
+            array, geotransform, precision = self._pendingArray
+            self._pendingArray = None
+            self._rasterText = format_grass_ascii(array, geotransform, precision=precision)
+            self._rasterArray = (self._rasterText, array, geotransform)
+
+    def _iterRasterText(self):
+        """
+        Chunks of the text of the raster for the writers or None if the raster has no text. If the raster was replaced
+        with from_array and the text was not formatted yet, it is formatted from the array in chunks of rows, so the
+        whole text is never built in memory.
+        """
+        if self._pendingArray is not None:
+            array, geotransform, precision = self._pendingArray
+            chunkSize = max(1, self.WRITE_CHUNK_CELLS // max(1, array.shape[1]))
+            return iter_grass_ascii(array, geotransform, precision=precision, chunkSize=chunkSize)
+
+        rasterText = self.rasterText
+
+        if rasterText is not None:
+            return [rasterText]
+
+    def read_window(self, rowOff, colOff, nrows, ncols, useRowIndex=True):
+        """
+        Retrieve a window of the raster values as a NumPy array, e.g.: the cells around the outlet or the bounding box of
+        a sub-catchment. If the text is read on demand from the raster file (see rasterPath), only the rows of the
+        window are read, even if the whole array was already retrieved with ``as_array``, so memory use scales with the
+        size of the window instead of the size of the map. Otherwise, the window is sliced from the array returned by
+        ``as_array``.
+
+        Args:
+            rowOff (int): Index of the first row of the window, counted from the north.
+            colOff (int): Index of the first column of the window, counted from the west.
+            nrows (int): Number of rows of the window.
+            ncols (int): Number of columns of the window.
+            useRowIndex (bool, optional): If True, the byte offsets of the rows of the raster file are indexed on the
+                first read, so later reads seek directly to the window. If False, the rows before the window are
+                scanned on every read. Defaults to True.
+
+        Returns:
+            tuple: Array with shape (nrows, ncols) and the data type given by arrayDataType and the GDAL-style
+            geotransform of the window. None if the raster has no text.
+        """
+        source = self._pendingArray or self._getRasterArraySource()
+
+        if source is None:
+            return None
+
+        if self._pendingArray is None and isinstance(source, tuple):
+            rowIndex = None
+
+            if useRowIndex:
+                if self._rowIndex is None or self._rowIndex[0] != source:
+                    self._rowIndex = (source, build_row_index(self.rasterPath))
+                rowIndex = self._rowIndex[1]
+
+            return read_window(self.rasterPath, rowOff, colOff, nrows, ncols, dtype=self.arrayDataType,
+                               rowIndex=rowIndex)
+
+        array, geotransform = self.as_array()
+
+        return slice_window(array, geotransform, rowOff, colOff, nrows, ncols)
+
+    def getStatistics(self, bins=10, noDataValue=None):
+        """
+        Retrieve the minimum, maximum, mean, standard deviation and histogram of the raster values. The statistics are
+        computed from the array returned by ``as_array`` and stored in the statistics columns, so later calls with the
+        same arguments don't read the raster. They are cleared when the raster text changes.
+
+        Args:
+            bins (int, optional): Number of equal width bins of the histogram. Defaults to 10.
+            noDataValue (float, optional): Cells with this value are excluded. Defaults to None (all cells with finite
+                values are included).
+
+        Returns:
+            dict: Dictionary with keys 'minimum', 'maximum', 'mean', 'std', 'count' and 'histogram' (a dictionary with
+            the 'counts' and bin 'edges') or None if the raster has no text.
+        """
+        statistics = self._getStoredStatistics(checkSource=True)
+
+        if statistics is not None and statistics['bins'] == bins and statistics['noDataValue'] == noDataValue:
+            return statistics
+
+        arrayAndGeotransform = self.as_array()
+
+        if arrayAndGeotransform is None:
+            return None
+
+        values = arrayAndGeotransform[0].ravel()
+
+        if values.dtype.kind == 'f':
+            values = values[np.isfinite(values)]
+
+        if noDataValue is not None:
+            values = values[values != noDataValue]
+
+        if values.size:
+            # Accumulate in double precision to avoid round off in large single precision maps
+            values = values.astype(np.float64)
+            counts, edges = np.histogram(values, bins=bins)
+            minimum, maximum = float(values.min()), float(values.max())
+            mean, std = float(values.mean()), float(values.std())
+        else:
+            counts, edges = np.zeros(bins, dtype=np.int64), np.zeros(bins + 1)
+            minimum = maximum = mean = std = None
+
+        self.statMinimum = minimum
+        self.statMaximum = maximum
+        self.statMean = mean
+        self.statStandardDeviation = std
+        self.statHistogram = json.dumps({'count': int(values.size),
+                                         'counts': counts.tolist(),
+                                         'edges': edges.tolist(),
+                                         'bins': bins,
+                                         'noDataValue': noDataValue,
+                                         'source': self._getStatisticsSource()})
+
+        return self._getStoredStatistics()
+
+    def _getStoredStatistics(self, checkSource=False):
+        """
+        Statistics stored in the statistics columns or None if they were not computed. If checkSource is True, None is
+        also returned when the file the raster text is read from changed since they were computed.
+        """
+        if self.statHistogram is None:
+            return None
+
+        histogram = json.loads(self.statHistogram)
+
+        if checkSource and histogram['source'] != self._getStatisticsSource():
+            return None
+
+        return {'minimum': self.statMinimum,
+                'maximum': self.statMaximum,
+                'mean': self.statMean,
+                'std': self.statStandardDeviation,
+                'count': histogram['count'],
+                'histogram': {'counts': histogram['counts'], 'edges': histogram['edges']},
+                'bins': histogram['bins'],
+                'noDataValue': histogram['noDataValue'],
+                'source': histogram['source']}
+
+    def _getStatisticsSource(self):
+        """
+        Size and modification time of the file the raster text is read from on demand or None if the text is stored.
+        """
+        if self.rasterPath is not None:
+            source = self._getRasterArraySource()
+
+            if isinstance(source, tuple):
+                return [source[1], source[2]]
+
+    def _clearStatistics(self):
+        """
+        Clear the statistics columns when the raster changes.
+        """
+        if self.statHistogram is not None:
+            self.statMinimum = None
+            self.statMaximum = None
+            self.statMean = None
+            self.statStandardDeviation = None
+            self.statHistogram = None
+
+    def _getRasterArraySource(self):
+        """
+        Identify the current raster text for the array cache: the text itself or the size and modification time of the
+        file it is read from on demand.
+        """
+        if self.rasterPath is not None and self._rasterText is None:
+            try:
+                stat = os.stat(self.rasterPath)
+            except OSError:
+                return None
+            return self.rasterPath, stat.st_size, stat.st_mtime
+
+        return self.rasterText
 
     def getAsKmlGrid(self, session, path=None, documentName=None, colorRamp=ColorRampEnum.COLOR_RAMP_HUE, alpha=1.0,
-                     noDataValue=None):
+                     noDataValue=None, srid=None):
         """
         Retrieve the raster as a KML document with each cell of the raster represented as a vector polygon. The result
         is a vector grid of raster cells. Cells with the no data value are excluded.
 
+        If the raster is not stored in a PostGIS database, the polygons are created from the array of the raster (see
+        ``as_array``) instead and their corners are transformed to WGS 84.
+
         Args:
             session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
             path (str, optional): Path to file where KML file will be written. Defaults to None.
@@ -50,22 +385,24 @@ class RasterObjectBase:
                 opaque and 0.0 is 100% transparent. Defaults to 1.0.
             noDataValue (float, optional): The value to treat as no data when generating visualizations of rasters.
                 Defaults to 0.0.
+            srid (int, optional): Spatial reference id of the raster used when rendering without PostGIS. Defaults to
+                the srid of the raster or of its project file.
 
         Returns:
             str: KML string
         """
-        if type(self.raster) != type(None):
-            # Set Document Name
-            if documentName is None:
-                try:
-                    documentName = self.filename
-                except AttributeError:
-                    documentName = 'default'
+        # Set Document Name
+        if documentName is None:
+            try:
+                documentName = self.filename
+            except AttributeError:
+                documentName = 'default'
 
-            # Set no data value to default
-            if noDataValue is None:
-                noDataValue = self.defaultNoDataValue
+        # Set no data value to default
+        if noDataValue is None:
+            noDataValue = self.defaultNoDataValue
 
+        if type(self.raster) != type(None):
             # Make sure the raster field is valid
             converter = RasterConverter(sqlAlchemyEngineOrSession=session)
 
@@ -83,19 +420,31 @@ class RasterObjectBase:
                                                alpha=alpha,
                                                noDataValue=noDataValue,
                                                discreet=self.discreet)
+        else:
+            rasterArray = self.as_array()
 
-            if path:
-                with open(path, 'w') as f:
-                    f.write(kmlString)
+            if rasterArray is None:
+                return None
 
-            return kmlString
+            kmlString = get_kml_grid(rasterArray[0], rasterArray[1], self._getRenderSrid(srid), documentName,
+                                     colorRamp=colorRamp, alpha=alpha, noDataValue=noDataValue, discreet=self.discreet)
+
+        if path:
+            with open(path, 'w') as f:
+                f.write(kmlString)
+
+        return kmlString
 
     def getAsKmlClusters(self, session, path=None, documentName=None, colorRamp=ColorRampEnum.COLOR_RAMP_HUE, alpha=1.0,
-                         noDataValue=None):
+                         noDataValue=None, srid=None):
         """
         Retrieve the raster as a KML document with adjacent cells with the same value aggregated into vector polygons.
         The result is a vector representation cells clustered together. Cells with the no data value are excluded.
 
+        If the raster is not stored in a PostGIS database, the clusters are traced from the array of the raster (see
+        ``as_array``) instead. Cells are clustered with the cells they share a side with, and their outlines are
+        transformed to WGS 84.
+
         Args:
             session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
             path (str, optional): Path to file where KML file will be written. Defaults to None.
@@ -110,22 +459,24 @@ class RasterObjectBase:
                 opaque and 0.0 is 100% transparent. Defaults to 1.0.
             noDataValue (float, optional): The value to treat as no data when generating visualizations of rasters.
                 Defaults to 0.0.
+            srid (int, optional): Spatial reference id of the raster used when rendering without PostGIS. Defaults to
+                the srid of the raster or of its project file.
 
         Returns:
             str: KML string
         """
-        if type(self.raster) != type(None):
-            # Set Document Name
-            if documentName is None:
-                try:
-                    documentName = self.filename
-                except AttributeError:
-                    documentName = 'default'
+        # Set Document Name
+        if documentName is None:
+            try:
+                documentName = self.filename
+            except AttributeError:
+                documentName = 'default'
 
-            # Set no data value to default
-            if noDataValue is None:
-                noDataValue = self.defaultNoDataValue
+        # Set no data value to default
+        if noDataValue is None:
+            noDataValue = self.defaultNoDataValue
 
+        if type(self.raster) != type(None):
             # Make sure the raster field is valid
             converter = RasterConverter(sqlAlchemyEngineOrSession=session)
 
@@ -143,19 +494,32 @@ class RasterObjectBase:
                                                    alpha=alpha,
                                                    noDataValue=noDataValue,
                                                    discreet=self.discreet)
+        else:
+            rasterArray = self.as_array()
+
+            if rasterArray is None:
+                return None
+
+            kmlString = get_kml_clusters(rasterArray[0], rasterArray[1], self._getRenderSrid(srid), documentName,
+                                         colorRamp=colorRamp, alpha=alpha, noDataValue=noDataValue, discreet=self.discreet)
 
-            if path:
-                with open(path, 'w') as f:
-                    f.write(kmlString)
+        if path:
+            with open(path, 'w') as f:
+                f.write(kmlString)
 
-            return kmlString
+        return kmlString
 
     def getAsKmlPng(self, session, path=None, documentName=None, colorRamp=ColorRampEnum.COLOR_RAMP_HUE, alpha=1.0,
-                    noDataValue=None, drawOrder=0, cellSize=None, resampleMethod='NearestNeighbour'):
+                    noDataValue=None, drawOrder=0, cellSize=None, resampleMethod='NearestNeighbour', srid=None):
         """
         Retrieve the raster as a PNG image ground overlay KML format. Coarse grid resolutions must be resampled to
         smaller cell/pixel sizes to avoid a "fuzzy" look. Cells with the no data value are excluded.
 
+        If the raster is not stored in a PostGIS database, the image is rendered from the array of the raster (see
+        ``as_array``) instead. In that case, resampling is always done with the nearest neighbour method by repeating
+        each cell. Images of projected rasters are warped to WGS 84 (nearest neighbour) and cover the bounding box of
+        the raster in WGS 84.
+
         Args:
             session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
             path (str, optional): Path to file where KML file will be written. Defaults to None.
@@ -179,22 +543,24 @@ class RasterObjectBase:
             resampleMethod (str, optional): If cellSize is set, this method will be used to resample the raster. Valid
                 values include: NearestNeighbour, Bilinear, Cubic, CubicSpline, and Lanczos. Defaults to
                 NearestNeighbour.
+            srid (int, optional): Spatial reference id of the raster used when rendering without PostGIS. Defaults to
+                the srid of the raster or of its project file.
 
         Returns:
             (str, list): Returns a KML string and a list of binary strings that are the PNG images.
         """
-        if type(self.raster) != type(None):
-            # Set Document Name
-            if documentName is None:
-                try:
-                    documentName = self.filename
-                except AttributeError:
-                    documentName = 'default'
+        # Set Document Name
+        if documentName is None:
+            try:
+                documentName = self.filename
+            except AttributeError:
+                documentName = 'default'
 
-            # Set no data value to default
-            if noDataValue is None:
-                noDataValue = self.defaultNoDataValue
+        # Set no data value to default
+        if noDataValue is None:
+            noDataValue = self.defaultNoDataValue
 
+        if type(self.raster) != type(None):
             # Make sure the raster field is valid
             converter = RasterConverter(sqlAlchemyEngineOrSession=session)
 
@@ -215,16 +581,68 @@ class RasterObjectBase:
                                                                cellSize=cellSize,
                                                                resampleMethod=resampleMethod,
                                                                discreet=self.discreet)
-            if path:
-                directory = os.path.dirname(path)
-                archiveName = (os.path.split(path)[1]).split('.')[0]
-                kmzPath = os.path.join(directory, (archiveName + '.kmz'))
+        else:
+            kmlString, binaryPngString = self._renderKmlPng(documentName=documentName,
+                                                            colorRamp=colorRamp,
+                                                            alpha=alpha,
+                                                            noDataValue=noDataValue,
+                                                            drawOrder=drawOrder,
+                                                            cellSize=cellSize,
+                                                            srid=srid)
+
+            if kmlString is None:
+                return None
+
+        if path:
+            directory = os.path.dirname(path)
+            archiveName = (os.path.split(path)[1]).split('.')[0]
+            kmzPath = os.path.join(directory, (archiveName + '.kmz'))
+            write_kmz(kmzPath, kmlString, binaryPngString, archiveName)
+
+        return kmlString, binaryPngString
+
+    def _renderKmlPng(self, documentName, colorRamp, alpha, noDataValue, drawOrder, cellSize, srid):
+        """
+        Render the array of the raster as a PNG image ground overlay without PostGIS.
+        """
+        rasterArray = self.as_array()
+
+        if rasterArray is None:
+            return None, None
+
+        array, geotransform = rasterArray
 
-                with ZipFile(kmzPath, 'w') as kmz:
-                    kmz.writestr(archiveName + '.kml', kmlString)
-                    kmz.writestr('raster.png', binaryPngString)
+        # Nearest neighbour resampling to a smaller cell size repeats each cell
+        scale = 1
+        if cellSize:
+            scale = max(int(math.ceil(abs(geotransform[1]) / float(cellSize))), 1)
 
-            return kmlString, binaryPngString
+        rgba = render_rgba(array, colorRamp=colorRamp, alpha=alpha, noDataValue=noDataValue, discreet=self.discreet,
+                           scale=scale)
+
+        srid = self._getRenderSrid(srid)
+
+        # Projected images are warped to longitude and latitude, so they line up with the bounds of the overlay
+        west, cellWidth, _, north, _, cellHeight = geotransform
+        rgba, (north, south, east, west) = warp_to_lat_lon(rgba, (west, cellWidth / scale, 0, north, 0,
+                                                                  cellHeight / scale), srid)
+
+        kmlString = get_kml_ground_overlay(documentName, north, south, east, west, drawOrder=drawOrder)
+
+        return kmlString, encode_png(rgba)
+
+    def _getRenderSrid(self, srid=None):
+        """
+        Spatial reference id used to render the raster without PostGIS: the given srid, the srid of the raster or the
+        srid of its project file.
+        """
+        if srid is None:
+            srid = getattr(self, 'srid', None)
+
+        if srid is None and getattr(self, 'projectFile', None) is not None:
+            srid = self.projectFile.srid
+
+        return srid
 
     def getAsGrassAsciiGrid(self, session):
         """
@@ -243,4 +661,13 @@ class RasterObjectBase:
             return converter.getAsGrassAsciiRaster(tableName=self.tableName,
                                                    rasterIdFieldName='id',
                                                    rasterId=self.id,
-                                                   rasterFieldName=self.rasterColumnName)
\ No newline at end of file
+                                                   rasterFieldName=self.rasterColumnName)
+
+
+@event.listens_for(RasterObjectBase, 'before_insert', propagate=True)
+@event.listens_for(RasterObjectBase, 'before_update', propagate=True)
+def _formatPendingArrayOnFlush(mapper, connection, target):
+    """
+    Format the text of rasters replaced with from_array before they are stored in the database.
+    """
+    target._formatPendingArray()
@@ -0,0 +1,78 @@
+"""
+Bulk Insert Functions
+"""
+from __future__ import unicode_literals
+
+from builtins import str
+from datetime import datetime
+from io import StringIO
+import logging
+
+__all__ = ['bulk_insert']
+
+log = logging.getLogger(__name__)
+
+
+def bulk_insert(session, table, rows):
+    """
+    Insert many rows into a table without creating ORM objects.
+
+    The rows are inserted with a single Core executemany statement. On PostgreSQL databases connected through psycopg2,
+    the rows are streamed into the table using COPY instead.
+
+    Args:
+        session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to a database.
+        table (:class:`sqlalchemy.Table`): Table the rows will be inserted into (e.g.: ``TimeSeriesValue.__table__``).
+        rows (list): List of dictionaries mapping column names to values. All rows must have the same keys.
+    """
+    if not rows:
+        return
+
+    connection = session.connection()
+
+    if connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2':
+        _copy_rows(connection, table, rows)
+    else:
+        connection.execute(table.insert(), rows)
+
+    log.debug('Bulk inserted {0} rows into {1}'.format(len(rows), table.name))
+
+
+def _copy_rows(connection, table, rows):
+    """
+    Insert rows into a PostgreSQL table using COPY.
+    """
+    columns = list(rows[0].keys())
+    preparer = connection.dialect.identifier_preparer
+
+    statement = 'COPY {0} ({1}) FROM STDIN'.format(preparer.format_table(table),
+                                                   ', '.join(preparer.quote(column) for column in columns))
+
+    buf = StringIO()
+    for row in rows:
+        buf.write('\t'.join(_copy_value(row[column]) for column in columns))
+        buf.write('\n')
+    buf.seek(0)
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(statement, buf)
+    finally:
+        cursor.close()
+
+
+def _copy_value(value):
+    """
+    Format a value for the PostgreSQL COPY text format.
+    """
+    if value is None:
+        return '\\N'
+
+    if isinstance(value, datetime):
+        return value.isoformat(str(' '))
+
+    if isinstance(value, float):
+        # repr keeps all significant digits (str rounds to 12 on Python 2)
+        return str(repr(float(value)))
+
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
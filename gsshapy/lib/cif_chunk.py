@@ -7,7 +7,6 @@
 * License: BSD 2-Clause
 ********************************************************************************
 """
-from future.utils import iteritems
 
 from . import parsetools as pt
 
@@ -105,55 +104,51 @@ def structureLink(lines):
                          'numstructs': None},
               'structures':[]}
 
-    chunks = pt.chunk(KEYWORDS, lines)
-
     # Parse chunks associated with each key
-    for key, chunkList in iteritems(chunks):
-        # Parse each chunk in the chunk list
-        for chunk in chunkList:
+    for key, chunk in pt.chunkIter(KEYWORDS, lines):
+        # Cases
+        if key == 'STRUCTTYPE':
+            # Structure handler
+            structType = chunk[0].strip().split()[1]
+
             # Cases
-            if key == 'STRUCTTYPE':
-                # Structure handler
-                structType = chunk[0].strip().split()[1]
-
-                # Cases
-                if structType in WEIRS:
-
-                    weirResult = {'structtype': None,
-                                  'crest_length': None,
-                                  'crest_low_elev': None,
-                                  'discharge_coeff_forward': None,
-                                  'discharge_coeff_reverse': None,
-                                  'crest_low_loc': None,
-                                  'steep_slope': None,
-                                  'shallow_slope': None}
-
-                    # Weir type structures handler
-                    result['structures'].append(structureChunk(WEIR_KEYWORDS, weirResult, chunk))
-
-                elif structType in CULVERTS:
-
-                    culvertResult = {'structtype': None,
-                                     'upinvert': None,
-                                     'downinvert': None,
-                                     'inlet_disch_coeff': None,
-                                     'rev_flow_disch_coeff': None,
-                                     'slope': None,
-                                     'length': None,
-                                     'rough_coeff': None,
-                                     'diameter': None,
-                                     'width': None,
-                                     'height': None}
-
-                    # Culvert type structures handler
-                    result['structures'].append(structureChunk(CULVERT_KEYWORDS, culvertResult, chunk))
-
-                elif structType in CURVES:
-                    # Curve type handler
-                    pass
-            elif key != 'STRUCTURE':
-                # All other variables header
-                result['header'][key.lower()] = chunk[0].strip().split()[1]
+            if structType in WEIRS:
+
+                weirResult = {'structtype': None,
+                              'crest_length': None,
+                              'crest_low_elev': None,
+                              'discharge_coeff_forward': None,
+                              'discharge_coeff_reverse': None,
+                              'crest_low_loc': None,
+                              'steep_slope': None,
+                              'shallow_slope': None}
+
+                # Weir type structures handler
+                result['structures'].append(structureChunk(WEIR_KEYWORDS, weirResult, chunk))
+
+            elif structType in CULVERTS:
+
+                culvertResult = {'structtype': None,
+                                 'upinvert': None,
+                                 'downinvert': None,
+                                 'inlet_disch_coeff': None,
+                                 'rev_flow_disch_coeff': None,
+                                 'slope': None,
+                                 'length': None,
+                                 'rough_coeff': None,
+                                 'diameter': None,
+                                 'width': None,
+                                 'height': None}
+
+                # Culvert type structures handler
+                result['structures'].append(structureChunk(CULVERT_KEYWORDS, culvertResult, chunk))
+
+            elif structType in CURVES:
+                # Curve type handler
+                pass
+        elif key != 'STRUCTURE':
+            # All other variables header
+            result['header'][key.lower()] = chunk[0].strip().split()[1]
 
     return result
 
@@ -239,36 +234,32 @@ def xSectionLink(lines):
                 'xSection': None,
                 'nodes': []}
 
-    chunks = pt.chunk(KEYWORDS, lines)
-
     # Parse chunks associated with each key
-    for key, chunkList in iteritems(chunks):
-        # Parse each chunk in the chunk list
-        for chunk in chunkList:
-            # Cases
-            if key == 'NODE':
-                # Extract node x and y
-                result['nodes'].append(nodeChunk(chunk))
+    for key, chunk in pt.chunkIter(KEYWORDS, lines):
+        # Cases
+        if key == 'NODE':
+            # Extract node x and y
+            result['nodes'].append(nodeChunk(chunk))
 
-            elif key == 'XSEC':
-                # Extract cross section information
-                result['xSection'] = xSectionChunk(chunk)
+        elif key == 'XSEC':
+            # Extract cross section information
+            result['xSection'] = xSectionChunk(chunk)
 
-            elif ('TRAPEZOID' in key) or ('BREAKPOINT' in key) or ('TRAP' in key):
-                # Cross section type handler
-                result['header']['xSecType'] = key
+        elif ('TRAPEZOID' in key) or ('BREAKPOINT' in key) or ('TRAP' in key):
+            # Cross section type handler
+            result['header']['xSecType'] = key
 
-            elif key in ERODE:
-                # Erode handler
-                result['header']['erode'] = True
+        elif key in ERODE:
+            # Erode handler
+            result['header']['erode'] = True
 
-            elif key in SUBSURFACE:
-                # Subsurface handler
-                result['header']['subsurface'] = True
+        elif key in SUBSURFACE:
+            # Subsurface handler
+            result['header']['subsurface'] = True
 
-            else:
-                # Extract all other variables into header
-                result['header'][key.lower()] = chunk[0].strip().split()[1]
+        else:
+            # Extract all other variables into header
+            result['header'][key.lower()] = chunk[0].strip().split()[1]
 
     return result
 
@@ -305,40 +296,36 @@ def reservoirLink(lines):
             'j': None}
 
     # Rechunk the chunk
-    chunks = pt.chunk(KEYWORDS, lines)
-
     # Parse chunks associated with each key
-    for key, chunkList in iteritems(chunks):
-        # Parse each chunk in the chunk list
-        for chunk in chunkList:
-            schunk = chunk[0].strip().split()
-
-
-            # Cases
-            if key in ('NUMPTS', 'RES_NUMPTS'):
-                # Points handler
-                result['header'][key.lower()] = schunk[1]
-
-                # Parse points
-                for idx in range(1, len(chunk)):
-                    schunk = chunk[idx].strip().split()
-
-                    for count, ordinate in enumerate(schunk):
-                        # Divide ordinates into ij pairs
-                        if (count % 2) == 0:
-                            pair['i'] = ordinate
-                        else:
-                            pair['j'] = ordinate
-                            result['points'].append(pair)
-                            pair = {'i': None,
-                                    'j': None}
-
-            elif key in ('LAKE', 'RESERVOIR'):
-                # Type handler
-                result['type'] = schunk[0]
-            else:
-                # Header variables handler
-                result['header'][key.lower()] = schunk[1]
+    for key, chunk in pt.chunkIter(KEYWORDS, lines):
+        schunk = chunk[0].strip().split()
+
+
+        # Cases
+        if key in ('NUMPTS', 'RES_NUMPTS'):
+            # Points handler
+            result['header'][key.lower()] = schunk[1]
+
+            # Parse points
+            for idx in range(1, len(chunk)):
+                schunk = chunk[idx].strip().split()
+
+                for count, ordinate in enumerate(schunk):
+                    # Divide ordinates into ij pairs
+                    if (count % 2) == 0:
+                        pair['i'] = ordinate
+                    else:
+                        pair['j'] = ordinate
+                        result['points'].append(pair)
+                        pair = {'i': None,
+                                'j': None}
+
+        elif key in ('LAKE', 'RESERVOIR'):
+            # Type handler
+            result['type'] = schunk[0]
+        else:
+            # Header variables handler
+            result['header'][key.lower()] = schunk[1]
     return result
 
 def nodeChunk(lines):
@@ -355,18 +342,14 @@ def nodeChunk(lines):
               'y': None,
               'elev': None}
 
-    chunks = pt.chunk(KEYWORDS, lines)
-
     # Parse chunks associated with each key
-    for key, chunkList in iteritems(chunks):
-        # Parse each chunk in the chunk list
-        for chunk in chunkList:
-            schunk = chunk[0].strip().split()
-            if key == 'X_Y':
-                result['x'] = schunk[1]
-                result['y'] = schunk[2]
-            else:
-                result[key.lower()] = schunk[1]
+    for key, chunk in pt.chunkIter(KEYWORDS, lines):
+        schunk = chunk[0].strip().split()
+        if key == 'X_Y':
+            result['x'] = schunk[1]
+            result['y'] = schunk[2]
+        else:
+            result[key.lower()] = schunk[1]
 
     return result
 
@@ -401,45 +384,37 @@ def xSectionChunk(lines):
               'k_river': None,
               'breakpoints': []}
 
-    chunks = pt.chunk(KEYWORDS, lines)
-
     # Parse chunks associated with each key
-    for key, chunkList in iteritems(chunks):
-        # Parse each chunk in the chunk list
-        for chunk in chunkList:
-            # Strip and split the line (only one item in each list)
-            schunk = chunk[0].strip().split()
-
-            # Cases
-            if key == 'X1':
-                # Extract breakpoint XY pairs
-                x = schunk[1]
-                y = schunk[2]
-                result['breakpoints'].append({'x': x, 'y': y})
-
-            if key in ('SUBSURFACE', 'ERODE'):
-                # Set booleans
-                result[key.lower()] = True
-
-            else:
-                # Extract value
-                result[key.lower()] = schunk[1]
+    for key, chunk in pt.chunkIter(KEYWORDS, lines):
+        # Strip and split the line (only one item in each list)
+        schunk = chunk[0].strip().split()
+
+        # Cases
+        if key == 'X1':
+            # Extract breakpoint XY pairs
+            x = schunk[1]
+            y = schunk[2]
+            result['breakpoints'].append({'x': x, 'y': y})
+
+        if key in ('SUBSURFACE', 'ERODE'):
+            # Set booleans
+            result[key.lower()] = True
+
+        else:
+            # Extract value
+            result[key.lower()] = schunk[1]
     return result
 
 def structureChunk(keywords, resultDict, lines):
     """
     Parse Weir and Culvert Structures Method
     """
-    chunks = pt.chunk(keywords, lines)
-
     # Parse chunks associated with each key
-    for key, chunkList in iteritems(chunks):
-        # Parse each chunk in the chunk list
-        for chunk in chunkList:
-            # Strip and split the line (only one item in each list)
-            schunk = chunk[0].strip().split()
-
-            # Extract values and assign to appropriate key in resultDict
-            resultDict[key.lower()] = schunk[1]
+    for key, chunk in pt.chunkIter(keywords, lines):
+        # Strip and split the line (only one item in each list)
+        schunk = chunk[0].strip().split()
+
+        # Extract values and assign to appropriate key in resultDict
+        resultDict[key.lower()] = schunk[1]
 
     return resultDict
@@ -17,6 +17,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import SingletonThreadPool
 
 from ..orm import metadata, ProjectFile
+from .text_compression import enable_text_compression
 
 logging.basicConfig()
 log = logging.getLogger(__name__)
@@ -42,12 +43,14 @@ def init_db(sqlalchemy_url):
     return time.time() - start
 
 
-def init_sqlite_memory(initTime=False):
+def init_sqlite_memory(initTime=False, compressRasterText=False):
     """
     Initialize SQLite in Memory Only Database
     
     Args:
         initTime(Optional[bool]): If True, it will print the amount of time to generate database.
+        compressRasterText(Optional[bool]): If True, raster text is compressed in this database to reduce memory
+            use (see :func:`gsshapy.lib.text_compression.enable_text_compression`). Other databases are not affected.
 
     Returns:
         tuple: The tuple contains sqlalchemy_url(str), which is the path to use 
@@ -75,6 +78,9 @@ def init_sqlite_memory(initTime=False):
     
     if initTime:
         print('TIME: {0} seconds'.format(time.time() - start))
+
+    if compressRasterText:
+        enable_text_compression(engine=engine)
         
     return sqlalchemy_url, engine
     
@@ -0,0 +1,382 @@
+"""
+GRASS ASCII Tools
+"""
+from __future__ import unicode_literals
+
+from io import open as io_open
+import warnings
+
+import numpy as np
+
+__all__ = ['read_header',
+           'parse_header',
+           'parse_grass_ascii',
+           'build_row_index',
+           'read_window',
+           'slice_window',
+           'format_grass_ascii',
+           'iter_grass_ascii',
+           'header_to_geotransform',
+           'geotransform_to_header']
+
+HEADER_KEYS = ('north', 'south', 'east', 'west', 'rows', 'cols')
+
+
+def read_header(path):
+    """
+    Read the header of a GRASS ASCII raster file without reading the values.
+
+    Args:
+        path (str): Path to the raster file.
+
+    Returns:
+        dict: Header of the raster as returned by ``parse_header``.
+    """
+    with io_open(path, 'r') as f:
+        # Lines are consumed from the file only until the first line of values
+        header, _ = parse_header(f)
+
+    return header
+
+
+def parse_header(lines):
+    """
+    Parse the header of a GRASS ASCII raster.
+
+    Args:
+        lines (iterable): Lines of the raster. Iteration stops at the first line after the header.
+
+    Returns:
+        tuple: Dictionary with the north, south, east and west coordinates (float) and the number of rows and cols (int)
+        and the number of header lines.
+    """
+    header = dict()
+    numLines = 0
+
+    for line in lines:
+        spline = line.split()
+
+        if not spline:
+            numLines += 1
+            continue
+
+        key = spline[0].rstrip(':').lower()
+
+        if not spline[0].endswith(':') and key not in HEADER_KEYS:
+            break
+
+        if key == 'rows' or key == 'cols':
+            header[key] = int(spline[1])
+        elif key in HEADER_KEYS:
+            header[key] = float(spline[1])
+        else:
+            header[key] = spline[1]
+
+        numLines += 1
+
+    return header, numLines
+
+
+def parse_grass_ascii(rasterText, dtype='float32'):
+    """
+    Parse a GRASS ASCII raster into an array.
+
+    Args:
+        rasterText (str): Text of the raster.
+        dtype (str, optional): NumPy data type of the array. Defaults to 'float32'.
+
+    Returns:
+        tuple: Array of the raster values with shape (rows, cols) and the GDAL-style geotransform of the raster.
+    """
+    lines = rasterText.split('\n', 16)
+    header, numLines = parse_header(lines[:16])
+    missing = [key for key in HEADER_KEYS if key not in header]
+
+    if missing:
+        raise ValueError('GRASS ASCII raster header is missing {0}.'.format(', '.join(missing)))
+
+    body = '\n'.join(lines[numLines:]) if numLines < len(lines) else ''
+    rows, cols = header['rows'], header['cols']
+    values = _parse_values(body, dtype)
+
+    if values.size != rows * cols:
+        raise ValueError('GRASS ASCII raster has {0} values, but the header declares {1} rows and {2} cols.'.format(
+            values.size, rows, cols))
+
+    return values.reshape(rows, cols), header_to_geotransform(header)
+
+
+def build_row_index(path):
+    """
+    Build an index of the byte offsets of the rows of a GRASS ASCII raster file, so that windows of the raster can be
+    read without scanning the rows before them. The file is read one line at a time. Each row of values must be on its
+    own line, as written by GSSHA and gsshapy.
+
+    Args:
+        path (str): Path to the raster file.
+
+    Returns:
+        tuple: Header of the raster as returned by ``parse_header`` and an array with the offset of each row followed by
+        the offset of the end of the last row.
+    """
+    with open(path, 'rb') as f:
+        header, offset = _read_binary_header(f)
+        offsets = []
+
+        while True:
+            line = f.readline()
+
+            if not line:
+                break
+
+            if line.strip():
+                offsets.append(offset)
+                end = offset + len(line)
+
+            offset += len(line)
+
+    if len(offsets) != header['rows']:
+        raise ValueError('GRASS ASCII raster file {0} has {1} lines of values, but the header declares {2} rows.'.format(
+            path, len(offsets), header['rows']))
+
+    offsets.append(end if offsets else offset)
+
+    return header, np.array(offsets, dtype=np.int64)
+
+
+def read_window(path, rowOff, colOff, nrows, ncols, dtype='float32', rowIndex=None):
+    """
+    Read a window of a GRASS ASCII raster file. Only the rows of the window are parsed, so memory use scales with the
+    size of the window. Each row of values must be on its own line.
+
+    Args:
+        path (str): Path to the raster file.
+        rowOff (int): Index of the first row of the window, counted from the north.
+        colOff (int): Index of the first column of the window, counted from the west.
+        nrows (int): Number of rows of the window.
+        ncols (int): Number of columns of the window.
+        dtype (str, optional): NumPy data type of the array. Defaults to 'float32'.
+        rowIndex (tuple, optional): Row index of the file returned by ``build_row_index``. If given, the rows of the
+            window are read directly instead of scanning the rows before them.
+
+    Returns:
+        tuple: Array of the window values with shape (nrows, ncols) and the GDAL-style geotransform of the window.
+    """
+    with open(path, 'rb') as f:
+        if rowIndex is not None:
+            header, offsets = rowIndex
+            _check_window(header, rowOff, colOff, nrows, ncols)
+            f.seek(offsets[rowOff])
+            body = f.read(offsets[rowOff + nrows] - offsets[rowOff])
+        else:
+            header, _ = _read_binary_header(f)
+            _check_window(header, rowOff, colOff, nrows, ncols)
+            lines = []
+            skip = rowOff
+
+            for line in iter(f.readline, b''):
+                if not line.strip():
+                    continue
+
+                if skip > 0:
+                    skip -= 1
+                    continue
+
+                lines.append(line)
+
+                if len(lines) == nrows:
+                    break
+
+            body = b''.join(lines)
+
+    values = _parse_values(body.decode('utf-8'), dtype)
+
+    if values.size != nrows * header['cols']:
+        raise ValueError('GRASS ASCII raster file {0} has rows with a different number of values than the header '
+                         'declares.'.format(path))
+
+    geotransform = _window_geotransform(header_to_geotransform(header), rowOff, colOff)
+
+    return values.reshape(nrows, header['cols'])[:, colOff:colOff + ncols].copy(), geotransform
+
+
+def slice_window(array, geotransform, rowOff, colOff, nrows, ncols):
+    """
+    Copy a window of a raster array.
+
+    Args:
+        array (:class:`numpy.ndarray`): Two dimensional array of the raster values.
+        geotransform (tuple): GDAL-style geotransform of the raster.
+        rowOff (int): Index of the first row of the window, counted from the north.
+        colOff (int): Index of the first column of the window, counted from the west.
+        nrows (int): Number of rows of the window.
+        ncols (int): Number of columns of the window.
+
+    Returns:
+        tuple: Array of the window values with shape (nrows, ncols) and the GDAL-style geotransform of the window.
+    """
+    _check_window({'rows': array.shape[0], 'cols': array.shape[1]}, rowOff, colOff, nrows, ncols)
+
+    return np.array(array[rowOff:rowOff + nrows, colOff:colOff + ncols]), \
+        _window_geotransform(geotransform, rowOff, colOff)
+
+
+def format_grass_ascii(array, geotransform, precision=None, noDataValue=None):
+    """
+    Format an array as a GRASS ASCII raster.
+
+    Args:
+        array (:class:`numpy.ndarray`): Two dimensional array of the raster values.
+        geotransform (tuple): GDAL-style geotransform of the raster.
+        precision (int, optional): Number of decimal places of floating point values. Defaults to the number of
+            significant digits that reproduce the values exactly.
+        noDataValue (float, optional): Value written in place of masked, NaN and infinite values. Defaults to None
+            (written as is).
+
+    Returns:
+        str: Text of the raster.
+    """
+    return ''.join(iter_grass_ascii(array, geotransform, precision=precision, noDataValue=noDataValue))
+
+
+def iter_grass_ascii(array, geotransform, precision=None, noDataValue=None, chunkSize=256):
+    """
+    Format an array as a GRASS ASCII raster in chunks, e.g.: to write large rasters with ``openFile.writelines``.
+
+    Each chunk of rows is formatted with a single string formatting operation instead of formatting values one by one.
+
+    Args:
+        array (:class:`numpy.ndarray`): Two dimensional array of the raster values.
+        geotransform (tuple): GDAL-style geotransform of the raster.
+        precision (int, optional): Number of decimal places of floating point values. Defaults to the number of
+            significant digits that reproduce the values exactly.
+        noDataValue (float, optional): Value written in place of masked, NaN and infinite values. Defaults to None
+            (written as is).
+        chunkSize (int, optional): Number of rows formatted at a time. Defaults to 256.
+
+    Yields:
+        str: The header followed by the text of each chunk of rows.
+    """
+    if noDataValue is not None:
+        array = np.ma.filled(np.ma.masked_invalid(array), noDataValue)
+
+    array = np.asarray(array)
+
+    if array.ndim != 2:
+        raise ValueError('Only two dimensional arrays can be written as GRASS ASCII rasters.')
+
+    rows, cols = array.shape
+    header = geotransform_to_header(geotransform, rows, cols)
+
+    lines = ['{0}: {1:.6f}\n'.format(key, header[key]) for key in HEADER_KEYS[:4]]
+    lines.append('rows: {0}\n'.format(rows))
+    lines.append('cols: {0}\n'.format(cols))
+    yield ''.join(lines)
+
+    if array.dtype.kind in 'iub':
+        valueFormat = '%d'
+    elif precision is not None:
+        valueFormat = '%.{0}f'.format(precision)
+    else:
+        # Significant digits that round trip single and double precision values
+        valueFormat = '%.9g' if array.dtype.itemsize <= 4 else '%.17g'
+
+    rowFormat = ' '.join([valueFormat] * cols) + ' \n'
+    chunkFormat = rowFormat * chunkSize
+
+    for start in range(0, rows, chunkSize):
+        chunk = array[start:start + chunkSize]
+
+        if len(chunk) < chunkSize:
+            chunkFormat = rowFormat * len(chunk)
+
+        yield chunkFormat % tuple(chunk.ravel().tolist())
+
+
+def _parse_values(text, dtype):
+    """
+    Parse whitespace separated values in a single pass. Integer maps are parsed as floats so that values such as "1.0"
+    are accepted.
+    """
+    dtype = np.dtype(dtype)
+    parseType = dtype if dtype.kind == 'f' else np.float64
+
+    with warnings.catch_warnings():
+        # Malformed values end the parse early, which is reported by the caller
+        warnings.simplefilter('ignore', DeprecationWarning)
+        values = np.fromstring(text, dtype=parseType, sep=' ')
+
+    return values.astype(dtype, copy=False)
+
+
+def _read_binary_header(f):
+    """
+    Read the header of a raster file opened in binary mode and leave the file positioned at the first row of values.
+    Returns the header and the byte offset of the first row.
+    """
+    offsets = []
+
+    def lines():
+        while True:
+            offsets.append(f.tell())
+            line = f.readline()
+
+            if not line:
+                return
+
+            yield line.decode('utf-8')
+
+    header, _ = parse_header(lines())
+    missing = [key for key in HEADER_KEYS if key not in header]
+
+    if missing:
+        raise ValueError('GRASS ASCII raster header is missing {0}.'.format(', '.join(missing)))
+
+    # The first row was consumed to detect the end of the header
+    f.seek(offsets[-1])
+
+    return header, offsets[-1]
+
+
+def _check_window(header, rowOff, colOff, nrows, ncols):
+    """
+    Raise a ValueError if a window is not within the raster.
+    """
+    if rowOff < 0 or colOff < 0 or nrows < 1 or ncols < 1 or \
+            rowOff + nrows > header['rows'] or colOff + ncols > header['cols']:
+        raise ValueError('Window of {0} rows and {1} cols at row {2} and col {3} is not within the raster of {4} rows '
+                         'and {5} cols.'.format(nrows, ncols, rowOff, colOff, header['rows'], header['cols']))
+
+
+def _window_geotransform(geotransform, rowOff, colOff):
+    """
+    Geotransform of a window of a raster.
+    """
+    west, cellWidth, _, north, _, cellHeight = geotransform
+    return west + colOff * cellWidth, cellWidth, 0.0, north + rowOff * cellHeight, 0.0, cellHeight
+
+
+def header_to_geotransform(header):
+    """
+    Derive the GDAL-style geotransform (west, cell width, 0, north, 0, -cell height) from a GRASS ASCII header.
+    """
+    return (header['west'],
+            (header['east'] - header['west']) / header['cols'],
+            0.0,
+            header['north'],
+            0.0,
+            -(header['north'] - header['south']) / header['rows'])
+
+
+def geotransform_to_header(geotransform, rows, cols):
+    """
+    Derive the GRASS ASCII header from a GDAL-style geotransform and the shape of the raster.
+    """
+    west, cellWidth, _, north, _, cellHeight = geotransform
+
+    return {'north': north,
+            'south': north + cellHeight * rows,
+            'east': west + cellWidth * cols,
+            'west': west,
+            'rows': rows,
+            'cols': cols}
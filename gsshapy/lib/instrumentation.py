@@ -0,0 +1,214 @@
+"""
+Instrumentation
+"""
+from __future__ import unicode_literals
+
+from contextlib import contextmanager
+from io import open as io_open
+import json
+import logging
+import os
+import threading
+import time
+
+__all__ = ['LoggerSink',
+           'JsonLinesSink',
+           'MemorySink',
+           'add_sink',
+           'remove_sink',
+           'clear_sinks',
+           'is_enabled',
+           'emit',
+           'emit_event',
+           'file_context',
+           'get_context',
+           'capture']
+
+log = logging.getLogger(__name__)
+
+#: Keys of the events emitted for each file read or written
+EVENT_KEYS = ('operation', 'card', 'class', 'path', 'bytes', 'parse_time', 'write_time', 'objects', 'commit_time',
+              'timestamp', 'pid')
+
+_sinks = []
+
+# Fields of file_context and the sink of capture, which apply to the current thread only
+_context = threading.local()
+
+
+class LoggerSink(object):
+    """
+    Sink that logs each event as a single line.
+
+    Args:
+        logger (:class:`logging.Logger`, optional): Logger to use. Defaults to the gsshapy.lib.instrumentation logger.
+        level (int, optional): Level of the log messages. Defaults to logging.INFO.
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or log
+        self.level = level
+
+    def emit(self, event):
+        self.logger.log(self.level, ' '.join('{0}={1}'.format(key, event.get(key)) for key in EVENT_KEYS))
+
+
+class JsonLinesSink(object):
+    """
+    Sink that appends each event as a JSON object on its own line of a file. The file is opened for each event, so
+    several processes can share it.
+
+    Args:
+        path (str): Path to the file.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+
+    def emit(self, event):
+        with io_open(self.path, 'a') as f:
+            f.write('{0}\n'.format(json.dumps(event, sort_keys=True)))
+
+
+class MemorySink(object):
+    """
+    Sink that keeps the events in the ``events`` list.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+    def clear(self):
+        """
+        Remove all collected events.
+        """
+        self.events = []
+
+
+def add_sink(sink):
+    """
+    Add a sink that receives an event for every file read or written. A sink is any object with an ``emit(event)``
+    method, where event is a dictionary with the keys in ``EVENT_KEYS``.
+
+    Args:
+        sink: The sink to add (e.g.: LoggerSink, JsonLinesSink or MemorySink).
+
+    Returns:
+        The sink that was added.
+    """
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    """
+    Remove a sink added with ``add_sink``.
+    """
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def clear_sinks():
+    """
+    Remove all sinks, which disables instrumentation.
+    """
+    del _sinks[:]
+
+
+def is_enabled():
+    """
+    Check whether any sinks receive events.
+
+    Returns:
+        bool: True if at least one sink was added.
+    """
+    return bool(_getSinks())
+
+
+def emit(**fields):
+    """
+    Send an event to all sinks. Fields set with ``file_context`` are added to the event and missing keys are None.
+
+    Args:
+        **fields: Values of the event keys.
+    """
+    if not _getSinks():
+        return
+
+    event = dict.fromkeys(EVENT_KEYS)
+    event.update(getattr(_context, 'fields', {}))
+    event.update(fields)
+
+    if event['timestamp'] is None:
+        event['timestamp'] = time.time()
+
+    if event['pid'] is None:
+        event['pid'] = os.getpid()
+
+    emit_event(event)
+
+
+def emit_event(event):
+    """
+    Send an event that was already assembled (e.g.: captured in a worker process) to all sinks.
+    """
+    for sink in list(_getSinks()):
+        try:
+            sink.emit(event)
+        except Exception:
+            log.exception('Instrumentation sink {0} failed.'.format(sink))
+
+
+@contextmanager
+def file_context(**fields):
+    """
+    Add fields (e.g.: the project card of a file) to the events emitted within the context.
+    """
+    previous = getattr(_context, 'fields', {})
+    _context.fields = dict(previous, **fields)
+
+    try:
+        yield
+    finally:
+        _context.fields = previous
+
+
+def get_context():
+    """
+    Get the fields set with ``file_context`` in the current thread.
+
+    Returns:
+        dict: The fields that are added to emitted events.
+    """
+    return dict(getattr(_context, 'fields', {}))
+
+
+@contextmanager
+def capture():
+    """
+    Collect the events emitted within the context in a MemorySink instead of the sinks that were added, e.g.: to send
+    the events of a worker process back to the parent process. Like ``file_context``, it only applies to the current
+    thread.
+
+    Yields:
+        MemorySink: The sink collecting the events.
+    """
+    sink = MemorySink()
+    previous = getattr(_context, 'sinks', None)
+    _context.sinks = [sink]
+
+    try:
+        yield sink
+    finally:
+        _context.sinks = previous
+
+
+def _getSinks():
+    """
+    Sinks of the current thread: the sink of ``capture`` if events are captured, otherwise the sinks that were added.
+    """
+    captured = getattr(_context, 'sinks', None)
+    return captured if captured is not None else _sinks
@@ -0,0 +1,232 @@
+"""
+Parse Cache
+"""
+from __future__ import unicode_literals
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+
+import appdirs
+
+from ..util.files import replace_file
+from ..util.metadata import version
+
+__all__ = ['ParseCache',
+           'enable_parse_cache',
+           'disable_parse_cache',
+           'get_parse_cache']
+
+log = logging.getLogger(__name__)
+
+default_cache_dir = os.path.join(appdirs.user_cache_dir('gsshapy'), 'parse')
+
+_parse_cache = None
+
+
+class ParseCache(object):
+    """
+    Persistent cache of parsed GsshaPy file objects.
+
+    Files that can be parsed without a database session (see ``GsshaPyFileObjectBase.readDetached``) are stored in the
+    cache after they are parsed. When the same file is read again, the parsed objects are restored from the cache
+    instead of parsing the file. Entries are keyed by the file path, size, modification time and a hash of the file
+    contents, so any change to the file invalidates its entry.
+
+    Args:
+        directory (str, optional): Directory where the cache is stored. Defaults to the gsshapy user cache directory.
+        max_size (int, optional): Maximum total size of the cache in bytes. The least recently used entries are
+            evicted when it is exceeded. Defaults to 2 GB.
+        max_age (float, optional): Maximum age in seconds of entries that have not been used. Defaults to 30 days.
+    """
+    EXTENSION = '.pickle'
+
+    def __init__(self, directory=None, max_size=2 * 1024 ** 3, max_age=30 * 24 * 3600):
+        self.directory = directory or default_cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def get(self, fileIO, path, **kwargs):
+        """
+        Retrieve the parsed objects for a file.
+
+        Args:
+            fileIO (class): GsshaPy file object class used to parse the file.
+            path (str): Path to the file.
+            **kwargs: Options the file was parsed with.
+
+        Returns:
+            list: Detached objects as returned by ``readDetached`` or None if the file is not in the cache.
+        """
+        entryPath = self._entryPath(fileIO, path, kwargs)
+
+        if not os.path.isfile(entryPath):
+            return None
+
+        try:
+            with open(entryPath, 'rb') as f:
+                created = pickle.load(f)
+        except Exception:
+            log.warning('Removing unreadable parse cache entry {0}'.format(entryPath))
+            self._remove(entryPath)
+            return None
+
+        # Mark entry as recently used
+        os.utime(entryPath, None)
+        log.debug('Restored {0} from parse cache'.format(path))
+
+        return created
+
+    def put(self, fileIO, path, created, **kwargs):
+        """
+        Store the parsed objects for a file.
+
+        Args:
+            fileIO (class): GsshaPy file object class used to parse the file.
+            path (str): Path to the file.
+            created (list): Detached objects as returned by ``readDetached``.
+            **kwargs: Options the file was parsed with.
+        """
+        entryPath = self._entryPath(fileIO, path, kwargs)
+
+        # Write to a temporary file first so that other processes never see partial entries
+        fd, tempPath = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(created, f, protocol=pickle.HIGHEST_PROTOCOL)
+            replace_file(tempPath, entryPath)
+        except Exception:
+            self._remove(tempPath)
+            raise
+
+        self.evict()
+
+    def info(self):
+        """
+        Summarize the contents of the cache.
+
+        Returns:
+            dict: Directory, number of entries, total size in bytes and limits of the cache.
+        """
+        entries = self._entries()
+
+        return {'directory': self.directory,
+                'entries': len(entries),
+                'size': sum(size for _, size, _ in entries),
+                'max_size': self.max_size,
+                'max_age': self.max_age}
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+        """
+        for entryPath, _, _ in self._entries():
+            self._remove(entryPath)
+
+    def evict(self):
+        """
+        Remove entries that are older than max_age, then the least recently used entries until the cache is smaller
+        than max_size.
+        """
+        now = time.time()
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        totalSize = sum(size for _, size, _ in entries)
+
+        for entryPath, size, lastUsed in entries:
+            if now - lastUsed <= self.max_age and totalSize <= self.max_size:
+                break
+
+            self._remove(entryPath)
+            totalSize -= size
+
+    def _entries(self):
+        """
+        List the (path, size, last used time) of each entry in the cache.
+        """
+        entries = []
+
+        for entryName in os.listdir(self.directory):
+            if entryName.endswith(self.EXTENSION):
+                entryPath = os.path.join(self.directory, entryName)
+                try:
+                    stat = os.stat(entryPath)
+                except OSError:
+                    continue
+                entries.append((entryPath, stat.st_size, stat.st_mtime))
+
+        return entries
+
+    def _entryPath(self, fileIO, path, kwargs):
+        """
+        Derive the path to the cache entry of a file from its path, size, modification time and content.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        contentHash = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                contentHash.update(block)
+
+        key = '|'.join((version(),
+                        fileIO.__module__,
+                        fileIO.__name__,
+                        path,
+                        str(stat.st_size),
+                        repr(stat.st_mtime),
+                        contentHash.hexdigest(),
+                        repr(sorted(kwargs.items()))))
+
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + self.EXTENSION)
+
+    @staticmethod
+    def _remove(entryPath):
+        """
+        Remove an entry, ignoring entries removed concurrently.
+        """
+        try:
+            os.remove(entryPath)
+        except OSError:
+            pass
+
+
+def enable_parse_cache(directory=None, max_size=2 * 1024 ** 3, max_age=30 * 24 * 3600):
+    """
+    Enable the parse cache for all project reads.
+
+    Args:
+        directory (str, optional): Directory where the cache is stored. Defaults to the gsshapy user cache directory.
+        max_size (int, optional): Maximum total size of the cache in bytes. Defaults to 2 GB.
+        max_age (float, optional): Maximum age in seconds of entries that have not been used. Defaults to 30 days.
+
+    Returns:
+        ParseCache: The active parse cache.
+    """
+    global _parse_cache
+    _parse_cache = ParseCache(directory=directory, max_size=max_size, max_age=max_age)
+    return _parse_cache
+
+
+def disable_parse_cache():
+    """
+    Disable the parse cache. Entries already in the cache are kept.
+    """
+    global _parse_cache
+    _parse_cache = None
+
+
+def get_parse_cache():
+    """
+    Get the active parse cache.
+
+    Returns:
+        ParseCache: The active parse cache or None if the parse cache is disabled.
+    """
+    return _parse_cache
@@ -18,12 +18,38 @@ log = logging.getLogger(__name__)
 # CONSTANTS
 REPLACE_NO_VALUE = -999999
 
+# Escape characters and whitespace that str.split treats differently than shlex
+SPLIT_SHLEX_CHARS = re.compile(r'[\\\x0b\x0c\x1c-\x1f]|[^\x00-\x7f]')
+SPLIT_QUOTED_TOKEN = re.compile(r'''(?:[^ \t\r\n'"]+|"[^"]*"|'[^']*')+|(['"])''')
+SPLIT_QUOTED_PART = re.compile(r'''"([^"]*)"|'([^']*)'|([^'"]+)''')
+
+
 def splitLine(line):
     """
     Split lines read from files and preserve
     paths and strings.
+
+    Produces the same tokens as shlex.split. Lines without quotes are split with str.split and lines with balanced
+    quotes are split with a regular expression. Lines with escape characters, unbalanced quotes or unusual whitespace
+    are split with shlex.split.
     """
-    splitLine = shlex.split(line)
+    if SPLIT_SHLEX_CHARS.search(line):
+        return shlex.split(line)
+
+    if '"' not in line and "'" not in line:
+        return line.split()
+
+    splitLine = []
+    for match in SPLIT_QUOTED_TOKEN.finditer(line):
+        if match.group(1):
+            # Unbalanced quote: let shlex handle (and report) it
+            return shlex.split(line)
+
+        token = match.group(0)
+        if '"' in token or "'" in token:
+            token = ''.join(a or b or c for a, b, c in SPLIT_QUOTED_PART.findall(token))
+        splitLine.append(token)
+
     return splitLine
 
 
@@ -49,7 +75,6 @@ def chunk(keywords, lines):
     key words in the list
     """
     chunks = dict()
-    chunk = []
       
     # Create an empty dictionary using all the keywords
     for keyword in keywords:
@@ -57,16 +82,34 @@ def chunk(keywords, lines):
     
     # Populate dictionary with lists of chunks associated
     # with the keywords in the list   
+    for keyword, chunk in chunkIter(keywords, lines):
+        chunks[keyword].append(chunk)
+
+    return chunks
+
+
+def chunkIter(keywords, lines):
+    """
+    Divide a file into chunks between key words in the list and yield each chunk as a (keyword, lines) tuple as soon
+    as it is complete. The chunks are yielded in the order they appear in the file and only one chunk is held in
+    memory at a time. Lines before the first key word are ignored.
+    """
+    keyword = None
+    chunk = []
+
     for line in lines:
         if line.strip():
             token = line.split()[0]
             if token in keywords:
-                chunk = [line]   
-                chunks[token].append(chunk)   
-            else:
+                if keyword is not None:
+                    yield keyword, chunk
+                keyword = token
+                chunk = [line]
+            elif keyword is not None:
                 chunk.append(line)
 
-    return chunks
+    if keyword is not None:
+        yield keyword, chunk
 
 
 def valueReadPreprocessor(valueString, replaceParamsFile=None):
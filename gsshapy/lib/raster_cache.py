@@ -0,0 +1,258 @@
+"""
+Raster Cache
+"""
+from __future__ import unicode_literals
+
+import hashlib
+from io import open as io_open
+import json
+import logging
+import os
+import uuid
+
+import appdirs
+import numpy as np
+
+from .grass_ascii import parse_grass_ascii
+from ..util.files import replace_file
+
+__all__ = ['RasterCache',
+           'load_raster_array',
+           'enable_raster_cache',
+           'disable_raster_cache',
+           'get_raster_cache']
+
+log = logging.getLogger(__name__)
+
+default_cache_dir = os.path.join(appdirs.user_cache_dir('gsshapy'), 'raster')
+
+_raster_cache = None
+
+
+class RasterCache(object):
+    """
+    Cache of parsed GRASS ASCII rasters stored as binary NumPy (.npy) files.
+
+    The first time a raster file is parsed, its values are stored in a .npy file with a small JSON file describing the
+    source. Later loads memory-map the .npy file instead of parsing the text, so the values are only read from disk as
+    they are used and are shared between processes through the operating system page cache. An entry is valid while
+    the size and modification time of the source file are unchanged. If they changed, the SHA-1 hash of the source is
+    compared, so files that were copied or touched without changes keep their entries.
+
+    Args:
+        directory (str, optional): Directory where the entries are stored. Defaults to the gsshapy user cache directory.
+        sidecar (bool, optional): If True, entries are stored next to each raster file instead (e.g.: standard_ele.npy
+            for standard.ele). The directory argument is ignored. Defaults to False.
+    """
+
+    def __init__(self, directory=None, sidecar=False):
+        self.directory = directory or default_cache_dir
+        self.sidecar = sidecar
+
+        if not sidecar and not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def get(self, path, dtype):
+        """
+        Retrieve the values of a raster file from the cache.
+
+        Args:
+            path (str): Path to the raster file.
+            dtype (str): NumPy data type of the values.
+
+        Returns:
+            tuple: Read-only memory-mapped array and the GDAL-style geotransform of the raster or None if the raster is
+            not in the cache.
+        """
+        arrayPath, metaPath = self._entryPaths(path, dtype)
+
+        try:
+            with io_open(metaPath, 'r') as f:
+                meta = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+        source = self._getSourceSignature(path)
+
+        if source is None:
+            return None
+
+        if [source[0], source[1]] != meta['signature']:
+            if self._hashFile(path) != meta['hash']:
+                return None
+
+            # The content is unchanged, so keep the entry for the new signature
+            meta['signature'] = list(source)
+            self._writeMeta(metaPath, meta)
+
+        try:
+            array = np.load(arrayPath, mmap_mode='r')
+        except (IOError, OSError, ValueError):
+            log.warning('Removing unreadable raster cache entry {0}'.format(arrayPath))
+            self.remove(path, dtype)
+            return None
+
+        if array.dtype != np.dtype(dtype) or list(array.shape) != meta['shape']:
+            return None
+
+        log.debug('Memory-mapped {0} from raster cache'.format(path))
+
+        return array, tuple(meta['geotransform'])
+
+    def put(self, path, array, geotransform):
+        """
+        Store the values of a raster file in the cache.
+
+        Args:
+            path (str): Path to the raster file.
+            array (:class:`numpy.ndarray`): Values of the raster.
+            geotransform (tuple): GDAL-style geotransform of the raster.
+        """
+        source = self._getSourceSignature(path)
+        arrayPath, metaPath = self._entryPaths(path, array.dtype)
+        tempPath = '{0}.{1}.tmp'.format(arrayPath, uuid.uuid4().hex)
+
+        # Write to a temporary file first so that other processes never see partial entries
+        try:
+            with open(tempPath, 'wb') as f:
+                np.save(f, np.ascontiguousarray(array))
+            replace_file(tempPath, arrayPath)
+        except Exception:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+
+        self._writeMeta(metaPath, {'signature': list(source),
+                                   'hash': self._hashFile(path),
+                                   'shape': list(array.shape),
+                                   'geotransform': list(geotransform)})
+
+    def remove(self, path, dtype):
+        """
+        Remove the entry of a raster file.
+        """
+        for entryPath in self._entryPaths(path, dtype):
+            try:
+                os.remove(entryPath)
+            except OSError:
+                pass
+
+    def _entryPaths(self, path, dtype):
+        """
+        Paths to the .npy file and the JSON file of the entry of a raster file.
+        """
+        path = os.path.abspath(path)
+        dtype = np.dtype(dtype).name
+
+        if self.sidecar:
+            # Avoid names that contain the raster filename, which would be mistaken for batch mode output
+            directory, filename = os.path.split(path)
+            prefix = os.path.join(directory, '{0}_{1}'.format(filename.replace('.', '_'), dtype))
+        else:
+            key = '{0}|{1}'.format(path, dtype)
+            prefix = os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+        return prefix + '.npy', prefix + '.json'
+
+    @staticmethod
+    def _writeMeta(metaPath, meta):
+        """
+        Atomically write the JSON file of an entry.
+        """
+        tempPath = '{0}.{1}.tmp'.format(metaPath, uuid.uuid4().hex)
+
+        with io_open(tempPath, 'w') as f:
+            f.write(json.dumps(meta))
+
+        replace_file(tempPath, metaPath)
+
+    @staticmethod
+    def _getSourceSignature(path):
+        """
+        Size and modification time of a file or None if it doesn't exist.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return stat.st_size, stat.st_mtime
+
+    @staticmethod
+    def _hashFile(path):
+        """
+        SHA-1 hash of the contents of a file.
+        """
+        contentHash = hashlib.sha1()
+
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                contentHash.update(block)
+
+        return contentHash.hexdigest()
+
+
+def load_raster_array(path, dtype='float32'):
+    """
+    Load the values of a GRASS ASCII raster file, using the raster cache if it is enabled.
+
+    Args:
+        path (str): Path to the raster file.
+        dtype (str, optional): NumPy data type of the values. Defaults to 'float32'.
+
+    Returns:
+        tuple: Array of the raster values with shape (rows, cols) and the GDAL-style geotransform of the raster. The
+        array is a read-only memory map when it is loaded from the cache.
+    """
+    rasterCache = _raster_cache
+
+    if rasterCache is not None:
+        cached = rasterCache.get(path, dtype)
+
+        if cached is not None:
+            return cached
+
+    with io_open(path, 'r') as f:
+        array, geotransform = parse_grass_ascii(f.read(), dtype=dtype)
+
+    if rasterCache is not None:
+        try:
+            rasterCache.put(path, array, geotransform)
+        except (IOError, OSError) as e:
+            log.warning('Could not store {0} in the raster cache: {1}'.format(path, e))
+
+    return array, geotransform
+
+
+def enable_raster_cache(directory=None, sidecar=False):
+    """
+    Enable the raster cache for rasters read from file.
+
+    Args:
+        directory (str, optional): Directory where the cache is stored. Defaults to the gsshapy user cache directory.
+        sidecar (bool, optional): If True, entries are stored next to each raster file instead. Defaults to False.
+
+    Returns:
+        RasterCache: The active raster cache.
+    """
+    global _raster_cache
+    _raster_cache = RasterCache(directory=directory, sidecar=sidecar)
+    return _raster_cache
+
+
+def disable_raster_cache():
+    """
+    Disable the raster cache. Entries already in the cache are kept.
+    """
+    global _raster_cache
+    _raster_cache = None
+
+
+def get_raster_cache():
+    """
+    Get the active raster cache.
+
+    Returns:
+        RasterCache: The active raster cache or None if the raster cache is disabled.
+    """
+    return _raster_cache
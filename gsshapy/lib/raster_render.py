@@ -0,0 +1,573 @@
+"""
+Raster Render
+"""
+from __future__ import unicode_literals
+
+import struct
+import xml.etree.ElementTree as ET
+from zipfile import ZipFile
+import zlib
+
+import numpy as np
+from mapkit.ColorRampGenerator import ColorRampEnum, ColorRampGenerator
+
+__all__ = ['get_color_ramp',
+           'render_rgba',
+           'encode_png',
+           'get_lat_lon_bounds',
+           'warp_to_lat_lon',
+           'get_kml_ground_overlay',
+           'get_kml_grid',
+           'get_kml_clusters',
+           'write_kmz']
+
+
+def get_color_ramp(colorRamp=ColorRampEnum.COLOR_RAMP_HUE):
+    """
+    Get a color ramp as an array of RGB colors.
+
+    Args:
+        colorRamp (:mod:`mapkit.ColorRampGenerator.ColorRampEnum` or dict, optional): Use ColorRampEnum to select a
+            default color ramp or a dictionary with keys 'colors' and 'interpolatedPoints' to specify a custom color
+            ramp. Defaults to the hue color ramp.
+
+    Returns:
+        :class:`numpy.ndarray`: Array of uint8 colors with shape (number of colors, 3).
+    """
+    if isinstance(colorRamp, dict):
+        colors = ColorRampGenerator.generateCustomColorRamp(colorRamp['colors'], colorRamp['interpolatedPoints'])
+    else:
+        colors = ColorRampGenerator.generateDefaultColorRamp(colorRamp)
+
+    return np.array(colors, dtype=np.uint8)
+
+
+def render_rgba(array, colorRamp=ColorRampEnum.COLOR_RAMP_HUE, alpha=1.0, noDataValue=None, discreet=False,
+                scale=1):
+    """
+    Color the cells of a raster array with a color ramp.
+
+    The values are mapped linearly from the minimum to the maximum onto the color ramp, or each unique value gets its
+    own color when discreet is True. Cells with the no data value or with NaN are transparent. The image is upsampled by
+    repeating each cell scale times in both directions.
+
+    Args:
+        array (:class:`numpy.ndarray`): Two dimensional array of the raster values.
+        colorRamp (:mod:`mapkit.ColorRampGenerator.ColorRampEnum` or dict, optional): Color ramp (see
+            ``get_color_ramp``). Defaults to the hue color ramp.
+        alpha (float, optional): Opacity between 0.0 and 1.0. Defaults to 1.0.
+        noDataValue (float, optional): Value of the cells that are transparent. Defaults to None.
+        discreet (bool, optional): If True, each unique value is given a distinct color. Defaults to False.
+        scale (int, optional): Number of pixels per cell in each direction. Defaults to 1.
+
+    Returns:
+        :class:`numpy.ndarray`: Array of uint8 RGBA pixels with shape (rows * scale, columns * scale, 4).
+    """
+    array = np.asarray(array)
+    ramp = get_color_ramp(colorRamp)
+    valid = _get_valid_cells(array, noDataValue)
+    validValues = array[valid]
+    rampIndex = np.zeros(array.shape, dtype=np.intp)
+
+    if validValues.size and discreet:
+        uniqueValues = np.unique(validValues)
+        position = np.searchsorted(uniqueValues, validValues)
+        rampIndex[valid] = position * (len(ramp) - 1) // max(len(uniqueValues) - 1, 1)
+    elif validValues.size:
+        minValue, maxValue = validValues.min(), validValues.max()
+
+        if maxValue > minValue:
+            slope = (len(ramp) - 1) / float(maxValue - minValue)
+            rampIndex[valid] = np.clip(((validValues - minValue) * slope).astype(np.intp), 0, len(ramp) - 1)
+
+    # Lookup table with an extra transparent color for no data cells
+    lookup = np.zeros((len(ramp) + 1, 4), dtype=np.uint8)
+    lookup[:-1, :3] = ramp
+    lookup[:-1, 3] = int(alpha * 255)
+    rampIndex[~valid] = len(ramp)
+
+    if scale > 1:
+        rampIndex = np.repeat(np.repeat(rampIndex, scale, axis=0), scale, axis=1)
+
+    return lookup[rampIndex]
+
+
+def _get_valid_cells(array, noDataValue):
+    """
+    Mask of the cells of an array that are finite and don't have the no data value.
+    """
+    valid = np.isfinite(array) if array.dtype.kind == 'f' else np.ones(array.shape, dtype=bool)
+
+    if noDataValue is not None:
+        valid &= array != noDataValue
+
+    return valid
+
+
+def encode_png(rgba, compressionLevel=1):
+    """
+    Encode RGBA pixels as a PNG image.
+
+    Args:
+        rgba (:class:`numpy.ndarray`): Array of uint8 RGBA pixels with shape (height, width, 4).
+        compressionLevel (int, optional): zlib compression level from 1 (fastest) to 9 (smallest). Defaults to 1.
+
+    Returns:
+        bytes: Contents of the PNG file.
+    """
+    height, width = rgba.shape[:2]
+
+    # Each scanline starts with filter type 0 (none)
+    scanlines = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = np.ascontiguousarray(rgba, dtype=np.uint8).reshape(height, width * 4)
+
+    def chunk(chunkType, data):
+        return struct.pack('>I', len(data)) + chunkType + data + \
+            struct.pack('>I', zlib.crc32(chunkType + data) & 0xffffffff)
+
+    return b''.join((b'\x89PNG\r\n\x1a\n',
+                     chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)),
+                     chunk(b'IDAT', zlib.compress(scanlines.tobytes(), compressionLevel)),
+                     chunk(b'IEND', b'')))
+
+
+def get_lat_lon_bounds(north, south, east, west, srid):
+    """
+    Transform the extent of a raster to WGS 84 longitude and latitude. The extent is sampled along its edges, so the
+    result is the bounding box of the transformed extent.
+
+    Args:
+        north (float): North coordinate of the extent.
+        south (float): South coordinate of the extent.
+        east (float): East coordinate of the extent.
+        west (float): West coordinate of the extent.
+        srid (int): Spatial reference id of the coordinates.
+
+    Returns:
+        tuple: North, south, east and west in decimal degrees.
+    """
+    if _isWgs84(srid):
+        return north, south, east, west
+
+    samples = np.linspace(0.0, 1.0, 11)
+    xs = np.concatenate((west + (east - west) * samples, np.full(11, east),
+                         west + (east - west) * samples, np.full(11, west)))
+    ys = np.concatenate((np.full(11, north), south + (north - south) * samples,
+                         np.full(11, south), south + (north - south) * samples))
+
+    lons, lats = _transform(xs, ys, srid, 4326)
+
+    return float(np.max(lats)), float(np.min(lats)), float(np.max(lons)), float(np.min(lons))
+
+
+def warp_to_lat_lon(rgba, geotransform, srid, controlSpacing=16):
+    """
+    Warp an image of a raster to a regular WGS 84 longitude and latitude grid, so it is registered correctly when it
+    is draped over the bounding box of the raster (e.g.: in a KML ground overlay). Each pixel of the warped image takes
+    the color of the nearest pixel of the image (nearest neighbour) and pixels outside of the raster are transparent.
+    Only a control grid of pixels is transformed with pyproj, the coordinates of the other pixels are interpolated
+    bilinearly between them.
+
+    Args:
+        rgba (:class:`numpy.ndarray`): Array of uint8 RGBA colors with shape (rows, columns, 4).
+        geotransform (tuple): GDAL-style geotransform of the pixels of the image.
+        srid (int): Spatial reference id of the geotransform. Images in WGS 84 (4326 or None) are not warped.
+        controlSpacing (int, optional): Number of pixels between the points of the control grid. Use 1 to transform
+            every pixel. Defaults to 16.
+
+    Returns:
+        tuple: The warped image with the same shape and its north, south, east and west in decimal degrees.
+    """
+    rows, columns = rgba.shape[:2]
+    west, cellWidth, _, north, _, cellHeight = geotransform
+    east = west + columns * cellWidth
+    south = north + rows * cellHeight
+    bounds = get_lat_lon_bounds(north, south, east, west, srid)
+
+    if _isWgs84(srid):
+        return rgba, bounds
+
+    # Centers of the pixels of the control grid of the warped image, transformed back to the coordinates of the image
+    latNorth, latSouth, lonEast, lonWest = bounds
+    controlRows = _get_control_points(rows, controlSpacing)
+    controlColumns = _get_control_points(columns, controlSpacing)
+    lons = lonWest + (controlColumns + 0.5) * (lonEast - lonWest) / columns
+    lats = latNorth - (controlRows + 0.5) * (latNorth - latSouth) / rows
+    lonGrid, latGrid = np.meshgrid(lons, lats)
+    xs, ys = _transform(lonGrid.ravel(), latGrid.ravel(), 4326, srid)
+
+    shape = (len(controlRows), len(controlColumns))
+    xs = _interpolate_control_grid(np.asarray(xs).reshape(shape), controlRows, controlColumns, rows, columns)
+    ys = _interpolate_control_grid(np.asarray(ys).reshape(shape), controlRows, controlColumns, rows, columns)
+
+    sourceColumns = np.floor((xs.ravel() - west) / cellWidth)
+    sourceRows = np.floor((ys.ravel() - north) / cellHeight)
+    inside = (sourceColumns >= 0) & (sourceColumns < columns) & (sourceRows >= 0) & (sourceRows < rows)
+
+    warped = np.zeros((rows * columns, 4), dtype=np.uint8)
+    warped[inside] = rgba[sourceRows[inside].astype(np.int64), sourceColumns[inside].astype(np.int64)]
+
+    return warped.reshape(rows, columns, 4), bounds
+
+
+def _get_control_points(count, spacing):
+    """
+    Indices of every spacing-th pixel along an axis of an image, including the last pixel.
+    """
+    return np.unique(np.append(np.arange(0, count, max(int(spacing), 1)), count - 1)).astype(np.float64)
+
+
+def _interpolate_control_grid(values, controlRows, controlColumns, rows, columns):
+    """
+    Bilinearly interpolate values given at the points of a control grid to every pixel of an image.
+    """
+    def weights(count, controlPoints):
+        # Control points before and after each pixel and the weight of the one after
+        if len(controlPoints) == 1:
+            first = np.zeros(count, dtype=np.intp)
+            return first, first, np.zeros(count)
+
+        index = np.arange(count)
+        upper = np.clip(np.searchsorted(controlPoints, index, side='right'), 1, len(controlPoints) - 1)
+        lower = upper - 1
+        weight = (index - controlPoints[lower]) / (controlPoints[upper] - controlPoints[lower])
+        return lower, upper, weight
+
+    rowLower, rowUpper, rowWeight = weights(rows, controlRows)
+    columnLower, columnUpper, columnWeight = weights(columns, controlColumns)
+
+    # Interpolate along the control rows, then between them
+    alongRows = values[:, columnLower] * (1.0 - columnWeight) + values[:, columnUpper] * columnWeight
+
+    return alongRows[rowLower] * (1.0 - rowWeight)[:, np.newaxis] + alongRows[rowUpper] * rowWeight[:, np.newaxis]
+
+
+def _isWgs84(srid):
+    """
+    Check whether coordinates are WGS 84 longitude and latitude. Coordinates without srid are assumed to be.
+    """
+    return srid is None or int(srid) == 4326
+
+
+def _transform(xs, ys, sourceSrid, targetSrid):
+    """
+    Transform coordinates between spatial reference systems with pyproj.
+    """
+    try:
+        from pyproj import Transformer
+        transformer = Transformer.from_crs('epsg:{0}'.format(sourceSrid), 'epsg:{0}'.format(targetSrid),
+                                           always_xy=True)
+        return transformer.transform(xs, ys)
+    except ImportError:
+        from pyproj import Proj, transform
+        return transform(Proj(init='epsg:{0}'.format(sourceSrid)), Proj(init='epsg:{0}'.format(targetSrid)), xs, ys)
+
+
+def get_kml_ground_overlay(documentName, north, south, east, west, drawOrder=0, href='raster.png'):
+    """
+    Create a KML document with a ground overlay of an image.
+
+    Args:
+        documentName (str): Name of the KML document.
+        north (float): North latitude of the image.
+        south (float): South latitude of the image.
+        east (float): East longitude of the image.
+        west (float): West longitude of the image.
+        drawOrder (int, optional): Draw order of the image. Defaults to 0.
+        href (str, optional): Path to the image relative to the KML document. Defaults to 'raster.png'.
+
+    Returns:
+        str: KML string.
+    """
+    kml = ET.Element('kml', xmlns='http://www.opengis.net/kml/2.2')
+    document = ET.SubElement(kml, 'Document')
+    ET.SubElement(document, 'name').text = documentName
+
+    groundOverlay = ET.SubElement(document, 'GroundOverlay')
+    ET.SubElement(groundOverlay, 'name').text = documentName
+    ET.SubElement(groundOverlay, 'drawOrder').text = str(drawOrder)
+
+    icon = ET.SubElement(groundOverlay, 'Icon')
+    ET.SubElement(icon, 'href').text = href
+
+    latLonBox = ET.SubElement(groundOverlay, 'LatLonBox')
+    ET.SubElement(latLonBox, 'north').text = str(north)
+    ET.SubElement(latLonBox, 'south').text = str(south)
+    ET.SubElement(latLonBox, 'east').text = str(east)
+    ET.SubElement(latLonBox, 'west').text = str(west)
+
+    return ET.tostring(kml, encoding='unicode') if str is not bytes else ET.tostring(kml)
+
+
+def get_kml_grid(array, geotransform, srid, documentName, colorRamp=ColorRampEnum.COLOR_RAMP_HUE, alpha=1.0,
+                 noDataValue=None, discreet=False):
+    """
+    Create a KML document with each cell of a raster represented as a polygon. The cells are grouped in a placemark
+    per value, like the documents created by the mapkit RasterConverter from PostGIS rasters.
+
+    Args:
+        array (:class:`numpy.ndarray`): Two dimensional array of the raster values.
+        geotransform (tuple): GDAL-style geotransform of the raster.
+        srid (int): Spatial reference id of the geotransform. Coordinates in WGS 84 (4326 or None) are not transformed.
+        documentName (str): Name of the KML document.
+        colorRamp (:mod:`mapkit.ColorRampGenerator.ColorRampEnum` or dict, optional): Color ramp (see
+            ``get_color_ramp``). Defaults to the hue color ramp.
+        alpha (float, optional): Opacity between 0.0 and 1.0. Defaults to 1.0.
+        noDataValue (float, optional): Value of the cells that are excluded. Defaults to None.
+        discreet (bool, optional): If True, each unique value is given a distinct color. Defaults to False.
+
+    Returns:
+        str: KML string.
+    """
+    def cellRings(cells):
+        return [[[(row, column), (row, column + 1), (row + 1, column + 1), (row + 1, column), (row, column)]]
+                for row, column in cells]
+
+    return _get_kml_polygons(array, geotransform, srid, documentName, colorRamp, alpha, noDataValue, discreet,
+                             cellRings, clustered=False)
+
+
+def get_kml_clusters(array, geotransform, srid, documentName, colorRamp=ColorRampEnum.COLOR_RAMP_HUE, alpha=1.0,
+                     noDataValue=None, discreet=False):
+    """
+    Create a KML document with adjacent cells of a raster with the same value (sharing a side) aggregated into
+    polygons. The polygons are grouped in a placemark per value, like the documents created by the mapkit
+    RasterConverter from PostGIS rasters.
+
+    Args:
+        array (:class:`numpy.ndarray`): Two dimensional array of the raster values.
+        geotransform (tuple): GDAL-style geotransform of the raster.
+        srid (int): Spatial reference id of the geotransform. Coordinates in WGS 84 (4326 or None) are not transformed.
+        documentName (str): Name of the KML document.
+        colorRamp (:mod:`mapkit.ColorRampGenerator.ColorRampEnum` or dict, optional): Color ramp (see
+            ``get_color_ramp``). Defaults to the hue color ramp.
+        alpha (float, optional): Opacity between 0.0 and 1.0. Defaults to 1.0.
+        noDataValue (float, optional): Value of the cells that are excluded. Defaults to None.
+        discreet (bool, optional): If True, each unique value is given a distinct color. Defaults to False.
+
+    Returns:
+        str: KML string.
+    """
+    return _get_kml_polygons(array, geotransform, srid, documentName, colorRamp, alpha, noDataValue, discreet,
+                             _trace_clusters, clustered=True)
+
+
+def _get_kml_polygons(array, geotransform, srid, documentName, colorRamp, alpha, noDataValue, discreet, getRings,
+                      clustered):
+    """
+    Create a KML document with a placemark per value of a raster. getRings is called with the cells of the value (or
+    of each cluster of the value if clustered is True) and returns polygons as lists of rings of (row, column) corners
+    of the cells, the outer ring first.
+    """
+    array = np.asarray(array)
+    rgba = render_rgba(array, colorRamp=colorRamp, alpha=alpha, noDataValue=noDataValue, discreet=discreet)
+    valid = _get_valid_cells(array, noDataValue)
+
+    cellRows, cellColumns = np.nonzero(valid)
+    cellValues = array[cellRows, cellColumns]
+    labels = _label_clusters(array, valid)[cellRows, cellColumns] if clustered else np.zeros(len(cellValues))
+
+    # Cells sorted by value, then by cluster
+    order = np.lexsort((labels, cellValues))
+    cellRows, cellColumns, cellValues, labels = cellRows[order], cellColumns[order], cellValues[order], labels[order]
+    groupStarts = np.flatnonzero(np.concatenate(([True], (cellValues[1:] != cellValues[:-1]) |
+                                                 (labels[1:] != labels[:-1]), [True])))
+
+    groups = []
+    for start, end in zip(groupStarts[:-1], groupStarts[1:]):
+        cells = list(zip(cellRows[start:end].tolist(), cellColumns[start:end].tolist()))
+        groups.append((cellValues[start].item(), tuple(rgba[cellRows[start], cellColumns[start]]),
+                       getRings(cells)))
+
+    # Transform the corners of all rings at once
+    corners = np.array([corner for _, _, polygons in groups for polygon in polygons for ring in polygon
+                        for corner in ring], dtype=np.float64).reshape(-1, 2)
+    west, cellWidth, _, north, _, cellHeight = geotransform
+    xs = west + corners[:, 1] * cellWidth
+    ys = north + corners[:, 0] * cellHeight
+
+    if not _isWgs84(srid) and len(corners):
+        xs, ys = _transform(xs, ys, srid, 4326)
+
+    coordinates = iter(zip(np.asarray(xs).tolist(), np.asarray(ys).tolist()))
+
+    kml = ET.Element('kml', xmlns='http://www.opengis.net/kml/2.2')
+    document = ET.SubElement(kml, 'Document')
+    ET.SubElement(document, 'name').text = documentName
+
+    placemarkValue = None
+    for value, color, polygons in groups:
+        if placemarkValue is None or value != placemarkValue:
+            placemark = ET.SubElement(document, 'Placemark')
+            ET.SubElement(placemark, 'name').text = str(value)
+
+            style = ET.SubElement(placemark, 'Style')
+            lineStyle = ET.SubElement(style, 'LineStyle')
+            ET.SubElement(lineStyle, 'color').text = 'FF000000'
+            ET.SubElement(lineStyle, 'width').text = '1'
+            polyStyle = ET.SubElement(style, 'PolyStyle')
+            ET.SubElement(polyStyle, 'color').text = '%02X%02X%02X%02X' % (color[3], color[2], color[1], color[0])
+
+            multiGeometry = ET.SubElement(placemark, 'MultiGeometry')
+
+            extendedData = ET.SubElement(placemark, 'ExtendedData')
+            valueData = ET.SubElement(extendedData, 'Data', name='value')
+            ET.SubElement(valueData, 'value').text = str(value)
+
+            placemarkValue = value
+
+        for polygon in polygons:
+            polygonElement = ET.SubElement(multiGeometry, 'Polygon')
+
+            for index, ring in enumerate(polygon):
+                boundary = ET.SubElement(polygonElement, 'outerBoundaryIs' if index == 0 else 'innerBoundaryIs')
+                linearRing = ET.SubElement(boundary, 'LinearRing')
+                ET.SubElement(linearRing, 'coordinates').text = ' '.join('{0},{1}'.format(*next(coordinates))
+                                                                         for _ in ring)
+
+    # Embed the color ramp in SLD format
+    if groups:
+        values = sorted(set(value for value, _, _ in groups))
+        colors = [tuple(color) for color in get_color_ramp(colorRamp).tolist()]
+        mappedColorRamp = ColorRampGenerator.mapColorRampToValues(colors, values[0], values[-1], alpha=alpha)
+
+        if discreet:
+            colorMap = mappedColorRamp.getColorMapAsDiscreetSLD(values)
+        else:
+            colorMap = mappedColorRamp.getColorMapAsContinuousSLD()
+
+        document.append(ET.fromstring(colorMap))
+
+    return ET.tostring(kml, encoding='unicode') if str is not bytes else ET.tostring(kml)
+
+
+def _label_clusters(array, valid):
+    """
+    Label the clusters of valid cells with the same value that share a side. Runs of equal cells of each row are joined
+    with the overlapping runs of the previous row.
+    """
+    rows, columns = array.shape
+    labels = np.full((rows, columns), -1, dtype=np.int64)
+    parents = []
+
+    def find(run):
+        while parents[run] != run:
+            parents[run] = parents[parents[run]]
+            run = parents[run]
+        return run
+
+    runs = []
+    previousRuns = []
+    for row in range(rows):
+        rowValues, rowValid = array[row], valid[row]
+        changes = np.flatnonzero((rowValues[1:] != rowValues[:-1]) | (rowValid[1:] != rowValid[:-1])) + 1
+        starts = np.concatenate(([0], changes)).tolist()
+        ends = np.concatenate((changes, [columns])).tolist()
+
+        rowRuns = []
+        previous = 0
+        for start, end in zip(starts, ends):
+            if not rowValid[start]:
+                continue
+
+            run = len(parents)
+            parents.append(run)
+            runs.append((row, start, end))
+            rowRuns.append((start, end, run))
+
+            # Join the runs of the previous row that overlap with the same value
+            while previous < len(previousRuns) and previousRuns[previous][1] <= start:
+                previous += 1
+
+            index = previous
+            while index < len(previousRuns) and previousRuns[index][0] < end:
+                previousRun = previousRuns[index][2]
+
+                if array[row - 1, previousRuns[index][0]] == rowValues[start]:
+                    parents[find(run)] = find(previousRun)
+
+                index += 1
+
+        previousRuns = rowRuns
+
+    for run, (row, start, end) in enumerate(runs):
+        labels[row, start:end] = find(run)
+
+    return labels
+
+
+def _trace_clusters(cells):
+    """
+    Trace the outline of a cluster of cells that share sides as a polygon: the outer ring followed by the rings of its
+    holes, as lists of (row, column) corners.
+    """
+    cellSet = set(cells)
+
+    # Sides of the cluster, directed clockwise around the cells (rows increase to the south)
+    outgoing = {}
+    for row, column in cells:
+        if (row - 1, column) not in cellSet:
+            outgoing.setdefault((row, column), []).append((row, column + 1))
+        if (row, column + 1) not in cellSet:
+            outgoing.setdefault((row, column + 1), []).append((row + 1, column + 1))
+        if (row + 1, column) not in cellSet:
+            outgoing.setdefault((row + 1, column + 1), []).append((row + 1, column))
+        if (row, column - 1) not in cellSet:
+            outgoing.setdefault((row + 1, column), []).append((row, column))
+
+    rings = []
+    while outgoing:
+        # The first corner of each ring is its north west corner, so it is never between collinear sides
+        start = min(outgoing)
+        ring = [start]
+        vertex, direction = start, None
+
+        while True:
+            ends = outgoing[vertex]
+
+            if direction is not None and len(ends) > 1:
+                # Where the cluster touches itself at a corner, keep following the same cell (turn right first)
+                turns = [(direction[1], -direction[0]), direction, (-direction[1], direction[0])]
+                ends.sort(key=lambda end: turns.index((end[0] - vertex[0], end[1] - vertex[1])))
+
+            end = ends.pop(0)
+            if not ends:
+                del outgoing[vertex]
+
+            nextDirection = (end[0] - vertex[0], end[1] - vertex[1])
+
+            # Drop the corners between collinear sides
+            if nextDirection == direction:
+                ring[-1] = end
+            else:
+                ring.append(end)
+
+            vertex, direction = end, nextDirection
+
+            if vertex == start:
+                break
+
+        rings.append(ring)
+
+    # The outer ring is clockwise and holes are counterclockwise, so the outer ring has the largest signed area
+    def signedArea(ring):
+        return sum(a[1] * b[0] - b[1] * a[0] for a, b in zip(ring[:-1], ring[1:]))
+
+    rings.sort(key=signedArea, reverse=True)
+
+    return [rings]
+
+
+def write_kmz(path, kmlString, pngBinary, archiveName):
+    """
+    Write a KML document and its PNG image to a KMZ archive.
+
+    Args:
+        path (str): Path to the KMZ file.
+        kmlString (str): KML document referencing the image as 'raster.png'.
+        pngBinary (bytes): Contents of the PNG image.
+        archiveName (str): Name of the KML document in the archive without extension.
+    """
+    with ZipFile(path, 'w') as kmz:
+        kmz.writestr(archiveName + '.kml', kmlString)
+        kmz.writestr('raster.png', pngBinary)
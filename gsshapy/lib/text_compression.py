@@ -0,0 +1,130 @@
+"""
+Text Compression
+"""
+from __future__ import unicode_literals
+
+import base64
+from weakref import WeakKeyDictionary
+import zlib
+
+from sqlalchemy.types import String, TypeDecorator
+
+__all__ = ['CompressedText',
+           'compress_text',
+           'decompress_text',
+           'enable_text_compression',
+           'disable_text_compression',
+           'get_text_compression']
+
+# Prefix of compressed values. Uncompressed raster text never starts with it.
+PREFIX = 'zlib:'
+
+_compression_level = None
+
+# Compression levels of single engines, keyed by the dialect of the engine (None disables compression)
+_engine_compression_levels = WeakKeyDictionary()
+
+
+def compress_text(text, level=1):
+    """
+    Compress text with zlib. The result is text, so it can be stored in the existing string columns.
+
+    Args:
+        text (str): Text to compress.
+        level (int, optional): zlib compression level from 1 (fastest) to 9 (smallest). Defaults to 1.
+
+    Returns:
+        str: The compressed text encoded with base64 and prefixed with 'zlib:'.
+    """
+    compressed = zlib.compress(text.encode('utf-8'), level)
+    return PREFIX + base64.b64encode(compressed).decode('ascii')
+
+
+def decompress_text(value):
+    """
+    Decompress text compressed with ``compress_text``. Values that are not compressed are returned as is.
+
+    Args:
+        value (str): Compressed or uncompressed text.
+
+    Returns:
+        str: The uncompressed text.
+    """
+    if value is None or not value.startswith(PREFIX):
+        return value
+
+    return zlib.decompress(base64.b64decode(value[len(PREFIX):])).decode('utf-8')
+
+
+class CompressedText(TypeDecorator):
+    """
+    String column type that compresses values when text compression is enabled (see ``enable_text_compression``).
+
+    Values are decompressed transparently when they are loaded, whether compression is enabled or not, so databases
+    may contain both compressed and uncompressed values. The column is a plain string column in the database.
+    """
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        level = _engine_compression_levels.get(dialect, _compression_level)
+
+        if value is None or level is None:
+            return value
+
+        return compress_text(value, level=level)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+
+def enable_text_compression(level=1, engine=None):
+    """
+    Compress raster text columns (the rasterText of RasterMapFile, IndexMap and WMSDatasetRaster) when they are
+    written to the database. This reduces the memory used by in-memory SQLite databases, typically by a factor of
+    three to ten, at the cost of compressing the text on write and decompressing it on access.
+
+    Args:
+        level (int, optional): zlib compression level from 1 (fastest) to 9 (smallest). Defaults to 1.
+        engine (:class:`sqlalchemy.engine.Engine`, optional): Only compress the text written through this engine.
+            Defaults to None, which compresses the text written to all databases that have no setting of their own.
+    """
+    global _compression_level
+
+    if engine is not None:
+        _engine_compression_levels[engine.dialect] = level
+    else:
+        _compression_level = level
+
+
+def disable_text_compression(engine=None):
+    """
+    Disable the compression of raster text columns. Values already compressed are still decompressed on access.
+
+    Args:
+        engine (:class:`sqlalchemy.engine.Engine`, optional): Only disable compression for this engine. Defaults to
+            None, which disables compression for all databases that have no setting of their own.
+    """
+    global _compression_level
+
+    if engine is not None:
+        _engine_compression_levels[engine.dialect] = None
+    else:
+        _compression_level = None
+
+
+def get_text_compression(engine=None):
+    """
+    Get the compression level of raster text columns.
+
+    Args:
+        engine (:class:`sqlalchemy.engine.Engine`, optional): Get the level of this engine. Defaults to None, which
+            gets the level of databases that have no setting of their own.
+
+    Returns:
+        int: The zlib compression level or None if compression is disabled.
+    """
+    if engine is not None:
+        return _engine_compression_levels.get(engine.dialect, _compression_level)
+
+    return _compression_level
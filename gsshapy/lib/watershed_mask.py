@@ -0,0 +1,93 @@
+"""
+Watershed Mask
+"""
+from __future__ import unicode_literals
+
+import numpy as np
+
+from .grass_ascii import parse_grass_ascii
+
+__all__ = ['WatershedMask']
+
+
+class WatershedMask(object):
+    """
+    Parsed watershed mask of a project.
+
+    Args:
+        values (:class:`numpy.ndarray`): Two dimensional integer array of the mask values.
+        geotransform (tuple): GDAL-style geotransform of the mask.
+    """
+
+    def __init__(self, values, geotransform):
+        self.values = np.asarray(values, dtype=np.int32)
+        self.values.flags.writeable = False
+        self.geotransform = tuple(geotransform)
+        self._array = None
+        self._activeCells = None
+        self._statusString = None
+
+    @classmethod
+    def fromMaskMap(cls, maskMap, session):
+        """
+        Parse the mask from a mask map. The PostGIS raster is used if it is stored, otherwise the raster text.
+
+        Args:
+            maskMap (:class:`gsshapy.orm.RasterMapFile`): Mask map.
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled
+                database.
+
+        Returns:
+            WatershedMask: The parsed mask or None if the mask map has neither raster nor text.
+        """
+        if maskMap.raster is not None:
+            rasterText = maskMap.getAsGrassAsciiGrid(session)
+
+            if rasterText is not None:
+                return cls(*parse_grass_ascii(rasterText, dtype='int32'))
+
+        rasterArray = maskMap.as_array()
+
+        if rasterArray is None:
+            return None
+
+        return cls(*rasterArray)
+
+    @property
+    def shape(self):
+        """
+        Number of rows and columns of the mask.
+        """
+        return self.values.shape
+
+    @property
+    def array(self):
+        """
+        Read-only boolean array that is True for the active cells of the mask.
+        """
+        if self._array is None:
+            self._array = self.values != 0
+            self._array.flags.writeable = False
+
+        return self._array
+
+    @property
+    def activeCells(self):
+        """
+        Read-only array of the flat (row-major) indices of the active cells.
+        """
+        if self._activeCells is None:
+            self._activeCells = np.flatnonzero(self.values)
+            self._activeCells.flags.writeable = False
+
+        return self._activeCells
+
+    @property
+    def statusString(self):
+        """
+        Mask values in the format of the status rasters of WMS dataset files: one value per line.
+        """
+        if self._statusString is None:
+            self._statusString = '\r\n'.join(str(value) for value in self.values.ravel().tolist()) + '\r\n'
+
+        return self._statusString
@@ -0,0 +1,175 @@
+"""
+WMS Dataset Aggregates
+"""
+from __future__ import unicode_literals
+
+import numpy as np
+
+__all__ = ['REDUCTIONS',
+           'DEFAULT_REDUCTIONS',
+           'TimeStepAggregator']
+
+#: Per-cell reductions supported by TimeStepAggregator
+REDUCTIONS = ('max',             # Maximum value
+              'min',             # Minimum value
+              'mean',            # Mean value of the time steps
+              'time_of_max',     # Timestamp of the first time step with the maximum value
+              'first_above',     # Timestamp of the first time step with a value above the threshold
+              'duration_above',  # Time with values above the threshold
+              'final')           # Value of the last time step
+
+DEFAULT_REDUCTIONS = ('max', 'time_of_max', 'duration_above', 'final')
+
+
+class TimeStepAggregator(object):
+    """
+    Compute per-cell reductions of the time steps of a gridded dataset in a single pass. Only the running accumulators
+    are kept in memory, so time steps can be added one at a time as they are read from file or from the database.
+
+    The duration above the threshold is the sum of the intervals between consecutive time steps that end with a value
+    above the threshold. Durations and timestamps are in the units of the timestamps (minutes for WMS datasets).
+
+    Args:
+        shape (tuple): Number of rows and columns of the grid.
+        geotransform (tuple, optional): GDAL-style geotransform of the grid.
+        reductions (iterable, optional): Names of the reductions to compute (see REDUCTIONS). Defaults to max,
+            time_of_max, duration_above and final.
+        threshold (float, optional): Threshold of first_above and duration_above. Defaults to 0.0.
+        mask (:class:`numpy.ndarray`, optional): Boolean array that is True for the active cells. The results are NaN
+            for the other cells. Defaults to all cells.
+    """
+
+    def __init__(self, shape, geotransform=None, reductions=DEFAULT_REDUCTIONS, threshold=0.0, mask=None):
+        unknown = [reduction for reduction in reductions if reduction not in REDUCTIONS]
+
+        if unknown:
+            raise ValueError('Unknown reductions: {0}. Valid reductions are: {1}.'.format(
+                ', '.join(unknown), ', '.join(REDUCTIONS)))
+
+        self.shape = tuple(shape)
+        self.geotransform = tuple(geotransform) if geotransform is not None else None
+        self.reductions = tuple(reductions)
+        self.threshold = threshold
+        self.mask = np.asarray(mask, dtype=bool) if mask is not None else None
+        self.count = 0
+        self.lastTimestamp = None
+        self._accumulators = dict()
+
+        # The mean is derived from the sum and the time of the maximum needs the maximum
+        self._needed = set(self.reductions) - {'mean'}
+
+        if 'mean' in self.reductions:
+            self._needed.add('sum')
+
+        if 'time_of_max' in self.reductions:
+            self._needed.add('max')
+
+    @classmethod
+    def fromWatershedMask(cls, watershedMask, reductions=DEFAULT_REDUCTIONS, threshold=0.0):
+        """
+        Create an aggregator for the grid and the active cells of a watershed mask.
+
+        Args:
+            watershedMask (:class:`gsshapy.lib.watershed_mask.WatershedMask`): The watershed mask.
+            reductions (iterable, optional): Names of the reductions to compute (see REDUCTIONS).
+            threshold (float, optional): Threshold of first_above and duration_above. Defaults to 0.0.
+
+        Returns:
+            TimeStepAggregator: The aggregator.
+        """
+        return cls(watershedMask.shape, watershedMask.geotransform, reductions=reductions, threshold=threshold,
+                   mask=watershedMask.array)
+
+    def update(self, timestamp, grid):
+        """
+        Add a time step. Time steps must be added in order of their timestamps.
+
+        Args:
+            timestamp (float): Timestamp of the time step.
+            grid (:class:`numpy.ndarray`): Values of the time step with shape (rows, columns).
+        """
+        if grid is None or np.shape(grid) != self.shape:
+            raise ValueError('Time step at {0} does not have one value per cell of the {1} x {2} grid.'.format(
+                timestamp, *self.shape))
+
+        grid = np.asarray(grid, dtype=np.float64)
+        accumulators = self._accumulators
+        needed = self._needed
+
+        if self.count == 0:
+            # Accumulators are copies, so the caller may reuse the array of the time step
+            for name in needed & {'max', 'min', 'sum', 'final'}:
+                accumulators[name] = grid.copy()
+
+            if 'time_of_max' in needed:
+                accumulators['time_of_max'] = np.full(self.shape, timestamp, dtype=np.float64)
+
+            if 'first_above' in needed:
+                accumulators['first_above'] = np.where(grid > self.threshold, timestamp, np.nan)
+
+            if 'duration_above' in needed:
+                accumulators['duration_above'] = np.zeros(self.shape, dtype=np.float64)
+
+        else:
+            if 'time_of_max' in needed:
+                accumulators['time_of_max'][grid > accumulators['max']] = timestamp
+
+            if 'max' in needed:
+                np.fmax(accumulators['max'], grid, out=accumulators['max'])
+
+            if 'min' in needed:
+                np.fmin(accumulators['min'], grid, out=accumulators['min'])
+
+            if 'sum' in needed:
+                accumulators['sum'] += grid
+
+            if 'final' in needed:
+                np.copyto(accumulators['final'], grid)
+
+            if 'first_above' in needed or 'duration_above' in needed:
+                exceeds = grid > self.threshold
+
+                if 'first_above' in needed:
+                    firstAbove = accumulators['first_above']
+                    firstAbove[exceeds & np.isnan(firstAbove)] = timestamp
+
+                if 'duration_above' in needed:
+                    accumulators['duration_above'][exceeds] += timestamp - self.lastTimestamp
+
+        self.count += 1
+        self.lastTimestamp = timestamp
+
+    def addTimeStep(self, timeStep, timeStepRaster):
+        """
+        Add a parsed time step, e.g.: as the callback of ``WMSDatasetFile.read``.
+
+        Args:
+            timeStep (int): Number of the time step.
+            timeStepRaster (dict): Parsed time step with the 'timestamp' and the 'cellValues'.
+        """
+        self.update(timeStepRaster['timestamp'], timeStepRaster['cellValues'])
+
+    def results(self):
+        """
+        Retrieve the reductions of the time steps added so far.
+
+        Returns:
+            dict: Arrays with shape (rows, columns) of the reductions, keyed by name. Cells outside of the mask are NaN.
+        """
+        if self.count == 0:
+            raise ValueError('No time steps were added to the aggregator.')
+
+        results = dict()
+
+        for reduction in self.reductions:
+            if reduction == 'mean':
+                result = self._accumulators['sum'] / self.count
+            else:
+                result = self._accumulators[reduction].copy()
+
+            if self.mask is not None:
+                result[~self.mask] = np.nan
+
+            results[reduction] = result
+
+        return results
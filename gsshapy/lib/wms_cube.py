@@ -0,0 +1,273 @@
+"""
+WMS Dataset Cube
+"""
+from __future__ import unicode_literals
+
+from io import open as io_open
+import json
+import os
+import uuid
+
+import numpy as np
+
+from ..util.files import replace_file
+
+__all__ = ['WMSDatasetCube',
+           'WMSDatasetCubeWriter',
+           'cube_exists',
+           'remove_cube']
+
+
+class WMSDatasetCube(object):
+    """
+    Values of all time steps of a WMS dataset stored on disk as a single (time, active cell) binary cube.
+
+    The cube is memory-mapped, so only the time steps and cells that are accessed are read from disk. A cube consists
+    of three files with the same prefix: the raw values (<prefix>.cube), the flat (row-major) grid indices of the
+    active cells (<prefix>_cells.npy) and a JSON file with the timestamps and the grid (<prefix>.json). Cubes are
+    created with ``WMSDatasetCubeWriter``.
+
+    Args:
+        prefix (str): Path to the files of the cube without extension.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+        with io_open(prefix + '.json', 'r') as f:
+            meta = json.load(f)
+
+        self.timestamps = np.array(meta['timestamps'], dtype=np.float64)
+        self.iStatus = np.array(meta['iStatus'], dtype=np.int32)
+        self.shape = tuple(meta['shape'])
+        self.geotransform = tuple(meta['geotransform']) if meta['geotransform'] is not None else None
+        self.activeCells = np.load(prefix + '_cells.npy', mmap_mode='r')
+
+        if len(self.timestamps) and len(self.activeCells):
+            self.values = np.memmap(prefix + '.cube', dtype=meta['dtype'], mode='r',
+                                    shape=(len(self.timestamps), len(self.activeCells)))
+        else:
+            self.values = np.zeros((len(self.timestamps), len(self.activeCells)), dtype=meta['dtype'])
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def timeSlice(self, start=None, end=None):
+        """
+        Find the time steps with timestamps between start and end (both inclusive).
+
+        Args:
+            start (float, optional): First timestamp. Defaults to the first time step.
+            end (float, optional): Last timestamp. Defaults to the last time step.
+
+        Returns:
+            slice: Slice of the time steps.
+        """
+        first = 0 if start is None else int(np.searchsorted(self.timestamps, start, side='left'))
+        last = len(self.timestamps) if end is None else int(np.searchsorted(self.timestamps, end, side='right'))
+        return slice(first, last)
+
+    def getValues(self, start=None, end=None):
+        """
+        Retrieve the values of the time steps between start and end as a read-only view of the cube.
+
+        Args:
+            start (float, optional): First timestamp. Defaults to the first time step.
+            end (float, optional): Last timestamp. Defaults to the last time step.
+
+        Returns:
+            :class:`numpy.ndarray`: Array with shape (time steps, active cells).
+        """
+        return self.values[self.timeSlice(start, end)]
+
+    def getTimeStep(self, index, noDataValue=0):
+        """
+        Retrieve the values of a time step on the grid.
+
+        Args:
+            index (int): Index of the time step.
+            noDataValue (float, optional): Value of the inactive cells. Defaults to 0.
+
+        Returns:
+            :class:`numpy.ndarray`: Array with shape (rows, columns).
+        """
+        grid = np.full(self.shape[0] * self.shape[1], noDataValue, dtype=self.values.dtype)
+        grid[self.activeCells] = self.values[index]
+        return grid.reshape(self.shape)
+
+    def getCellSeries(self, row, column, start=None, end=None):
+        """
+        Retrieve the values of a cell for the time steps between start and end, e.g.: the hydrograph of a cell.
+
+        Args:
+            row (int): Row of the cell, counted from the north.
+            column (int): Column of the cell, counted from the west.
+            start (float, optional): First timestamp. Defaults to the first time step.
+            end (float, optional): Last timestamp. Defaults to the last time step.
+
+        Returns:
+            tuple: Timestamps and values of the cell.
+        """
+        cell = row * self.shape[1] + column
+        position = int(np.searchsorted(self.activeCells, cell))
+
+        if position == len(self.activeCells) or self.activeCells[position] != cell:
+            raise ValueError('Cell at row {0} and column {1} is not an active cell.'.format(row, column))
+
+        timeSlice = self.timeSlice(start, end)
+        return self.timestamps[timeSlice], np.array(self.values[timeSlice, position])
+
+    def to_xarray(self, start=None, end=None):
+        """
+        Retrieve the values of the time steps between start and end as an xarray DataArray with dimensions time and
+        cell. The cell coordinate is the flat grid index of each active cell. The values are not copied.
+
+        Returns:
+            :class:`xarray.DataArray`: Values of the cube.
+        """
+        import xarray as xr
+
+        timeSlice = self.timeSlice(start, end)
+
+        return xr.DataArray(self.values[timeSlice],
+                            dims=('time', 'cell'),
+                            coords={'time': self.timestamps[timeSlice],
+                                    'cell': np.asarray(self.activeCells),
+                                    'iStatus': ('time', self.iStatus[timeSlice])},
+                            attrs={'rows': self.shape[0], 'columns': self.shape[1]})
+
+    def remove(self):
+        """
+        Delete the files of the cube.
+        """
+        _removeFiles(self.prefix)
+
+
+class WMSDatasetCubeWriter(object):
+    """
+    Write the time steps of a WMS dataset to a cube one at a time (see ``WMSDatasetCube``). The cube is only readable
+    after the writer is closed.
+
+    Args:
+        prefix (str): Path to the files of the cube without extension.
+        activeCells (:class:`numpy.ndarray`): Flat (row-major) grid indices of the active cells in ascending order.
+        shape (tuple): Number of rows and columns of the grid.
+        geotransform (tuple, optional): GDAL-style geotransform of the grid.
+        dtype (str, optional): NumPy data type of the values. Defaults to 'float32'.
+    """
+
+    def __init__(self, prefix, activeCells, shape, geotransform=None, dtype='float32'):
+        self.prefix = prefix
+        self.activeCells = np.asarray(activeCells, dtype=np.int64)
+        self.shape = tuple(shape)
+        self.geotransform = geotransform
+        self.dtype = np.dtype(dtype)
+        self.timestamps = []
+        self.iStatus = []
+
+        directory = os.path.dirname(prefix)
+
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # Remove the description of an existing cube first, so that it is never read with the new values
+        _removeFiles(prefix)
+        self._file = open(prefix + '.cube', 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._file.closed:
+            return
+
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def append(self, timestamp, iStatus, cellValues):
+        """
+        Append a time step.
+
+        Args:
+            timestamp (float): Timestamp of the time step.
+            iStatus (int): Status flag of the time step.
+            cellValues (:class:`numpy.ndarray`): Values of all cells of the grid.
+        """
+        values = np.asarray(cellValues).ravel()
+
+        if values.size != self.shape[0] * self.shape[1]:
+            raise ValueError('Time step has {0} values, but the grid has {1} cells.'.format(
+                values.size, self.shape[0] * self.shape[1]))
+
+        self._file.write(values[self.activeCells].astype(self.dtype).tobytes())
+        self.timestamps.append(float(timestamp))
+        self.iStatus.append(int(iStatus))
+
+    def close(self):
+        """
+        Finish the cube.
+
+        Returns:
+            WMSDatasetCube: The cube.
+        """
+        self._file.close()
+        np.save(self.prefix + '_cells.npy', self.activeCells)
+
+        meta = {'timestamps': self.timestamps,
+                'iStatus': self.iStatus,
+                'shape': list(self.shape),
+                'geotransform': list(self.geotransform) if self.geotransform is not None else None,
+                'dtype': self.dtype.name}
+
+        # The JSON file is written last and atomically, because it marks the cube as complete
+        tempPath = '{0}.{1}.tmp'.format(self.prefix + '.json', uuid.uuid4().hex)
+
+        with io_open(tempPath, 'w') as f:
+            f.write(json.dumps(meta))
+
+        replace_file(tempPath, self.prefix + '.json')
+
+        return WMSDatasetCube(self.prefix)
+
+    def abort(self):
+        """
+        Discard the cube.
+        """
+        self._file.close()
+        _removeFiles(self.prefix)
+
+
+def cube_exists(prefix):
+    """
+    Check if all files of a cube exist.
+
+    Args:
+        prefix (str): Path to the files of the cube without extension.
+
+    Returns:
+        bool: True if the cube can be opened.
+    """
+    return all(os.path.isfile(path) for path in (prefix + '.json', prefix + '.cube', prefix + '_cells.npy'))
+
+
+def remove_cube(prefix):
+    """
+    Delete the files of a cube without opening it. Missing files are ignored.
+
+    Args:
+        prefix (str): Path to the files of the cube without extension.
+    """
+    _removeFiles(prefix)
+
+
+def _removeFiles(prefix):
+    """
+    Delete the files of a cube.
+    """
+    for path in (prefix + '.json', prefix + '.cube', prefix + '_cells.npy'):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -7,9 +7,11 @@
 * License: BSD 2-Clause
 ********************************************************************************
 """
-from future.utils import iteritems
+
+import numpy as np
 
 from . import parsetools as pt
+from .grass_ascii import _parse_values
 
 def datasetHeaderChunk(key, lines):
     """
@@ -35,93 +37,135 @@ def datasetHeaderChunk(key, lines):
               'objectType': None,
               'vectorType': None}
 
-    chunks = pt.chunk(KEYWORDS, lines)
+    for key, chunk in pt.chunkIter(KEYWORDS, lines):
+        schunk = pt.splitLine(chunk[0])
 
-    for key, chunkList in iteritems(chunks):
+        if key == 'ND':
+            result['numberData'] = int(schunk[1])
 
-        for chunk in chunkList:
-            schunk = pt.splitLine(chunk[0])
+        elif key == 'NC':
+            result['numberCells'] = int(schunk[1])
 
-            if key == 'ND':
-                result['numberData'] = int(schunk[1])
+        elif key == 'NAME':
+            result['name'] = schunk[1]
 
-            elif key == 'NC':
-                result['numberCells'] = int(schunk[1])
+        elif key == 'OBJID':
+            result['objectID'] = int(schunk[1])
 
-            elif key == 'NAME':
-                result['name'] = schunk[1]
+        elif key == 'OBJTYPE':
+            result['objectType'] = schunk[1]
 
-            elif key == 'OBJID':
-                result['objectID'] = int(schunk[1])
+        elif key == 'VECTYPE':
+            result['vectorType'] = schunk[1]
 
-            elif key == 'OBJTYPE':
-                result['objectType'] = schunk[1]
+        elif key in TYPE_KEYS:
+            result['type'] = schunk[0]
 
-            elif key == 'VECTYPE':
-                result['vectorType'] = schunk[1]
+    return result
 
-            elif key in TYPE_KEYS:
-                result['type'] = schunk[0]
+
+def datasetScalarTimeStepChunk(lines, numberColumns, numberCells):
+    """
+    Process the time step chunks for scalar datasets. The cellArray is the values of the time step as the string of a
+    nested list with a row per numberColumns values. Kept for backwards compatibility, use datasetScalarTimeStepArray.
+    """
+    timeStep = datasetScalarTimeStepArray(lines, numberColumns, numberCells, parseValues=False)
+    values = timeStep['rasterText'].split()
+    rows = [', '.join(values[index:index + numberColumns]) for index in range(0, len(values), numberColumns)]
+
+    # Define the result object
+    result = {'iStatus': timeStep['iStatus'],
+              'timestamp': timeStep['timestamp'],
+              'cellArray': '[[' + '], ['.join(rows) + ']]',
+              'rasterText': timeStep['rasterText']}
 
     return result
 
 
-def datasetScalarTimeStepChunk(lines, numberColumns, numberCells):
+def datasetScalarTimeStepArray(lines, numberColumns, numberCells, activeCells=None, parseValues=True):
     """
-    Process the time step chunks for scalar datasets
+    Process the time step chunks for scalar datasets into NumPy arrays. The values of the time step are parsed in a
+    single pass. If the time step only has values for the active cells of the mask, they are scattered to the grid
+    through the flat indices of the active cells (activeCells) and the other cells are 0. The cellValues are None if
+    the number of values doesn't match the grid (e.g.: for vector datasets) or if parseValues is False.
     """
-    END_DATASET_TAG = 'ENDDS'
+    iStatus, timestamp, valueLines = _splitTimeStep(lines, numberCells)
+    rasterText = ''.join(valueLines)
+
+    if not parseValues:
+        return {'iStatus': iStatus,
+                'timestamp': timestamp,
+                'cellValues': None,
+                'rasterText': rasterText}
+
+    values = _parse_values(rasterText, 'float64')
+    numberRows = -(-len(values) // numberColumns)
+
+    if activeCells is not None and values.size == len(activeCells) and values.size != numberCells:
+        numberRows = -(-numberCells // numberColumns)
+        cellValues = np.zeros(numberRows * numberColumns)
+        cellValues[activeCells] = values
+    elif values.size == numberRows * numberColumns and values.size == len(valueLines):
+        cellValues = values
+    else:
+        cellValues = None
 
     # Define the result object
-    result = {'iStatus': None,
-              'timestamp': None,
-              'cellArray': None,
-              'rasterText': None}
+    result = {'iStatus': iStatus,
+              'timestamp': timestamp,
+              'cellValues': cellValues.reshape(numberRows, numberColumns) if cellValues is not None else None,
+              'rasterText': rasterText}
 
-    # Split the chunks
-    timeStep = pt.splitLine(lines.pop(0))
+    return result
 
-    # Extract cells, ignoring the status indicators
-    startCellsIndex = numberCells
 
-    # Handle case when status cells are not included (istat = 0)
-    iStatus = int(timeStep[1])
+def datasetChunkIter(lines, numberColumns, activeCells=None, parseValues=True):
+    """
+    Parse a WMS dataset file one chunk at a time. Yields ('DATASET', header) for the header chunk and ('TS', timeStep)
+    for each time step chunk as soon as it is read (see datasetHeaderChunk and datasetScalarTimeStepArray), so only one
+    time step is in memory when lines is an open file.
+    """
+    KEYWORDS = ('DATASET', 'TS')
 
-    if iStatus == 0:
-        startCellsIndex = 0
+    header = None
 
-    # Strip off ending dataset tag
-    if END_DATASET_TAG in lines[-1]:
-        lines.pop(-1)
+    for key, chunk in pt.chunkIter(KEYWORDS, lines):
+        if key == 'DATASET':
+            if header is None:
+                header = datasetHeaderChunk(key, chunk)
+                yield key, header
 
-    # Assemble the array string
-    arrayString = '[['
-    columnCounter = 1
-    lenLines = len(lines) - 1
+        elif header is None:
+            raise ValueError('Time step found before the header of the dataset.')
 
-    # Also assemble raster text field to preserve for spatial datasets
-    rasterText = ''
+        else:
+            yield key, datasetScalarTimeStepArray(chunk, numberColumns, header['numberCells'],
+                                                  activeCells=activeCells,
+                                                  parseValues=parseValues)
 
-    for index in range(startCellsIndex, len(lines)):
-        # Check columns condition
-        if columnCounter % numberColumns != 0 and index != lenLines:
-            arrayString += lines[index].strip() + ', '
-        elif columnCounter % numberColumns == 0 and index != lenLines:
-            arrayString += lines[index].strip() + '], ['
-        elif index == lenLines:
-            arrayString += lines[index].strip() + ']]'
 
-        # Advance counter
-        columnCounter += 1
+def _splitTimeStep(lines, numberCells):
+    """
+    Split a time step chunk into the status, the timestamp and the value lines
+    """
+    END_DATASET_TAG = 'ENDDS'
 
-        rasterText += lines[index]
+    # Split the chunks
+    timeStep = pt.splitLine(lines[0])
 
-    # Get Value Array
-    result['cellArray'] = arrayString
-    result['rasterText'] = rasterText
+    # Extract cells, ignoring the status indicators
+    startCellsIndex = numberCells + 1
 
-    # Assign Result
-    result['iStatus'] = iStatus
-    result['timestamp'] = float(timeStep[2])
+    # Handle case when status cells are not included (istat = 0)
+    iStatus = int(timeStep[1])
 
-    return result
+    if iStatus == 0:
+        startCellsIndex = 1
+
+    # Strip off ending dataset tag
+    endCellsIndex = len(lines)
+
+    if END_DATASET_TAG in lines[-1]:
+        endCellsIndex -= 1
+
+    return iStatus, float(timeStep[2]), lines[startCellsIndex:endCellsIndex]
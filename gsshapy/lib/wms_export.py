@@ -0,0 +1,211 @@
+"""
+WMS Dataset Export
+"""
+from __future__ import unicode_literals
+
+from datetime import datetime
+
+import numpy as np
+
+__all__ = ['grid_coordinates',
+           'write_netcdf',
+           'write_zarr']
+
+# Root keywords of the well known text of geographic projections (WKT 1 and WKT 2)
+GEOGRAPHIC_WKT_KEYWORDS = ('GEOGCS[', 'GEOGCRS[', 'GEOGRAPHICCRS[')
+
+
+def grid_coordinates(geotransform, shape):
+    """
+    Coordinates of the cell centers of a grid.
+
+    Args:
+        geotransform (tuple): GDAL-style geotransform of the grid.
+        shape (tuple): Number of rows and columns of the grid.
+
+    Returns:
+        tuple: Arrays of the x coordinates of the columns and the y coordinates of the rows.
+    """
+    west, cellWidth, _, north, _, cellHeight = geotransform
+    x = west + (np.arange(shape[1]) + 0.5) * cellWidth
+    y = north + (np.arange(shape[0]) + 0.5) * cellHeight
+    return x, y
+
+
+def _coordinate_attributes(wkt):
+    """
+    CF attributes of the x and y coordinates: longitude and latitude in degrees for geographic projections, projection
+    coordinates in meters otherwise. The type of the projection is the root keyword of its well known text.
+    """
+    if wkt is not None and wkt.lstrip().upper().startswith(GEOGRAPHIC_WKT_KEYWORDS):
+        return ({'standard_name': 'longitude', 'long_name': 'longitude', 'units': 'degrees_east'},
+                {'standard_name': 'latitude', 'long_name': 'latitude', 'units': 'degrees_north'})
+
+    return ({'standard_name': 'projection_x_coordinate', 'units': 'm'},
+            {'standard_name': 'projection_y_coordinate', 'units': 'm'})
+
+
+def _default_chunks(shape):
+    """
+    One time step per chunk, split into tiles of at most 256 x 256 cells.
+    """
+    return 1, min(shape[0], 256), min(shape[1], 256)
+
+
+def _time_units(startDateTime):
+    """
+    CF units of GSSHA timestamps, which are minutes since the start of the simulation.
+    """
+    return 'minutes since {0:%Y-%m-%d %H:%M:%S}'.format(startDateTime)
+
+
+def _global_attributes(title):
+    return {'Conventions': 'CF-1.6',
+            'title': title,
+            'source': 'GSSHA',
+            'history': 'date_created: {0}'.format(datetime.utcnow())}
+
+
+def write_netcdf(path, timeSteps, shape, geotransform, variableName, startDateTime, wkt=None, chunks=None,
+                 complevel=4, noDataValue=-9999.0, attributes=None):
+    """
+    Write time steps of a grid to a CF-compliant NetCDF4 file. The time steps are written one at a time along an
+    unlimited time dimension, so only one time step is in memory. Requires the netCDF4 package.
+
+    Args:
+        path (str): Path to the NetCDF file.
+        timeSteps (iterable): Timestamps in minutes since startDateTime and arrays with shape (rows, columns) of the
+            time steps. NaN values are written as no data.
+        shape (tuple): Number of rows and columns of the grid.
+        geotransform (tuple): GDAL-style geotransform of the grid.
+        variableName (str): Name of the variable.
+        startDateTime (datetime): Start of the simulation.
+        wkt (str, optional): Well known text of the projection of the grid. The coordinates are longitude and latitude
+            if it is a geographic projection. Defaults to None (projection coordinates in meters).
+        chunks (tuple, optional): Chunk sizes of the (time, y, x) dimensions. Defaults to one time step in tiles of at
+            most 256 x 256 cells.
+        complevel (int, optional): zlib compression level from 0 (none) to 9. Defaults to 4.
+        noDataValue (float, optional): Fill value of no data. Defaults to -9999.0.
+        attributes (dict, optional): Attributes of the variable (e.g.: 'long_name' and 'units').
+
+    Returns:
+        int: Number of time steps written.
+    """
+    import netCDF4
+
+    x, y = grid_coordinates(geotransform, shape)
+    xAttributes, yAttributes = _coordinate_attributes(wkt)
+
+    with netCDF4.Dataset(path, 'w', format='NETCDF4') as dataset:
+        dataset.setncatts(_global_attributes('GSSHA {0}'.format(variableName)))
+
+        dataset.createDimension('time', None)
+        dataset.createDimension('y', shape[0])
+        dataset.createDimension('x', shape[1])
+
+        timeVariable = dataset.createVariable('time', 'f8', ('time',))
+        timeVariable.setncatts({'standard_name': 'time', 'units': _time_units(startDateTime), 'calendar': 'standard'})
+
+        yVariable = dataset.createVariable('y', 'f8', ('y',))
+        yVariable.setncatts(yAttributes)
+        yVariable[:] = y
+
+        xVariable = dataset.createVariable('x', 'f8', ('x',))
+        xVariable.setncatts(xAttributes)
+        xVariable[:] = x
+
+        crsVariable = dataset.createVariable('crs', 'i4')
+        crsVariable.GeoTransform = ' '.join(str(value) for value in geotransform)
+
+        if wkt is not None:
+            crsVariable.crs_wkt = wkt
+            crsVariable.spatial_ref = wkt
+
+        variable = dataset.createVariable(variableName, 'f4', ('time', 'y', 'x'),
+                                          zlib=complevel > 0, complevel=complevel,
+                                          chunksizes=chunks or _default_chunks(shape),
+                                          fill_value=noDataValue)
+        variable.grid_mapping = 'crs'
+
+        if attributes:
+            variable.setncatts(attributes)
+
+        count = 0
+
+        for timestamp, grid in timeSteps:
+            timeVariable[count] = timestamp
+            variable[count, :, :] = np.where(np.isnan(grid), noDataValue, grid)
+            count += 1
+
+    return count
+
+
+def write_zarr(path, timeSteps, shape, geotransform, variableName, startDateTime, wkt=None, chunks=None,
+               compressor=None, noDataValue=-9999.0, attributes=None):
+    """
+    Write time steps of a grid to a CF-compliant Zarr store. The time steps are appended one at a time along the time
+    dimension, so only one time step is in memory. Requires the zarr package.
+
+    Args:
+        path (str): Path to the Zarr store.
+        timeSteps (iterable): Timestamps in minutes since startDateTime and arrays with shape (rows, columns) of the
+            time steps. NaN values are written as no data.
+        shape (tuple): Number of rows and columns of the grid.
+        geotransform (tuple): GDAL-style geotransform of the grid.
+        variableName (str): Name of the variable.
+        startDateTime (datetime): Start of the simulation.
+        wkt (str, optional): Well known text of the projection of the grid. The coordinates are longitude and latitude
+            if it is a geographic projection. Defaults to None (projection coordinates in meters).
+        chunks (tuple, optional): Chunk sizes of the (time, y, x) dimensions. Defaults to one time step in tiles of at
+            most 256 x 256 cells.
+        compressor (object, optional): Zarr compressor (e.g.: numcodecs.Blosc(cname='zstd', clevel=5)). Defaults to
+            the default compressor of zarr.
+        noDataValue (float, optional): Fill value of no data. Defaults to -9999.0.
+        attributes (dict, optional): Attributes of the variable (e.g.: 'long_name' and 'units').
+
+    Returns:
+        int: Number of time steps written.
+    """
+    import xarray as xr
+
+    x, y = grid_coordinates(geotransform, shape)
+    xAttributes, yAttributes = _coordinate_attributes(wkt)
+
+    variableAttributes = dict(attributes or {})
+    variableAttributes['grid_mapping'] = 'crs'
+
+    crsAttributes = {'GeoTransform': ' '.join(str(value) for value in geotransform)}
+
+    if wkt is not None:
+        crsAttributes['crs_wkt'] = wkt
+        crsAttributes['spatial_ref'] = wkt
+
+    # Timestamps are appended as dates, which are encoded with the units of the first time step
+    encoding = {variableName: {'chunks': chunks or _default_chunks(shape), '_FillValue': noDataValue},
+                'time': {'units': _time_units(startDateTime), 'calendar': 'standard', 'dtype': 'float64'}}
+    start = np.datetime64(startDateTime, 'ms')
+
+    if compressor is not None:
+        encoding[variableName]['compressor'] = compressor
+
+    count = 0
+
+    for timestamp, grid in timeSteps:
+        dataset = xr.Dataset({variableName: (('time', 'y', 'x'), np.asarray(grid, dtype=np.float32)[np.newaxis],
+                                             variableAttributes)},
+                             coords={'time': ('time', [start + np.timedelta64(int(round(timestamp * 60000)), 'ms')],
+                                              {'standard_name': 'time'})})
+
+        if count == 0:
+            dataset = dataset.assign_coords(
+                y=('y', y, yAttributes),
+                x=('x', x, xAttributes))
+            dataset['crs'] = xr.DataArray(np.int32(0), attrs=crsAttributes)
+            dataset.attrs = _global_attributes('GSSHA {0}'.format(variableName))
+            dataset.to_zarr(path, mode='w', encoding=encoding)
+        else:
+            dataset.to_zarr(path, append_dim='time')
+
+        count += 1
+
+    return count
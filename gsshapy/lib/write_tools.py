@@ -0,0 +1,184 @@
+"""
+Write Tools
+"""
+from __future__ import unicode_literals
+
+from io import open as io_open
+import logging
+import os
+import time
+import uuid
+
+from ..util.files import replace_file
+
+__all__ = ['BufferedFileWriter',
+           'open_output',
+           'set_write_mode',
+           'get_write_mode']
+
+log = logging.getLogger(__name__)
+
+WRITE_MODES = ('direct', 'atomic')
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+_write_mode = 'direct'
+_buffer_size = DEFAULT_BUFFER_SIZE
+
+
+class BufferedFileWriter(object):
+    """
+    File-like object used by GsshaPy file objects to write files.
+
+    Text passed to ``write()`` and ``writelines()`` is collected in memory and written to disk in large blocks. In
+    atomic mode the output is written to a temporary file in the same directory, which replaces the target file only
+    when the write completes, so a failed write never leaves a truncated file behind. The ``name`` attribute is always
+    the path of the target file.
+
+    After the writer is closed, ``bytes_written`` and ``elapsed`` hold the size of the file in bytes and the time in
+    seconds spent writing it.
+
+    Args:
+        path (str): Path of the file to write.
+        mode (str, optional): Either 'direct' or 'atomic'. Defaults to the mode selected with ``set_write_mode``.
+        buffer_size (int, optional): Number of characters collected before they are written to disk. Defaults to the
+            size selected with ``set_write_mode``.
+    """
+
+    def __init__(self, path, mode=None, buffer_size=None):
+        self.name = path
+        self.mode = mode or _write_mode
+        self.buffer_size = buffer_size or _buffer_size
+        self.bytes_written = None
+        self.elapsed = None
+        self.closed = False
+
+        if self.mode not in WRITE_MODES:
+            raise ValueError('Invalid write mode "{0}". Use one of: {1}'.format(self.mode, ', '.join(WRITE_MODES)))
+
+        self._parts = []
+        self._size = 0
+        self._start = time.time()
+
+        if self.mode == 'atomic':
+            directory, filename = os.path.split(os.path.abspath(path))
+            self._path = os.path.join(directory, '.{0}.{1}.tmp'.format(filename, uuid.uuid4().hex))
+        else:
+            self._path = path
+
+        self._file = io_open(self._path, 'w')
+
+    def write(self, text):
+        """
+        Write a string to the file.
+        """
+        self._parts.append(text)
+        self._size += len(text)
+
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def writelines(self, lines):
+        """
+        Write a sequence of strings to the file.
+        """
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        """
+        Write the collected text to disk.
+        """
+        if self._parts:
+            self._file.write(''.join(self._parts))
+            self._parts = []
+            self._size = 0
+
+    def close(self):
+        """
+        Finish writing the file. In atomic mode the temporary file replaces the target file.
+        """
+        if self.closed:
+            return
+
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+            self.closed = True
+
+        if self.mode == 'atomic':
+            replace_file(self._path, self.name)
+
+        self.bytes_written = os.path.getsize(self.name)
+        self.elapsed = time.time() - self._start
+
+        log.debug('Wrote {0} bytes to {1} in {2:.3f} seconds'.format(self.bytes_written, self.name, self.elapsed))
+
+    def abort(self):
+        """
+        Stop writing the file. In atomic mode the temporary file is removed and the target file is left untouched.
+        """
+        if self.closed:
+            return
+
+        if self.mode == 'atomic':
+            self._file.close()
+            self.closed = True
+
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+        else:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def open_output(path):
+    """
+    Open a file for writing with the active write mode.
+
+    Args:
+        path (str): Path of the file to write.
+
+    Returns:
+        BufferedFileWriter: Writer for the file. Use it as a context manager.
+    """
+    return BufferedFileWriter(path)
+
+
+def set_write_mode(mode, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Select how GsshaPy file objects write files.
+
+    Args:
+        mode (str): 'direct' writes to the target file. 'atomic' writes to a temporary file in the same directory and
+            renames it to the target file when the write completes.
+        buffer_size (int, optional): Number of characters collected before they are written to disk. Defaults to
+            1048576.
+    """
+    global _write_mode, _buffer_size
+
+    if mode not in WRITE_MODES:
+        raise ValueError('Invalid write mode "{0}". Use one of: {1}'.format(mode, ', '.join(WRITE_MODES)))
+
+    _write_mode = mode
+    _buffer_size = buffer_size
+
+
+def get_write_mode():
+    """
+    Get the active write mode.
+
+    Returns:
+        str: Either 'direct' or 'atomic'.
+    """
+    return _write_mode
@@ -23,7 +23,6 @@ __all__ = ['ChannelInputFile',
            'Breakpoint',
            'TrapezoidalCS']
 
-from future.utils import iteritems
 import logging
 import json
 from mapkit.sqlatypes import Geometry
@@ -405,14 +404,9 @@ class ChannelInputFile(DeclarativeBase, GsshaPyFileObjectBase):
         links = []
         connectivity = []
 
-        # Parse file into chunks associated with keywords/cards
+        # Parse chunks associated with each key as the file is read
         with open(path, 'r') as f:
-            chunks = pt.chunk(KEYWORDS, f)
-
-        # Parse chunks associated with each key
-        for key, chunkList in iteritems(chunks):
-            # Parse each chunk in the chunk list
-            for chunk in chunkList:
+            for key, chunk in pt.chunkIter(KEYWORDS, f):
                 # Call chunk specific parsers for each chunk
                 result = KEYWORDS[key](key, chunk)
 
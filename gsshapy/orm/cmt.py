@@ -16,11 +16,11 @@ __all__ = ['MapTableFile',
            'MTContaminant',
            'MTSediment']
 
+from collections import OrderedDict
 from io import open as io_open
 import os
 import logging
 
-from future.utils import iteritems
 import numpy as np
 import pandas as pd
 from osgeo import gdalconst
@@ -35,6 +35,8 @@ from ..base.file_base import GsshaPyFileObjectBase
 from .idx import IndexMap
 from ..lib import parsetools as pt
 from ..lib import cmt_chunk as mtc
+from ..lib.grass_ascii import iter_grass_ascii
+from ..lib.write_tools import open_output
 from ..lib.parsetools import valueReadPreprocessor as vrp, valueWritePreprocessor as vwp
 from ..util.context import tmp_chdir
 
@@ -73,6 +75,9 @@ class MapTableFile(DeclarativeBase, GsshaPyFileObjectBase):
     mapTables = relationship('MapTable', back_populates='mapTableFile')  #: RELATIONSHIP
     projectFile = relationship('ProjectFile', uselist=False, back_populates='mapTableFile')  #: RELATIONSHIP
 
+    # Cached parameter grids keyed by (table, variable, layer, contaminant)
+    _parameterGrids = None
+
     def __init__(self, project_file=None):
         """
         Constructor
@@ -85,7 +90,7 @@ class MapTableFile(DeclarativeBase, GsshaPyFileObjectBase):
 
     def _read(self, directory, filename, session, path, name, extension,
               spatial=False, spatialReferenceID=4236, replaceParamFile=None,
-              readIndexMaps=True):
+              readIndexMaps=True, readRasterText=True):
         """
         Mapping Table Read from File Method
         """
@@ -115,16 +120,11 @@ class MapTableFile(DeclarativeBase, GsshaPyFileObjectBase):
                     'SEDIMENTS': mtc.sedimentChunk}
 
         indexMaps = dict()
-        mapTables = []
+        mapTablesByKey = dict((key, []) for key in KEYWORDS)
 
-        # Parse file into chunks associated with keywords/cards
+        # Parse chunks associated with each key as the file is read
         with io_open(path, 'r') as f:
-            chunks = pt.chunk(KEYWORDS, f)
-
-        # Parse chunks associated with each key
-        for key, chunkList in iteritems(chunks):
-            # Parse each chunk in the chunk list
-            for chunk in chunkList:
+            for key, chunk in pt.chunkIter(KEYWORDS, f):
                 # Call chunk specific parsers for each chunk
                 result = KEYWORDS[key](key, chunk)
 
@@ -143,7 +143,8 @@ class MapTableFile(DeclarativeBase, GsshaPyFileObjectBase):
                     if readIndexMaps:
                         # Invoke IndexMap read method
                         indexMap.read(directory=directory, filename=result['filename'], session=session,
-                                      spatial=spatial, spatialReferenceID=spatialReferenceID)
+                                      spatial=spatial, spatialReferenceID=spatialReferenceID,
+                                      readRasterText=readRasterText)
                     else:
                         # add path to file
                         indexMap.filename = result['filename']
@@ -152,7 +153,10 @@ class MapTableFile(DeclarativeBase, GsshaPyFileObjectBase):
                 else:
                     # Create a list of all the map tables in the file
                     if result:
-                        mapTables.append(result)
+                        mapTablesByKey[key].append(result)
+
+        # Keep the map tables grouped by card
+        mapTables = [mapTable for key in KEYWORDS for mapTable in mapTablesByKey[key]]
 
         # Create GSSHAPY ORM objects with the resulting objects that are
         # returned from the parser functions
@@ -223,6 +227,153 @@ class MapTableFile(DeclarativeBase, GsshaPyFileObjectBase):
             session.delete(duplicate_map_table)
             session.commit()
 
+    def parameterGrid(self, table, variable, session, layer=0, contaminant=None):
+        """
+        Materialize a mapping table parameter to a grid with the value of the parameter in each cell, as GSSHA will see
+        it. A lookup array is built from the values of the mapping table and applied to the array of its index map with
+        a vectorized take. The result is cached per parameter until the index map changes (see
+        ``clearParameterGrids``).
+
+        Args:
+            table (str): Name of the mapping table (e.g.: 'ROUGHNESS').
+            variable (str): Name of the parameter (e.g.: 'ROUGH').
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
+            layer (int, optional): Layer of multiple layer tables (e.g.: 'MULTI_LAYER_SOIL'). Defaults to 0.
+            contaminant (str, optional): Name of the contaminant of contaminant transport tables. Defaults to None.
+
+        Returns:
+            tuple: Float32 array with the value of the parameter in each cell and the GDAL-style geotransform of the
+            index map. Cells with indices that are not defined in the mapping table are NaN.
+        """
+        mapTable = session.query(MapTable).\
+            filter(MapTable.mapTableFile == self).\
+            filter(MapTable.name == table).\
+            first()
+
+        if mapTable is None:
+            raise ValueError('Mapping table {0} not found.'.format(table))
+
+        if mapTable.indexMap is None:
+            raise ValueError('Mapping table {0} does not have an index map.'.format(table))
+
+        arrayAndGeotransform = mapTable.indexMap.as_array()
+
+        if arrayAndGeotransform is None:
+            raise ValueError('The index map {0} of mapping table {1} was not read.'.format(mapTable.indexMap.filename,
+                                                                                           table))
+
+        indexArray, geotransform = arrayAndGeotransform
+        key = (table, variable, layer, contaminant)
+
+        if self._parameterGrids is None:
+            self._parameterGrids = dict()
+
+        cached = self._parameterGrids.get(key)
+
+        if cached is not None and cached[0] is indexArray:
+            return cached[1], cached[2]
+
+        query = session.query(MTIndex.index, MTValue.value).\
+            join(MTValue.index).\
+            filter(MTValue.mapTable == mapTable).\
+            filter(MTValue.variable == variable).\
+            filter(MTValue.layer_id == layer)
+
+        if contaminant is None:
+            query = query.filter(MTValue.contaminantID.is_(None))
+        else:
+            query = query.join(MTValue.contaminant).filter(MTContaminant.name == contaminant)
+
+        rows = query.all()
+
+        if not rows:
+            raise ValueError('Variable {0} not found in mapping table {1}.'.format(variable, table))
+
+        # The last entry of the lookup array is NaN and receives the indices that are not in the mapping table
+        maxIndex = max(max(index for index, _ in rows), 0)
+        lookup = np.full(maxIndex + 2, np.nan, dtype=np.float32)
+
+        for index, value in rows:
+            if index >= 0 and value is not None and value > -9999:
+                lookup[index] = value
+
+        indices = np.where((indexArray >= 0) & (indexArray <= maxIndex), indexArray, maxIndex + 1)
+        grid = lookup.take(indices)
+        grid.flags.writeable = False
+
+        self._parameterGrids[key] = (indexArray, grid, geotransform)
+
+        return grid, geotransform
+
+    def parameterGrids(self, session, table=None):
+        """
+        Materialize all parameters of the mapping tables to grids (see ``parameterGrid``).
+
+        Args:
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
+            table (str, optional): Name of a mapping table to limit the grids to. Defaults to None (all tables).
+
+        Returns:
+            OrderedDict: The (array, geotransform) tuple of each parameter keyed by a (table, variable, layer,
+            contaminant) tuple.
+        """
+        query = session.query(MapTable.name, MTValue.variable, MTValue.layer_id, MTContaminant.name).\
+            join(MTValue.mapTable).\
+            outerjoin(MTValue.contaminant).\
+            filter(MapTable.mapTableFile == self).\
+            filter(MapTable.idxMapID.isnot(None))
+
+        if table is not None:
+            query = query.filter(MapTable.name == table)
+
+        grids = OrderedDict()
+
+        for key in sorted(set(query.all()), key=lambda key: tuple('' if item is None else item for item in key)):
+            tableName, variable, layer, contaminant = key
+            grids[key] = self.parameterGrid(tableName, variable, session, layer=layer, contaminant=contaminant)
+
+        return grids
+
+    def exportParameterGrids(self, session, directory, table=None, noDataValue=-9999):
+        """
+        Write all parameters of the mapping tables as GRASS ASCII grids named after the table, variable, layer and
+        contaminant (e.g.: ROUGHNESS_ROUGH_0.asc).
+
+        Args:
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
+            directory (str): Directory where the grids are written.
+            table (str, optional): Name of a mapping table to limit the grids to. Defaults to None (all tables).
+            noDataValue (float, optional): Value written for cells without a parameter value. Defaults to -9999.
+
+        Returns:
+            list: Paths of the files that were written.
+        """
+        paths = []
+
+        grids = self.parameterGrids(session, table)
+
+        for (tableName, variable, layer, contaminant), (grid, geotransform) in grids.items():
+            nameParts = [tableName, variable, str(layer)]
+
+            if contaminant is not None:
+                nameParts.append(contaminant)
+
+            filename = '{0}.asc'.format('_'.join(nameParts).replace(' ', '_'))
+            path = os.path.join(directory, filename)
+
+            with open_output(path) as openFile:
+                openFile.writelines(iter_grass_ascii(grid, geotransform, noDataValue=noDataValue))
+
+            paths.append(path)
+
+        return paths
+
+    def clearParameterGrids(self):
+        """
+        Clear the cached parameter grids, e.g.: after the values of a mapping table changed.
+        """
+        self._parameterGrids = None
+
     def _createGsshaPyObjects(self, mapTables, indexMaps, replaceParamFile, directory, session, spatial, spatialReferenceID):
         """
         Create GSSHAPY Mapping Table ORM Objects Method
@@ -307,6 +458,18 @@ class MapTableFile(DeclarativeBase, GsshaPyFileObjectBase):
         def assign_values_to_table(value_list, layer_id):
             for i, value in enumerate(value_list):
                 value = vrp(value, replaceParamFile)
+
+                # Queue values for bulk insert
+                if self._bulkRows is not None:
+                    self._addBulkRow(MTValue,
+                                     mapTableIndexID=mtIndex,
+                                     mapTableID=mapTable,
+                                     contaminantID=contaminant,
+                                     variable=varList[i],
+                                     value=float(value),
+                                     layer_id=layer_id)
+                    continue
+
                 # Create MTValue object and associate with MTIndex and MapTable
                 mtValue = MTValue(variable=varList[i], value=float(value))
                 mtValue.index = mtIndex
@@ -14,7 +14,6 @@ __all__ = ['PrecipFile',
            'PrecipValue',
            'PrecipGage']
 
-from future.utils import iteritems
 from sqlalchemy import ForeignKey, Column, Table
 from sqlalchemy.types import Integer, DateTime, String, Float
 from sqlalchemy.orm import relationship
@@ -42,6 +41,7 @@ class PrecipFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'gag_precipitation_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
@@ -69,14 +69,9 @@ class PrecipFile(DeclarativeBase, GsshaPyFileObjectBase):
         # Dictionary of keywords/cards and parse function names
         KEYWORDS = ('EVENT',)
 
-        # Parse file into chunks associated with keywords/cards
+        # Parse chunks associated with each key as the file is read
         with open(path, 'r') as f:
-            chunks = pt.chunk(KEYWORDS, f)
-
-        # Parse chunks associated with each key
-        for key, chunkList in iteritems(chunks):
-            # Parse each chunk in the chunk list
-            for chunk in chunkList:
+            for key, chunk in pt.chunkIter(KEYWORDS, f):
                 result = gak.eventChunk(key, chunk)
                 self._createGsshaPyObjects(result)
 
@@ -176,6 +171,16 @@ class PrecipFile(DeclarativeBase, GsshaPyFileObjectBase):
 
         for valLine in eventChunk['valLines']:
             for index, value in enumerate(valLine['values']):
+                # Queue values for bulk insert
+                if self._bulkRows is not None:
+                    self._addBulkRow(PrecipValue,
+                                     eventID=event,
+                                     coordID=gages[index],
+                                     valueType=valLine['type'],
+                                     dateTime=valLine['dateTime'],
+                                     value=value)
+                    continue
+
                 # Create GSSHAPY PrecipValue object
                 val = PrecipValue(valueType=valLine['type'],
                                   dateTime=valLine['dateTime'],
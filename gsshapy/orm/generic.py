@@ -29,6 +29,7 @@ class GenericFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'gen_generic_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
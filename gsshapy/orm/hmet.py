@@ -33,6 +33,7 @@ class HmetFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'hmet_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
@@ -15,7 +15,7 @@ import os
 
 from sqlalchemy import Column, ForeignKey
 from sqlalchemy.types import Integer, String, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred, synonym
 from mapkit.sqlatypes import Raster
 from mapkit.RasterLoader import RasterLoader
 from mapkit.RasterConverter import RasterConverter
@@ -23,6 +23,8 @@ from mapkit.RasterConverter import RasterConverter
 from . import DeclarativeBase
 from ..base.file_base import GsshaPyFileObjectBase
 from ..base.rast import RasterObjectBase
+from ..lib.text_compression import CompressedText
+from ..lib.write_tools import open_output
 
 
 class IndexMap(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
@@ -52,6 +54,7 @@ class IndexMap(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
     rasterColumnName = 'raster'  #: Raster column name
     defaultNoDataValue = -1  #: Default no data value
     discreet = True  #: Index maps should be discreet
+    arrayDataType = 'int32'  #: NumPy data type of the array returned by as_array
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
@@ -67,10 +70,20 @@ class IndexMap(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
     srid = Column(Integer)  #: SRID
     name = Column(String)  #: STRING
     filename = Column(String)  #: STRING
-    rasterText = Column(String)  #: STRING
+    _rasterText = deferred(Column('rasterText', CompressedText))
+    rasterText = synonym('_rasterText', descriptor=property(RasterObjectBase._getRasterText,
+                                                            RasterObjectBase._setRasterText))  #: STRING
+    rasterPath = Column(String)  #: STRING
     raster = Column(Raster)  #: RASTER
     fileExtension = Column(String, default='idx')  #: STRING
 
+    # Statistics Columns
+    statMinimum = Column(Float)  #: FLOAT
+    statMaximum = Column(Float)  #: FLOAT
+    statMean = Column(Float)  #: FLOAT
+    statStandardDeviation = Column(Float)  #: FLOAT
+    statHistogram = Column(String)  #: STRING
+
     # Relationship Properties
     mapTableFile = relationship('MapTableFile', back_populates='indexMaps')  #: RELATIONSHIP
     mapTables = relationship('MapTable', back_populates='indexMap')  #: RELATIONSHIP
@@ -93,34 +106,16 @@ class IndexMap(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
                 self.filename == other.filename and
                 self.raster == other.raster)
 
-    def _read(self, directory, filename, session, path, name, extension, spatial, spatialReferenceID, replaceParamFile):
+    def _read(self, directory, filename, session, path, name, extension, spatial, spatialReferenceID, replaceParamFile,
+              readRasterText=True):
         """
         Index Map Read from File Method
         """
         # Set file extension property
         self.fileExtension = extension
 
-        # Open file and read plain text into text field
-        with open(path, 'r') as f:
-            self.rasterText = f.read()
-
-        # Retrieve metadata from header
-        lines = self.rasterText.split('\n')
-        for line in lines[0:6]:
-            spline = line.split()
-
-            if 'north' in spline[0].lower():
-                self.north = float(spline[1])
-            elif 'south' in spline[0].lower():
-                self.south = float(spline[1])
-            elif 'east' in spline[0].lower():
-                self.east = float(spline[1])
-            elif 'west' in spline[0].lower():
-                self.west = float(spline[1])
-            elif 'rows' in spline[0].lower():
-                self.rows = int(spline[1])
-            elif 'cols' in spline[0].lower():
-                self.columns = int(spline[1])
+        # Store the text or read only the header and a reference to the file the text can be read from on demand
+        self._loadRasterHeader(path, readRasterText)
 
         if spatial:
             # Get well known binary from the raster file using the MapKit RasterLoader
@@ -135,17 +130,22 @@ class IndexMap(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
         # Assign other properties
         self.filename = filename
 
+    def _getWritePath(self, directory, name):
+        """
+        Derive the path of the file to be written. Without a name, the index map keeps its original filename.
+        """
+        if name != None:
+            return os.path.join(directory, '%s.%s' % (name, self.fileExtension))
+
+        return os.path.join(directory, self.filename)
+
     def write(self, directory, name=None, session=None, replaceParamFile=None):
         """
         Index Map Write to File Method
         """
 
         # Initiate file
-        if name != None:
-            filename = '%s.%s' % (name, self.fileExtension)
-            filePath = os.path.join(directory, filename)
-        else:
-            filePath = os.path.join(directory, self.filename)
+        filePath = self._getWritePath(directory, name)
 
         # If the raster field is not empty, write from this field
         if type(self.raster) != type(None):
@@ -160,11 +160,18 @@ class IndexMap(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
                                                              dataType='Int32')
 
             # Write to file
-            with open(filePath, 'w') as mapFile:
+            with open_output(filePath) as mapFile:
                 mapFile.write(grassAsciiGrid)
 
+            self._emitWriteEvent(mapFile)
+
         else:
-            if self.rasterText is not None:
+            # Retrieve the text before the file is opened, because it may be read from the file being written
+            rasterText = self._iterRasterText()
+
+            if rasterText is not None:
                 # Open file and write, raster_text only
-                with open(filePath, 'w') as mapFile:
-                    mapFile.write(self.rasterText)
+                with open_output(filePath) as mapFile:
+                    mapFile.writelines(rasterText)
+
+                self._emitWriteEvent(mapFile)
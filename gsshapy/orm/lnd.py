@@ -16,7 +16,6 @@ __all__ = ['LinkNodeDatasetFile',
 
 import xml.etree.ElementTree as ET
 from datetime import timedelta, datetime
-from future.utils import iteritems
 import logging
 
 from sqlalchemy import Column, ForeignKey, func
@@ -46,6 +45,7 @@ class LinkNodeDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'lnd_link_node_dataset_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
@@ -367,15 +367,11 @@ class LinkNodeDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
                     'START_TIME',
                     'TS')
 
-        # Parse file into chunks associated with keywords/cards
+        # Parse chunks associated with each key as the file is read
         with open(path, 'r') as f:
             self.name = f.readline().strip()
-            chunks = pt.chunk(KEYWORDS, f)
 
-        # Parse chunks associated with each key
-        for card, chunkList in iteritems(chunks):
-            # Parse each chunk in the chunk list
-            for chunk in chunkList:
+            for card, chunk in pt.chunkIter(KEYWORDS, f):
                 schunk = chunk[0].strip().split()
 
                 # Cases
@@ -431,16 +427,31 @@ class LinkNodeDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
                             # Parse line into node datasets
                             if linkDataset.numNodeDatasets > 0:
                                 for i in range(0, linkDataset.numNodeDatasets):
-                                    # Create NodeDataset GSSHAPY object
-                                    nodeDataset = NodeDataset()
-                                    nodeDataset.status = int(spLinkLine[statusIndex])
-                                    nodeDataset.value = float(spLinkLine[valueIndex])
-                                    nodeDataset.linkDataset = linkDataset
-                                    nodeDataset.linkNodeDatasetFile = self
+                                    if self._bulkRows is not None:
+                                        # Queue NodeDataset for bulk insert
+                                        self._addBulkRow(NodeDataset,
+                                                         linkDatasetID=linkDataset,
+                                                         linkNodeDatasetFileID=self,
+                                                         status=int(spLinkLine[statusIndex]),
+                                                         value=float(spLinkLine[valueIndex]))
+                                    else:
+                                        # Create NodeDataset GSSHAPY object
+                                        nodeDataset = NodeDataset()
+                                        nodeDataset.status = int(spLinkLine[statusIndex])
+                                        nodeDataset.value = float(spLinkLine[valueIndex])
+                                        nodeDataset.linkDataset = linkDataset
+                                        nodeDataset.linkNodeDatasetFile = self
 
                                     # Increment to next status/value pair
                                     statusIndex += NODE_VALUE_INCREMENT
                                     valueIndex += NODE_VALUE_INCREMENT
+                            elif self._bulkRows is not None:
+                                # Queue NodeDataset for bulk insert
+                                self._addBulkRow(NodeDataset,
+                                                 linkDatasetID=linkDataset,
+                                                 linkNodeDatasetFileID=self,
+                                                 status=None,
+                                                 value=float(spLinkLine[1]))
                             else:
                                 nodeDataset = NodeDataset()
                                 nodeDataset.value = float(spLinkLine[1])
@@ -39,6 +39,7 @@ class OutputLocationFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'loc_output_location_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
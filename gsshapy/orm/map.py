@@ -13,7 +13,7 @@ __all__ = ['RasterMapFile']
 
 from sqlalchemy import Column, ForeignKey
 from sqlalchemy.types import Integer, String, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred, synonym
 from mapkit.sqlatypes import Raster
 from mapkit.RasterLoader import RasterLoader
 from mapkit.RasterConverter import RasterConverter
@@ -21,6 +21,7 @@ from mapkit.RasterConverter import RasterConverter
 from . import DeclarativeBase
 from ..base.file_base import GsshaPyFileObjectBase
 from ..base.rast import RasterObjectBase
+from ..lib.text_compression import CompressedText
 
 
 class RasterMapFile(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
@@ -47,10 +48,12 @@ class RasterMapFile(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
 
     # Public Table Metadata
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
     rasterColumnName = 'raster'  #: Raster column name
     defaultNoDataValue = 0  #: Default no data value
     readDataType = '32BF'  #: Default data type of raster values stored in database
     writeDataType = 'Float32'  #: Default data type of raster values written to file
+    arrayDataType = 'float32'  #: NumPy data type of the array returned by as_array
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
@@ -64,10 +67,20 @@ class RasterMapFile(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
     rows = Column(Integer)  #: INTEGER
     columns = Column(Integer)  #: INTEGER
     fileExtension = Column(String, default='txt')  #: STRING
-    rasterText = Column(String)  #: STRING
+    _rasterText = deferred(Column('rasterText', CompressedText))
+    rasterText = synonym('_rasterText', descriptor=property(RasterObjectBase._getRasterText,
+                                                            RasterObjectBase._setRasterText))  #: STRING
+    rasterPath = Column(String)  #: STRING
     raster = Column(Raster)  #: RASTER
     filename = Column(String)  #: STRING
 
+    # Statistics Columns
+    statMinimum = Column(Float)  #: FLOAT
+    statMaximum = Column(Float)  #: FLOAT
+    statMean = Column(Float)  #: FLOAT
+    statStandardDeviation = Column(Float)  #: FLOAT
+    statHistogram = Column(String)  #: STRING
+
     # Relationship Properties
     projectFile = relationship('ProjectFile', back_populates='maps')  #: RELATIONSHIP
 
@@ -93,33 +106,14 @@ class RasterMapFile(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
             session.delete(existing_elev)
             session.commit()
 
-    def _load_raster_text(self, raster_path):
+    def _load_raster_text(self, raster_path, readRasterText=True):
         """
-        Loads grass ASCII to object
+        Loads grass ASCII to object. If readRasterText is False, only the header of the file is read.
         """
-        # Open file and read plain text into text field
-        with open(raster_path, 'r') as f:
-            self.rasterText = f.read()
-
-        # Retrieve metadata from header
-        lines = self.rasterText.split('\n')
-        for line in lines[0:6]:
-            spline = line.split()
-
-            if 'north' in spline[0].lower():
-                self.north = float(spline[1])
-            elif 'south' in spline[0].lower():
-                self.south = float(spline[1])
-            elif 'east' in spline[0].lower():
-                self.east = float(spline[1])
-            elif 'west' in spline[0].lower():
-                self.west = float(spline[1])
-            elif 'rows' in spline[0].lower():
-                self.rows = int(spline[1])
-            elif 'cols' in spline[0].lower():
-                self.columns = int(spline[1])
-
-    def _read(self, directory, filename, session, path, name, extension, spatial, spatialReferenceID, replaceParamFile):
+        self._loadRasterHeader(raster_path, readRasterText)
+
+    def _read(self, directory, filename, session, path, name, extension, spatial, spatialReferenceID, replaceParamFile,
+              readRasterText=True):
         """
         Raster Map File Read from File Method
         """
@@ -127,7 +121,7 @@ class RasterMapFile(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
         self.fileExtension = extension
         self.filename = filename
 
-        self._load_raster_text(path)
+        self._load_raster_text(path, readRasterText)
         
         if spatial:
             # Get well known binary from the raster file using the MapKit RasterLoader
@@ -138,7 +132,7 @@ class RasterMapFile(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
                                                            dataType=self.readDataType)
             self.raster = wkbRaster
 
-    def _write(self, session, openFile, replaceParamFile):
+    def _write(self, session, openFile, replaceParamFile, rasterText=None):
         """
         Raster Map File Write to File Method
         """
@@ -156,13 +150,20 @@ class RasterMapFile(DeclarativeBase, GsshaPyFileObjectBase, RasterObjectBase):
             # Write to file
             openFile.write(grassAsciiGrid)
 
-        elif self.rasterText is not None:
-            # Write file
-            openFile.write(self.rasterText)
+        elif rasterText is not None:
+            # Write file in chunks, see RasterObjectBase._iterRasterText
+            openFile.writelines(rasterText)
 
     def write(self, session, directory, name, replaceParamFile=None, **kwargs):
         """
         Wrapper for GsshaPyFileObjectBase write method 
         """
-        if self.raster is not None or self.rasterText is not None:
-            super(RasterMapFile, self).write(session, directory, name, replaceParamFile, **kwargs)
\ No newline at end of file
+        if self.raster is not None:
+            super(RasterMapFile, self).write(session, directory, name, replaceParamFile, **kwargs)
+        else:
+            # Retrieve the text before the file is opened, because it may be read from the file being written
+            rasterText = self._iterRasterText()
+
+            if rasterText is not None:
+                super(RasterMapFile, self).write(session, directory, name, replaceParamFile, rasterText=rasterText,
+                                                 **kwargs)
\ No newline at end of file
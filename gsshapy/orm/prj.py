@@ -10,13 +10,18 @@
 from __future__ import unicode_literals
 
 __all__ = ['ProjectFile',
-           'ProjectCard']
+           'ProjectCard',
+           'ProjectLoadedFile']
 
+from collections import OrderedDict
+from contextlib import contextmanager
 import json
 import logging
+from multiprocessing import Pool
 import os
 import re
 import sys
+import time
 import uuid
 
 import numpy as np
@@ -24,20 +29,23 @@ from osgeo import ogr, osr
 from pyproj import Proj, transform
 from pytz import timezone
 from shapely.wkb import loads as shapely_loads
-import shlex
 from gazar.grid import GDALGrid
 from timezonefinder import TimezoneFinder
 import xml.etree.ElementTree as ET
 
-from sqlalchemy import ForeignKey, Column
-from sqlalchemy.types import Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import ForeignKey, Column, create_engine, inspect
+from sqlalchemy.types import BigInteger, Float, Integer, String
+from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm.interfaces import ONETOMANY, MANYTOMANY, MANYTOONE
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
 
-from . import DeclarativeBase
+from . import DeclarativeBase, file_io
 from ..base.file_base import GsshaPyFileObjectBase
 from .file_io import *
 from ..lib.check_geometry import check_watershed_boundary_geometry
+from ..lib import instrumentation, parsetools as pt
+from ..lib.parse_cache import get_parse_cache
+from ..lib.watershed_mask import WatershedMask
 from ..util.context import tmp_chdir
 
 log = logging.getLogger(__name__)
@@ -82,6 +90,7 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
     mapType = Column(Integer, nullable=False)  #: INTEGER
     fileExtension = Column(String, default='prj')  #: STRING
     project_directory = Column(String)
+    readOptions = Column(String)  #: STRING
 
     # Relationship Properties
     projectCards = relationship('ProjectCard', back_populates='projectFile')  #: RELATIONSHIP
@@ -108,6 +117,8 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
     genericFiles = relationship('GenericFile', back_populates='projectFile')  #: RELATIONSHIP
     wmsDatasets = relationship('WMSDatasetFile', back_populates='projectFile')  #: RELATIONSHIP
     projectFileEventManager = relationship('ProjectFileEventManager', uselist=False)  #: RELATIONSHIP
+    loadedFiles = relationship('ProjectLoadedFile', back_populates='projectFile',
+                               cascade='all, delete-orphan')  #: RELATIONSHIP
 
     # File Properties
     MAP_TYPES_SUPPORTED = (1,)
@@ -228,6 +239,16 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
     COMMIT_ERROR_MESSAGE = ('Ensure the files listed in the project file '
                             'are not empty and try again.')
 
+    # Files that are read again by refresh when a file they depend on changed or was removed
+    REFRESH_DEPENDENCIES = {'ChannelInputFile': ('LinkNodeDatasetFile',),
+                            'WatershedMaskFile': ('WMSDatasetFile',)}
+
+    # File writes queued for worker processes, grouped by the path of the file (see writeProject)
+    _writeJobs = None
+
+    # Mask map, its raster source and the parsed mask (see getWatershedMask)
+    _watershedMask = None
+
     def __init__(self, name=None, map_type=None, project_directory=None):
         GsshaPyFileObjectBase.__init__(self)
         self.fileExtension = 'prj'
@@ -368,7 +389,8 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
 
                 new.write(rewriteLine)
 
-    def readProject(self, directory, projectFileName, session, spatial=False, spatialReferenceID=None):
+    def readProject(self, directory, projectFileName, session, spatial=False, spatialReferenceID=None,
+                    workers=None, bulk=False, readRasterText=True, wmsCubeDirectory=None):
         """
         Read all files for a GSSHA project into the database.
 
@@ -386,11 +408,26 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
             spatialReferenceID (int, optional): Integer id of spatial reference system for the model. If no id is
                 provided GsshaPy will attempt to automatically lookup the spatial reference ID. If this process fails,
                 default srid will be used (4326 for WGS 84).
+            workers (int, optional): Number of worker processes used to parse files concurrently. Files that can be
+                parsed without a database session are parsed in parallel and attached to the session in the order
+                they are listed in the project file, so the result is identical to a serial read. Only applies when
+                spatial is False. Defaults to None (serial read).
+            bulk (bool, optional): If True, high volume supporting objects such as time series, precipitation, link
+                node dataset and mapping table values are written to the database with bulk inserts instead of being
+                created as ORM objects. Defaults to False.
+            readRasterText (bool, optional): If False, the text of the input maps and of the index maps of the mapping
+                table file is not stored in the database. Only the header of each map is read to fill the extent
+                columns, and a reference to the map file is stored so the text is read from the file when it is
+                accessed. Defaults to True.
+            wmsCubeDirectory (str, optional): If given, the values of each WMS dataset file are also written to a
+                memory-mapped (time, active cell) cube in this directory while it is read (see
+                :meth:`gsshapy.orm.WMSDatasetFile.getCube`). Defaults to None.
         """
         self.project_directory = directory
         with tmp_chdir(directory):
             # Add project file to session
             session.add(self)
+            self._resetLoaded()
 
             # First read self
             self.read(directory, projectFileName, session, spatial=spatial, spatialReferenceID=spatialReferenceID)
@@ -402,25 +439,33 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
             if spatialReferenceID is None:
                 spatialReferenceID = self._automaticallyDeriveSpatialReferenceId(directory)
 
+            self._setReadOptions(dict(groups=('input', 'maps', 'output', 'wms'), directory=directory,
+                                      batchDirectory=batchDirectory, projectFileName=projectFileName,
+                                      spatial=spatial, spatialReferenceID=spatialReferenceID, bulk=bulk,
+                                      readRasterText=readRasterText, wmsCubeDirectory=wmsCubeDirectory))
+            self._recordLoaded(self, directory, projectFileName)
+
             # Read in replace param file
             replaceParamFile = self._readReplacementFiles(directory, session, spatial, spatialReferenceID)
 
             # Read Input Files
-            self._readXput(self.INPUT_FILES, directory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile)
+            self._readXput(self.INPUT_FILES, directory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile, workers=workers, bulk=bulk, readRasterText=readRasterText)
 
             # Read Output Files
-            self._readXput(self.OUTPUT_FILES, batchDirectory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile)
+            self._readXput(self.OUTPUT_FILES, batchDirectory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile, workers=workers, bulk=bulk)
 
             # Read Input Map Files
-            self._readXputMaps(self.INPUT_MAPS, directory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile)
+            self._readXputMaps(self.INPUT_MAPS, directory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile, workers=workers, readRasterText=readRasterText)
 
             # Read WMS Dataset Files
-            self._readWMSDatasets(self.WMS_DATASETS, batchDirectory, session, spatial=spatial, spatialReferenceID=spatialReferenceID)
+            self._readWMSDatasets(self.WMS_DATASETS, batchDirectory, session, spatial=spatial, spatialReferenceID=spatialReferenceID,
+                                  cubeDirectory=wmsCubeDirectory)
 
             # Commit to database
             self._commit(session, self.COMMIT_ERROR_MESSAGE)
 
-    def readInput(self, directory, projectFileName, session, spatial=False, spatialReferenceID=None):
+    def readInput(self, directory, projectFileName, session, spatial=False, spatialReferenceID=None,
+                  workers=None, bulk=False, readRasterText=True):
         """
         Read only input files for a GSSHA project into the database.
 
@@ -436,11 +481,23 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
             spatialReferenceID (int, optional): Integer id of spatial reference system for the model. If no id is
                 provided GsshaPy will attempt to automatically lookup the spatial reference ID. If this process fails,
                 default srid will be used (4326 for WGS 84).
+            workers (int, optional): Number of worker processes used to parse files concurrently. Files that can be
+                parsed without a database session are parsed in parallel and attached to the session in the order
+                they are listed in the project file, so the result is identical to a serial read. Only applies when
+                spatial is False. Defaults to None (serial read).
+            bulk (bool, optional): If True, high volume supporting objects such as time series, precipitation, link
+                node dataset and mapping table values are written to the database with bulk inserts instead of being
+                created as ORM objects. Defaults to False.
+            readRasterText (bool, optional): If False, the text of the input maps and of the index maps of the mapping
+                table file is not stored in the database. Only the header of each map is read to fill the extent
+                columns, and a reference to the map file is stored so the text is read from the file when it is
+                accessed. Defaults to True.
         """
         self.project_directory = directory
         with tmp_chdir(directory):
             # Add project file to session
             session.add(self)
+            self._resetLoaded()
 
             # Read Project File
             self.read(directory, projectFileName, session, spatial, spatialReferenceID)
@@ -449,19 +506,26 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
             if spatialReferenceID is None:
                 spatialReferenceID = self._automaticallyDeriveSpatialReferenceId(directory)
 
+            self._setReadOptions(dict(groups=('input', 'maps'), directory=directory, batchDirectory=directory,
+                                      projectFileName=projectFileName, spatial=spatial,
+                                      spatialReferenceID=spatialReferenceID, bulk=bulk,
+                                      readRasterText=readRasterText))
+            self._recordLoaded(self, directory, projectFileName)
+
             # Read in replace param file
             replaceParamFile = self._readReplacementFiles(directory, session, spatial, spatialReferenceID)
 
             # Read Input Files
-            self._readXput(self.INPUT_FILES, directory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile)
+            self._readXput(self.INPUT_FILES, directory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile, workers=workers, bulk=bulk, readRasterText=readRasterText)
 
             # Read Input Map Files
-            self._readXputMaps(self.INPUT_MAPS, directory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile)
+            self._readXputMaps(self.INPUT_MAPS, directory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, replaceParamFile=replaceParamFile, workers=workers, readRasterText=readRasterText)
 
             # Commit to database
             self._commit(session, self.COMMIT_ERROR_MESSAGE)
 
-    def readOutput(self, directory, projectFileName, session, spatial=False, spatialReferenceID=None):
+    def readOutput(self, directory, projectFileName, session, spatial=False, spatialReferenceID=None,
+                   workers=None, bulk=False, wmsCubeDirectory=None):
         """
         Read only output files for a GSSHA project to the database.
 
@@ -477,11 +541,22 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
             spatialReferenceID (int, optional): Integer id of spatial reference system for the model. If no id is
                 provided GsshaPy will attempt to automatically lookup the spatial reference ID. If this process fails,
                 default srid will be used (4326 for WGS 84).
+            workers (int, optional): Number of worker processes used to parse files concurrently. Files that can be
+                parsed without a database session are parsed in parallel and attached to the session in the order
+                they are listed in the project file, so the result is identical to a serial read. Only applies when
+                spatial is False. Defaults to None (serial read).
+            bulk (bool, optional): If True, high volume supporting objects such as time series, precipitation, link
+                node dataset and mapping table values are written to the database with bulk inserts instead of being
+                created as ORM objects. Defaults to False.
+            wmsCubeDirectory (str, optional): If given, the values of each WMS dataset file are also written to a
+                memory-mapped (time, active cell) cube in this directory while it is read (see
+                :meth:`gsshapy.orm.WMSDatasetFile.getCube`). Defaults to None.
         """
         self.project_directory = directory
         with tmp_chdir(directory):
             # Add project file to session
             session.add(self)
+            self._resetLoaded()
 
             # Read Project File
             self.read(directory, projectFileName, session, spatial, spatialReferenceID)
@@ -489,21 +564,32 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
             # Get the batch directory for output
             batchDirectory = self._getBatchDirectory(directory)
 
-            # Read Mask (dependency of some output files)
-            maskMap = WatershedMaskFile()
+            # Read Mask (dependency of some output files), unless it was read with the input files
             maskMapFilename = self.getCard('WATERSHED_MASK').value.strip('"')
-            maskMap.read(session=session, directory=directory, filename=maskMapFilename, spatial=spatial)
-            maskMap.projectFile = self
+            maskMap = next((m for m in self.maps if m.fileExtension == 'msk'), None)
+
+            if maskMap is None:
+                maskMap = WatershedMaskFile()
+                maskMap.read(session=session, directory=directory, filename=maskMapFilename, spatial=spatial)
+                maskMap.projectFile = self
 
             # Automatically derive the spatial reference system, if possible
             if spatialReferenceID is None:
                 spatialReferenceID = self._automaticallyDeriveSpatialReferenceId(directory)
 
+            self._setReadOptions(dict(groups=('mask', 'output', 'wms'), directory=directory,
+                                      batchDirectory=batchDirectory, projectFileName=projectFileName,
+                                      spatial=spatial, spatialReferenceID=spatialReferenceID, bulk=bulk,
+                                      readRasterText=True, wmsCubeDirectory=wmsCubeDirectory))
+            self._recordLoaded(self, directory, projectFileName)
+            self._recordLoaded(maskMap, directory, maskMapFilename)
+
             # Read Output Files
-            self._readXput(self.OUTPUT_FILES, batchDirectory, session, spatial=spatial, spatialReferenceID=spatialReferenceID)
+            self._readXput(self.OUTPUT_FILES, batchDirectory, session, spatial=spatial, spatialReferenceID=spatialReferenceID, workers=workers, bulk=bulk)
 
             # Read WMS Dataset Files
-            self._readWMSDatasets(self.WMS_DATASETS, batchDirectory, session, spatial=spatial, spatialReferenceID=spatialReferenceID)
+            self._readWMSDatasets(self.WMS_DATASETS, batchDirectory, session, spatial=spatial, spatialReferenceID=spatialReferenceID,
+                                  cubeDirectory=wmsCubeDirectory)
 
             # Commit to database
             self._commit(session, self.COMMIT_ERROR_MESSAGE)
@@ -584,7 +670,126 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
             return self._readXputFile(self.OUTPUT_FILES, card_name, directory,
                                       session, spatial, spatialReferenceID, **kwargs)
 
-    def writeProject(self, session, directory, name):
+    def refresh(self, session):
+        """
+        Re-read only the files of a GSSHA project that were added, changed or removed since the project was read.
+
+        The files listed in the project file, including batch mode output files, are compared to the files that were
+        loaded by the last call to readProject, readInput or readOutput using their size and modification time. The
+        size and modification time of the loaded files are stored in the database (see
+        :class:`.ProjectLoadedFile`), so a project queried in a new session can be refreshed as well. Added and changed
+        files are read into the database with the same options as the original read. The objects of changed and
+        removed files are deleted. All other objects are left untouched, except for the files that depend on a changed
+        or removed file (the link node datasets of the channel input file and the WMS datasets of the mask map), which
+        are read again. If the project file itself changed, the project cards are read again before the files are
+        compared. The mapping table file is read again when one of its index maps changes. Changes to the parameter
+        replacement files (REPLACE_PARAMS and REPLACE_VALS) are not detected.
+
+        Args:
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database
+
+        Returns:
+            dict: Lists of the paths of the files that were 'added', 'changed' and 'removed'.
+        """
+        options = self._getReadOptions()
+
+        if options is None:
+            raise ValueError('The project must be read with readProject, readInput or readOutput before it can be '
+                             'refreshed.')
+
+        directory = options['directory']
+        spatial = options['spatial']
+        spatialReferenceID = options['spatialReferenceID']
+        changes = {'added': [], 'changed': [], 'removed': []}
+
+        with tmp_chdir(directory):
+            # Read the project cards again if the project file changed
+            projectFilePath = os.path.abspath(os.path.join(directory, options['projectFileName']))
+            projectLoadedFile = self._getLoadedFiles().get(projectFilePath)
+
+            if projectLoadedFile is None or projectLoadedFile.isChanged():
+                for card in self.projectCards:
+                    session.delete(card)
+                self.projectCards = []
+
+                self.read(directory, options['projectFileName'], session, spatial=spatial,
+                          spatialReferenceID=self.srid)
+                changes['changed'].append(projectFilePath)
+
+                if 'output' in options['groups']:
+                    options['batchDirectory'] = self._getBatchDirectory(directory)
+                    self._setReadOptions(options)
+
+                self._recordLoaded(self, directory, options['projectFileName'])
+
+            expected = self._getRefreshReads(options)
+            loaded = self._getLoadedFiles()
+
+            removed = [path for path in loaded if path != projectFilePath and path not in expected]
+            changed = [path for path in expected if path in loaded and loaded[path].isChanged()]
+            added = [path for path in expected if path not in loaded]
+
+            # Read the files that depend on a changed or removed file again
+            dependents = set()
+            for path in removed + changed:
+                dependents.update(self.REFRESH_DEPENDENCIES.get(loaded[path].fileClass, ()))
+
+            if dependents:
+                changed = [path for path in expected if path in loaded and
+                           (path in changed or loaded[path].fileClass in dependents)]
+
+            # Delete the objects of changed and removed files
+            for path in removed + changed:
+                loadedFile = loaded.pop(path)
+                instance = loadedFile.getFileObject(session)
+
+                if instance is not None:
+                    for obj in self._getFileObjectTree(instance):
+                        session.delete(obj)
+
+                self.loadedFiles.remove(loadedFile)
+
+            session.flush()
+
+            # Read added and changed files in the order they are listed in the project file
+            for path, (fileIO, fileDirectory, filename, kwargs) in expected.items():
+                if path not in loaded:
+                    if fileIO is WMSDatasetFile:
+                        maskMap = self._getMaskMap(session)
+
+                        wmsDatasetFile = WMSDatasetFile()
+                        wmsDatasetFile.projectFile = self
+                        wmsDatasetFile.read(directory=fileDirectory,
+                                            filename=filename,
+                                            session=session,
+                                            maskMap=maskMap,
+                                            spatial=spatial,
+                                            spatialReferenceID=spatialReferenceID,
+                                            cubeDirectory=options.get('wmsCubeDirectory'))
+                        self._recordLoaded(wmsDatasetFile, fileDirectory, filename)
+                    else:
+                        self._invokeRead(fileIO=fileIO,
+                                         directory=fileDirectory,
+                                         filename=filename,
+                                         session=session,
+                                         spatial=spatial,
+                                         spatialReferenceID=spatialReferenceID,
+                                         **kwargs)
+
+            # Commit to database
+            self._commit(session, self.COMMIT_ERROR_MESSAGE)
+
+        changes['added'].extend(added)
+        changes['changed'].extend(changed)
+        changes['removed'].extend(removed)
+
+        log.info('Project refreshed: {0} files added, {1} changed, {2} removed'.format(len(changes['added']),
+                                                                                    len(changes['changed']),
+                                                                                    len(changes['removed'])))
+
+        return changes
+
+    def writeProject(self, session, directory, name, workers=None):
         """
         Write all files for a project from the database to file.
 
@@ -598,9 +803,13 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
                 naming convention will be given this name with the appropriate extension (e.g.: 'example.prj',
                 'example.cmt', and 'example.gag'). Files that do not follow this convention will retain their original
                 file names.
+            workers (int, optional): Number of worker processes used to write files concurrently. Each worker renders
+                and writes its share of the files through its own connection to the database, so the output is
+                identical to a serial write. Only applies to databases that can be shared between processes (i.e.: not
+                in-memory SQLite databases) and sessions without uncommitted changes. Defaults to None (serial write).
         """
         self.project_directory = directory
-        with tmp_chdir(directory):
+        with self._queuedWrites(session, workers), tmp_chdir(directory):
             # Get the batch directory for output
             batchDirectory = self._getBatchDirectory(directory)
 
@@ -625,7 +834,7 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
             # Write WMS Dataset Files
             self._writeWMSDatasets(session=session, directory=batchDirectory, wmsDatasetCards=self.WMS_DATASETS, name=name)
 
-    def writeInput(self, session, directory, name):
+    def writeInput(self, session, directory, name, workers=None):
         """
         Write only input files for a GSSHA project from the database to file.
 
@@ -636,9 +845,13 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
                 naming convention will be given this name with the appropriate extension (e.g.: 'example.prj',
                 'example.cmt', and 'example.gag'). Files that do not follow this convention will retain their original
                 file names.
+            workers (int, optional): Number of worker processes used to write files concurrently. Each worker renders
+                and writes its share of the files through its own connection to the database, so the output is
+                identical to a serial write. Only applies to databases that can be shared between processes (i.e.: not
+                in-memory SQLite databases) and sessions without uncommitted changes. Defaults to None (serial write).
         """
         self.project_directory = directory
-        with tmp_chdir(directory):
+        with self._queuedWrites(session, workers), tmp_chdir(directory):
             # Get param file for writing
             replaceParamFile = self.replaceParamFile
 
@@ -653,7 +866,7 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
 
 
 
-    def writeOutput(self, session, directory, name):
+    def writeOutput(self, session, directory, name, workers=None):
         """
         Write only output files for a GSSHA project from the database to file.
 
@@ -664,9 +877,13 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
                 naming convention will be given this name with the appropriate extension (e.g.: 'example.prj',
                 'example.cmt', and 'example.gag'). Files that do not follow this convention will retain their original
                 file names.
+            workers (int, optional): Number of worker processes used to write files concurrently. Each worker renders
+                and writes its share of the files through its own connection to the database, so the output is
+                identical to a serial write. Only applies to databases that can be shared between processes (i.e.: not
+                in-memory SQLite databases) and sessions without uncommitted changes. Defaults to None (serial write).
         """
         self.project_directory = directory
-        with tmp_chdir(directory):
+        with self._queuedWrites(session, workers), tmp_chdir(directory):
             # Get the batch directory for output
             batchDirectory = self._getBatchDirectory(directory)
 
@@ -1177,6 +1394,71 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
 
         return self.getGridByCard(grid_card_name)
 
+    def mapStatistics(self, session, compute=False, bins=10):
+        """
+        Retrieve the statistics of all raster maps and index maps of the project. By default only the statistics stored
+        by ``getStatistics`` are returned, so no map is read.
+
+        Args:
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
+            compute (bool, optional): If True, statistics that are missing or out of date are computed and committed,
+                which reads those maps. Defaults to False.
+            bins (int, optional): Number of histogram bins of computed statistics. Defaults to 10.
+
+        Returns:
+            OrderedDict: Statistics of each map as returned by ``getStatistics`` keyed by filename. The statistics of
+            maps that were not computed are None.
+        """
+        rasterMaps = session.query(RasterMapFile).\
+            filter(RasterMapFile.projectFile == self).\
+            order_by(RasterMapFile.id).\
+            all()
+
+        indexMaps = session.query(IndexMap).\
+            join(IndexMap.mapTableFile).\
+            filter(MapTableFile.projectFile == self).\
+            order_by(IndexMap.id).\
+            all()
+
+        statistics = OrderedDict()
+
+        for rasterMap in rasterMaps + indexMaps:
+            if compute:
+                statistics[rasterMap.filename] = rasterMap.getStatistics(bins=bins)
+            else:
+                statistics[rasterMap.filename] = rasterMap._getStoredStatistics(checkSource=True)
+
+        if compute:
+            session.commit()
+
+        return statistics
+
+    def getWatershedMask(self, session, maskMap=None):
+        """
+        Retrieve the parsed watershed mask of the project. The mask is parsed once and shared by the readers and writers
+        of the project, such as the WMS dataset files. It is parsed again when the mask map object or its raster
+        changes.
+
+        Args:
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
+            maskMap (:class:`gsshapy.orm.RasterMapFile`, optional): Mask map to parse. Defaults to the mask map of the
+                project.
+
+        Returns:
+            :class:`gsshapy.lib.watershed_mask.WatershedMask`: The parsed mask with a boolean array of the mask and the
+            indices of the active cells or None if the mask map has neither raster nor text.
+        """
+        if maskMap is None:
+            maskMap = self._getMaskMap(session)
+
+        source = maskMap._getRasterArraySource()
+        cached = self._watershedMask
+
+        if cached is None or cached[0] is not maskMap or cached[1] != source or cached[2] is not maskMap.raster:
+            self._watershedMask = (maskMap, source, maskMap.raster, WatershedMask.fromMaskMap(maskMap, session))
+
+        return self._watershedMask[3]
+
     def getIndexGrid(self, name):
         """
         Returns GDALGrid object of index map
@@ -1445,62 +1727,103 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
 
         return batchDirectory
 
-    def _readXput(self, fileCards, directory, session, spatial=False, spatialReferenceID=4236, replaceParamFile=None):
+    def _readXput(self, fileCards, directory, session, spatial=False, spatialReferenceID=4236, replaceParamFile=None,
+                  workers=None, bulk=False, readRasterText=True):
         """
         GSSHAPY Project Read Files from File Method
         """
         ## NOTE: This function is dependent on the project file being read first
-        # Read Input/Output Files
+        # Invoke read method on each file
+        self._invokeReads(reads=self._getXputReads(fileCards),
+                          directory=directory,
+                          session=session,
+                          spatial=spatial,
+                          spatialReferenceID=spatialReferenceID,
+                          replaceParamFile=replaceParamFile,
+                          workers=workers,
+                          fileKwargs=self._getFileReadKwargs(readRasterText),
+                          bulk=bulk)
+
+    def _readXputMaps(self, mapCards, directory, session, spatial=False, spatialReferenceID=4236, replaceParamFile=None,
+                      workers=None, readRasterText=True):
+        """
+        GSSHA Project Read Map Files from File Method
+        """
+        # Invoke read method on each map
+        self._invokeReads(reads=self._getXputMapReads(mapCards),
+                          directory=directory,
+                          session=session,
+                          spatial=spatial,
+                          spatialReferenceID=spatialReferenceID,
+                          replaceParamFile=replaceParamFile,
+                          workers=workers,
+                          readRasterText=readRasterText)
+
+    @staticmethod
+    def _getFileReadKwargs(readRasterText):
+        """
+        Read arguments that only apply to some of the files listed in the project file, keyed by file class
+        """
+        # The index maps are read with the mapping table file
+        return {MapTableFile: dict(readRasterText=readRasterText)}
+
+    def _getXputReads(self, fileCards):
+        """
+        List the (fileIO, filename) pairs of the files listed in the project file for the given file cards
+        """
+        reads = []
         for card in self.projectCards:
             if (card.name in fileCards) and self._noneOrNumValue(card.value) and fileCards[card.name]:
                 fileIO = fileCards[card.name]
                 filename = card.value.strip('"')
+                reads.append((fileIO, filename))
 
-                # Invoke read method on each file
-                self._invokeRead(fileIO=fileIO,
-                                 directory=directory,
-                                 filename=filename,
-                                 session=session,
-                                 spatial=spatial,
-                                 spatialReferenceID=spatialReferenceID,
-                                 replaceParamFile=replaceParamFile)
+        return reads
 
-    def _readXputMaps(self, mapCards, directory, session, spatial=False, spatialReferenceID=4236, replaceParamFile=None):
+    def _getXputMapReads(self, mapCards):
         """
-        GSSHA Project Read Map Files from File Method
+        List the (fileIO, filename) pairs of the map files listed in the project file for the given map cards
         """
+        reads = []
         if self.mapType in self.MAP_TYPES_SUPPORTED:
             for card in self.projectCards:
                 if (card.name in mapCards) and self._noneOrNumValue(card.value):
                     filename = card.value.strip('"')
-
-                    # Invoke read method on each map
-                    self._invokeRead(fileIO=WatershedMaskFile if card.name.lower() == 'watershed_mask' else RasterMapFile,
-                                     directory=directory,
-                                     filename=filename,
-                                     session=session,
-                                     spatial=spatial,
-                                     spatialReferenceID=spatialReferenceID,
-                                     replaceParamFile=replaceParamFile)
+                    fileIO = WatershedMaskFile if card.name.lower() == 'watershed_mask' else RasterMapFile
+                    reads.append((fileIO, filename))
         else:
             for card in self.projectCards:
                 if (card.name in mapCards) and self._noneOrNumValue(card.value):
                     filename = card.value.strip('"')
                     fileExtension = filename.split('.')[1]
                     if fileExtension in self.ALWAYS_READ_AND_WRITE_MAPS:
-                        # Invoke read method on each map
-                        self._invokeRead(fileIO=WatershedMaskFile if card.name.lower() == 'watershed_mask' else RasterMapFile,
-                                         directory=directory,
-                                         filename=filename,
-                                         session=session,
-                                         spatial=spatial,
-                                         spatialReferenceID=spatialReferenceID,
-                                         replaceParamFile=replaceParamFile)
+                        fileIO = WatershedMaskFile if card.name.lower() == 'watershed_mask' else RasterMapFile
+                        reads.append((fileIO, filename))
 
             log.warning('Could not read map files. '
                      'MAP_TYPE {0} not supported.'.format(self.mapType))
 
-    def _readWMSDatasets(self, datasetCards, directory, session, spatial=False, spatialReferenceID=4236):
+        return reads
+
+    def _getMaskMap(self, session):
+        """
+        Retrieve the mask map of the project. The mask map of the mask cache is reused while it belongs to the project
+        and has not been deleted, so it is not queried for every WMS dataset file.
+        """
+        if self._watershedMask is not None:
+            maskMap = self._watershedMask[0]
+            state = inspect(maskMap)
+
+            if state.session is session and not (state.deleted or state.was_deleted) and maskMap.projectFile is self:
+                return maskMap
+
+        return session.query(RasterMapFile).\
+            filter(RasterMapFile.projectFile == self).\
+            filter(RasterMapFile.fileExtension == 'msk').\
+            one()
+
+    def _readWMSDatasets(self, datasetCards, directory, session, spatial=False, spatialReferenceID=4236,
+                         cubeDirectory=None):
         """
         Method to handle the special case of WMS Dataset Files. WMS Dataset Files
         cannot be read in independently as other types of file can. They rely on
@@ -1508,10 +1831,7 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
         """
         if self.mapType in self.MAP_TYPES_SUPPORTED:
             # Get Mask Map dependency
-            maskMap = session.query(RasterMapFile).\
-                              filter(RasterMapFile.projectFile == self).\
-                              filter(RasterMapFile.fileExtension == 'msk').\
-                              one()
+            maskMap = self._getMaskMap(session)
 
             for card in self.projectCards:
                 if (card.name in datasetCards) and self._noneOrNumValue(card.value):
@@ -1527,10 +1847,12 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
                                             session=session,
                                             maskMap=maskMap,
                                             spatial=spatial,
-                                            spatialReferenceID=spatialReferenceID)
+                                            spatialReferenceID=spatialReferenceID,
+                                            cubeDirectory=cubeDirectory)
+                        self._recordLoaded(wmsDatasetFile, directory, filename)
                     else:
                         self._readBatchOutputForFile(directory, WMSDatasetFile, filename, session, spatial,
-                                                     spatialReferenceID, maskMap=maskMap)
+                                                     spatialReferenceID, maskMap=maskMap, cubeDirectory=cubeDirectory)
 
     def _readReplacementFiles(self, directory, session, spatial, spatialReferenceID):
         """
@@ -1575,21 +1897,14 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
         return replaceParamFile
 
     def _readBatchOutputForFile(self, directory, fileIO, filename, session, spatial, spatialReferenceID,
-                                replaceParamFile=None, maskMap=None):
+                                replaceParamFile=None, maskMap=None, **kwargs):
         """
         When batch mode is run in GSSHA, the files of the same type are
         prepended with an integer to avoid filename conflicts.
         This will attempt to read files in this format and
         throw warnings if the files aren't found.
         """
-        # Get contents of directory
-        directoryList = os.listdir(directory)
-
-        # Compile a list of files with that include the filename in them
-        batchFiles = []
-        for thing in directoryList:
-            if filename in thing:
-                batchFiles.append(thing)
+        batchFiles = self._getBatchFiles(directory, filename)
 
         numFilesRead = 0
 
@@ -1599,10 +1914,12 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
 
             if isinstance(instance, WMSDatasetFile):
                 instance.read(directory=directory, filename=batchFile, session=session, maskMap=maskMap, spatial=spatial,
-                              spatialReferenceID=spatialReferenceID)
+                              spatialReferenceID=spatialReferenceID, **kwargs)
             else:
                 instance.read(directory, batchFile, session, spatial=spatial, spatialReferenceID=spatialReferenceID,
-                              replaceParamFile=replaceParamFile)
+                              replaceParamFile=replaceParamFile, **kwargs)
+            self._recordLoaded(instance, directory, batchFile)
+
             # Increment runCounter for next file
             numFilesRead += 1
 
@@ -1620,24 +1937,296 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
             log.info('Batch mode output detected. {0} files read '
                      'for file {1}'.format(numFilesRead, filename))
 
+    def _getBatchFiles(self, directory, filename):
+        """
+        List the batch mode output files in a directory for a file listed in the project file
+        """
+        # Get contents of directory
+        directoryList = os.listdir(directory)
+
+        # Compile a list of files with that include the filename in them
+        batchFiles = []
+        for thing in directoryList:
+            if filename in thing:
+                batchFiles.append(thing)
+
+        return batchFiles
+
     def _invokeRead(self, fileIO, directory, filename, session, spatial=False,
                     spatialReferenceID=4236, replaceParamFile=None, **kwargs):
         """
         Invoke File Read Method on Other Files
         """
+        if instrumentation.is_enabled():
+            with instrumentation.file_context(card=self._getCardName(filename)):
+                return self._invokeFileRead(fileIO, directory, filename, session, spatial, spatialReferenceID,
+                                            replaceParamFile, **kwargs)
+
+        return self._invokeFileRead(fileIO, directory, filename, session, spatial, spatialReferenceID,
+                                    replaceParamFile, **kwargs)
+
+    def _invokeFileRead(self, fileIO, directory, filename, session, spatial, spatialReferenceID, replaceParamFile,
+                        **kwargs):
+        """
+        Read a file, restoring it from the parse cache or reading its batch mode output files if applicable
+        """
         path = os.path.join(directory, filename)
+        parseCache = get_parse_cache()
 
-        if os.path.isfile(path):
+        if os.path.isfile(path) and parseCache is not None and fileIO.PARALLEL_READ_SAFE and not spatial:
+            # Restore from or add to the parse cache (these files do not depend on the replacement parameters)
+            created, parseTime = _readDetached((fileIO, directory, filename, spatialReferenceID, parseCache, kwargs))
+            instance = self._attachDetached(created, session, path, parseTime)
+            self._recordLoaded(instance, directory, filename)
+            return instance
+        elif os.path.isfile(path):
             instance = fileIO()
             instance.projectFile = self
             instance.read(directory, filename, session, spatial=spatial,
                           spatialReferenceID=spatialReferenceID,
                           replaceParamFile=replaceParamFile, **kwargs)
+            self._recordLoaded(instance, directory, filename)
             return instance
         else:
             self._readBatchOutputForFile(directory, fileIO, filename, session,
-                                         spatial, spatialReferenceID, replaceParamFile)
+                                         spatial, spatialReferenceID, replaceParamFile, **kwargs)
+
+
+    def _invokeReads(self, reads, directory, session, spatial=False, spatialReferenceID=4236,
+                     replaceParamFile=None, workers=None, fileKwargs=None, **kwargs):
+        """
+        Invoke File Read Method on a List of (fileIO, filename) Pairs
+
+        When more than one worker is requested, files that can be parsed without a database session are parsed in a
+        pool of worker processes. The parsed objects are attached to the session in the order of the list, so the
+        result is identical to reading the files one after another. Read arguments that only apply to some file
+        classes are given in fileKwargs, keyed by file class.
+        """
+        def readKwargs(fileIO):
+            return dict(kwargs, **(fileKwargs or {}).get(fileIO, {}))
+
+        parallel = [bool(workers and workers > 1) and not spatial and
+                    fileIO.PARALLEL_READ_SAFE and os.path.isfile(os.path.join(directory, filename))
+                    for fileIO, filename in reads]
+
+        if sum(parallel) < 2:
+            for fileIO, filename in reads:
+                self._invokeRead(fileIO=fileIO,
+                                 directory=directory,
+                                 filename=filename,
+                                 session=session,
+                                 spatial=spatial,
+                                 spatialReferenceID=spatialReferenceID,
+                                 replaceParamFile=replaceParamFile,
+                                 **readKwargs(fileIO))
+            return
+
+        jobs = [(fileIO, directory, filename, spatialReferenceID, get_parse_cache(), readKwargs(fileIO))
+                for (fileIO, filename), isParallel in zip(reads, parallel) if isParallel]
+
+        pool = Pool(processes=min(workers, len(jobs)))
+
+        try:
+            # Results are returned in the order the jobs were submitted
+            results = pool.imap(_readDetached, jobs)
 
+            for (fileIO, filename), isParallel in zip(reads, parallel):
+                if isParallel:
+                    created, parseTime = next(results)
+
+                    with instrumentation.file_context(card=self._getCardName(filename)):
+                        instance = self._attachDetached(created, session, os.path.join(directory, filename),
+                                                        parseTime)
+
+                    self._recordLoaded(instance, directory, filename)
+                else:
+                    self._invokeRead(fileIO=fileIO,
+                                     directory=directory,
+                                     filename=filename,
+                                     session=session,
+                                     spatial=spatial,
+                                     spatialReferenceID=spatialReferenceID,
+                                     replaceParamFile=replaceParamFile,
+                                     **readKwargs(fileIO))
+        finally:
+            pool.close()
+            pool.join()
+
+    def _attachDetached(self, created, session, path=None, parseTime=None):
+        """
+        Attach the objects returned by the readDetached method of a file object to this project file and commit them.
+        """
+        if not created:
+            return
+
+        instance = created[0]
+        instance.projectFile = self
+        session.add_all(created)
+
+        # Attaching cascades the objects into the session in relationship order. Restore the order in which they
+        # were created, so that they are inserted with the same ids as a serial read.
+        states = [inspect(obj) for obj in created]
+        for state, insertOrder in zip(states, sorted(state.insert_order for state in states)):
+            state.insert_order = insertOrder
+
+        objects = instance._countReadObjects(created)
+        start = time.time()
+        instance._commit(session, instance.COMMIT_ERROR_MESSAGE)
+
+        if path is not None:
+            instance._emitReadEvent(path, parseTime, objects, time.time() - start)
+
+        return instance
+
+    def _getCardName(self, filename):
+        """
+        Name of the project card that lists a file or None if no card lists it
+        """
+        for card in self.projectCards:
+            if card.value is not None and card.value.strip('"') == filename:
+                return card.name
+
+    def _resetLoaded(self):
+        """
+        Forget the files loaded by the last project read before the project is read again
+        """
+        self.readOptions = None
+        self.loadedFiles = []
+
+    def _getReadOptions(self):
+        """
+        Options of the last project read or None if the project was not read with a project read
+        """
+        if self.readOptions is None:
+            return None
+
+        return json.loads(self.readOptions)
+
+    def _setReadOptions(self, options):
+        """
+        Store the options of a project read, so that refresh can read files with the same options
+        """
+        self.readOptions = json.dumps(options)
+
+    def _getLoadedFiles(self):
+        """
+        Ordered dictionary mapping the path of each file loaded by the last project read to its ProjectLoadedFile
+        """
+        return OrderedDict((loadedFile.path, loadedFile) for loadedFile in self.loadedFiles)
+
+    def _recordLoaded(self, instance, directory, filename):
+        """
+        Remember the size and modification time of a file read by a project read, so that it can be refreshed
+        """
+        if self.readOptions is None or instance is None:
+            return
+
+        path = os.path.abspath(os.path.join(directory, filename))
+        loadedFile = self._getLoadedFiles().get(path)
+
+        if loadedFile is None:
+            loadedFile = ProjectLoadedFile(path=path)
+            self.loadedFiles.append(loadedFile)
+
+        loadedFile.setFileObject(instance)
+
+        # The index maps of the mapping table file are read with it
+        loadedFile.includedFiles = []
+        if isinstance(instance, MapTableFile):
+            for indexMap in instance.indexMaps:
+                if indexMap.filename is not None:
+                    includedFile = ProjectLoadedFile(path=os.path.abspath(os.path.join(directory,
+                                                                                       indexMap.filename)))
+                    includedFile.setFileObject(indexMap)
+                    loadedFile.includedFiles.append(includedFile)
+
+    def _getRefreshReads(self, options):
+        """
+        List the files of the project that would be read with the given read options. Returns an ordered dictionary
+        mapping the path of each existing file to a (fileIO, directory, filename, kwargs) tuple.
+        """
+        directory = options['directory']
+        batchDirectory = options['batchDirectory']
+        fileKwargs = dict(bulk=options['bulk'])
+        mapKwargs = dict(readRasterText=options['readRasterText'])
+
+        inputKwargs = dict((fileIO, dict(fileKwargs, **kwargs))
+                           for fileIO, kwargs in self._getFileReadKwargs(options['readRasterText']).items())
+
+        reads = []
+        if 'input' in options['groups']:
+            reads.extend((fileIO, directory, filename, inputKwargs.get(fileIO, fileKwargs))
+                         for fileIO, filename in self._getXputReads(self.INPUT_FILES))
+        if 'maps' in options['groups']:
+            reads.extend((fileIO, directory, filename, mapKwargs)
+                         for fileIO, filename in self._getXputMapReads(self.INPUT_MAPS))
+        if 'mask' in options['groups']:
+            reads.append((WatershedMaskFile, directory, self.getCard('WATERSHED_MASK').value.strip('"'), dict()))
+        if 'output' in options['groups']:
+            reads.extend((fileIO, batchDirectory, filename, fileKwargs)
+                         for fileIO, filename in self._getXputReads(self.OUTPUT_FILES))
+        if 'wms' in options['groups'] and self.mapType in self.MAP_TYPES_SUPPORTED:
+            reads.extend((WMSDatasetFile, batchDirectory, card.value.strip('"'), dict())
+                         for card in self.projectCards
+                         if card.name in self.WMS_DATASETS and self._noneOrNumValue(card.value))
+
+        expected = OrderedDict()
+        for fileIO, fileDirectory, filename, kwargs in reads:
+            if os.path.isfile(os.path.join(fileDirectory, filename)):
+                filenames = [filename]
+            else:
+                filenames = self._getBatchFiles(fileDirectory, filename)
+
+            for name in filenames:
+                path = os.path.abspath(os.path.join(fileDirectory, name))
+                expected[path] = (fileIO, fileDirectory, name, kwargs)
+
+        return expected
+
+    def _getFileObjectTree(self, instance):
+        """
+        Collect a file object and all of the supporting objects that were created when it was read. Other file objects
+        and objects that belong to other file objects (e.g.: link node datasets of the stream links of a channel input
+        file) are excluded.
+        """
+        def isFileObject(obj):
+            return hasattr(type(obj), 'projectFile') and not isinstance(obj, (ProjectFile, ProjectCard))
+
+        def belongsToOtherFile(obj):
+            for prop in inspect(type(obj)).relationships:
+                if prop.direction is MANYTOONE:
+                    parent = getattr(obj, prop.key)
+                    if parent is not None and parent is not instance and isFileObject(parent):
+                        return True
+            return False
+
+        objects = []
+        visited = set()
+        stack = [instance]
+
+        while stack:
+            obj = stack.pop()
+
+            if id(obj) in visited:
+                continue
+
+            visited.add(id(obj))
+            objects.append(obj)
+
+            for prop in inspect(type(obj)).relationships:
+                if prop.direction not in (ONETOMANY, MANYTOMANY):
+                    continue
+
+                value = getattr(obj, prop.key)
+                children = value if prop.uselist else [value]
+
+                for child in children:
+                    if child is None or isinstance(child, (ProjectFile, ProjectCard)) or isFileObject(child) \
+                            or belongsToOtherFile(child):
+                        continue
+                    stack.append(child)
+
+        return objects
 
     def _writeXput(self, session, directory, fileCards,
                    name=None, replaceParamFile=None):
@@ -1666,7 +2255,8 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
                                   session=session,
                                   directory=directory,
                                   filename=filename,
-                                  replaceParamFile=replaceParamFile)
+                                  replaceParamFile=replaceParamFile,
+                                  cardName=card.name)
 
     def _writeXputMaps(self, session, directory, mapCards,
                        name=None, replaceParamFile=None):
@@ -1686,7 +2276,8 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
                                       session=session,
                                       directory=directory,
                                       filename=filename,
-                                      replaceParamFile=replaceParamFile)
+                                      replaceParamFile=replaceParamFile,
+                                      cardName=card.name)
         else:
             for card in self.projectCards:
                 if (card.name in mapCards) and self._noneOrNumValue(card.value):
@@ -1703,7 +2294,8 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
                                           session=session,
                                           directory=directory,
                                           filename=filename,
-                                          replaceParamFile=replaceParamFile)
+                                          replaceParamFile=replaceParamFile,
+                                          cardName=card.name)
 
             log.error('Could not write map files. MAP_TYPE {0} '
                       'not supported.'.format(self.mapType))
@@ -1713,6 +2305,8 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
         GSSHAPY Project Write WMS Datasets to File Method
         """
         if self.mapType in self.MAP_TYPES_SUPPORTED:
+            maskMap = None
+
             for card in self.projectCards:
                 if (card.name in wmsDatasetCards) and self._noneOrNumValue(card.value):
                     filename = card.value.strip('"')
@@ -1725,10 +2319,8 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
                     extension = filename.split('.')[1]
 
                     # Get mask map file
-                    maskMap = session.query(RasterMapFile).\
-                        filter(RasterMapFile.projectFile == self).\
-                        filter(RasterMapFile.fileExtension == 'msk').\
-                        one()
+                    if maskMap is None:
+                        maskMap = self._getMaskMap(session)
 
                     # Default wms dataset
                     wmsDataset = None
@@ -1754,8 +2346,8 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
 
                     # Initiate Write Method on File
                     if wmsDataset is not None and maskMap is not None:
-                        wmsDataset.write(session=session, directory=directory,
-                                         name=filename, maskMap=maskMap)
+                        self._writeFile(wmsDataset, session=session, directory=directory,
+                                        name=filename, maskMap=maskMap)
         else:
             log.error('Could not write WMS Dataset files. '
                       'MAP_TYPE {0} not supported.'.format(self.mapType))
@@ -1765,12 +2357,14 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
         Write the replacement files
         """
         if self.replaceParamFile:
-            self.replaceParamFile.write(session=session, directory=directory,
-                                        name=name)
+            with instrumentation.file_context(card='REPLACE_PARAMS'):
+                self._writeFile(self.replaceParamFile, session=session, directory=directory,
+                                name=name)
 
         if self.replaceValFile:
-            self.replaceValFile.write(session=session, directory=directory,
-                                      name=name)
+            with instrumentation.file_context(card='REPLACE_VALS'):
+                self._writeFile(self.replaceValFile, session=session, directory=directory,
+                                name=name)
 
     def _invokeWriteForMultipleOfType(self, directory, extension, fileIO,
                                       filename, session, replaceParamFile=None,
@@ -1789,20 +2383,30 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
                 prefixFilename = prefix + filename
 
                 if isinstance(instance, WMSDatasetFile):
-                    instance.write(session=session, directory=directory,
-                                   name=prefixFilename, maskMap=maskMap)
+                    self._writeFile(instance, session=session, directory=directory,
+                                    name=prefixFilename, maskMap=maskMap)
                 else:
-                    instance.write(session=session, directory=directory,
-                                   name=prefixFilename,
-                                   replaceParamFile=replaceParamFile)
+                    self._writeFile(instance, session=session, directory=directory,
+                                    name=prefixFilename,
+                                    replaceParamFile=replaceParamFile)
 
         log.info('Batch mode output detected. {1} files written '
                  'having extension {0}.'.format(extension, index + 1))
 
-    def _invokeWrite(self, fileIO, session, directory, filename, replaceParamFile):
+    def _invokeWrite(self, fileIO, session, directory, filename, replaceParamFile, cardName=None):
         """
         Invoke File Write Method on Other Files
         """
+        if instrumentation.is_enabled():
+            with instrumentation.file_context(card=cardName):
+                return self._invokeFileWrite(fileIO, session, directory, filename, replaceParamFile)
+
+        return self._invokeFileWrite(fileIO, session, directory, filename, replaceParamFile)
+
+    def _invokeFileWrite(self, fileIO, session, directory, filename, replaceParamFile):
+        """
+        Write the file object of the given type or all files of the type when batch mode output was read
+        """
         # Default value for instance
         instance = None
 
@@ -1838,8 +2442,78 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
 
         # Initiate Write Method on File
         if instance is not None:
-            instance.write(session=session, directory=directory, name=filename,
-                           replaceParamFile=replaceParamFile)
+            self._writeFile(instance, session=session, directory=directory, name=filename,
+                            replaceParamFile=replaceParamFile)
+
+    def _writeFile(self, instance, session, directory, name, **kwargs):
+        """
+        Write a file object or queue the write for a worker process when writing in parallel
+        """
+        if self._writeJobs is None:
+            instance.write(session=session, directory=directory, name=name, **kwargs)
+            return
+
+        # Workers look up the file object and database objects passed as arguments by id
+        references = dict()
+        for key, value in list(kwargs.items()):
+            if hasattr(value, '_sa_instance_state'):
+                references[key] = (type(value), value.id)
+                del kwargs[key]
+
+        # Writes to the same file are grouped by the path the write of the file object produces, so they run in the
+        # order they were issued
+        directory = os.path.abspath(directory)
+        path = instance._getWritePath(directory, name)
+
+        self._writeJobs.setdefault(path, []).append((session.get_bind().url, type(instance), instance.id, directory,
+                                                     name, kwargs, references, instrumentation.get_context()))
+
+    @contextmanager
+    def _queuedWrites(self, session, workers):
+        """
+        Queue the file writes issued within the context and run them in a pool of worker processes on exit. The
+        queued directories are absolute, so the pool runs from the original working directory (relative SQLite
+        database paths resolve the same way as in the session).
+        """
+        if not workers or workers < 2:
+            yield
+            return
+
+        url = session.get_bind().url
+
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            log.info('In-memory databases cannot be shared with worker processes. Files will be written serially.')
+            yield
+            return
+
+        if session.new or session.deleted or any(obj is not self for obj in session.dirty):
+            log.info('The session has uncommitted changes that worker processes would not see. Files will be '
+                     'written serially.')
+            yield
+            return
+
+        self._writeJobs = OrderedDict()
+
+        try:
+            yield
+            jobs = list(self._writeJobs.values())
+        finally:
+            self._writeJobs = None
+
+        if not jobs:
+            return
+
+        pool = Pool(processes=min(workers, len(jobs)))
+
+        try:
+            # Each worker writes a group of jobs with the same path serially. Events of the worker processes are sent to
+            # the sinks of this process.
+            for events in pool.imap_unordered(_writeDetachedGroup, jobs):
+                for event in events:
+                    instrumentation.emit_event(event)
+        finally:
+            pool.close()
+            pool.join()
 
     def _replaceNewFilename(self, filename, name):
         # Variables
@@ -1899,7 +2573,7 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
     def _extractCard(self, projectLine, force_relative=True):
         DIRECTORY_PATHS = ('REPLACE_FOLDER',)
 
-        splitLine = shlex.split(projectLine)
+        splitLine = pt.splitLine(projectLine)
         cardName = splitLine[0]
 
         # pathSplit will fail on boolean cards (no value
@@ -1992,6 +2666,69 @@ class ProjectFile(DeclarativeBase, GsshaPyFileObjectBase):
         return {'name': cardName, 'value': cardValue}
 
 
+def _readDetached(job):
+    """
+    Parse a file without a database session, using the parse cache if one is given. Returns the parsed objects and the
+    time spent parsing or restoring them. Defined at module level so it can be used in a worker process.
+    """
+    fileIO, directory, filename, spatialReferenceID, parseCache, kwargs = job
+    path = os.path.join(directory, filename)
+    start = time.time()
+
+    if parseCache is not None:
+        created = parseCache.get(fileIO, path, spatialReferenceID=spatialReferenceID, **kwargs)
+
+        if created is not None:
+            return created, time.time() - start
+
+    instance = fileIO()
+    created = instance.readDetached(directory, filename, spatialReferenceID, **kwargs)
+    parseTime = time.time() - start
+
+    if parseCache is not None and created:
+        parseCache.put(fileIO, path, created, spatialReferenceID=spatialReferenceID, **kwargs)
+
+    return created, parseTime
+
+
+def _writeDetachedGroup(jobs):
+    """
+    Write file objects that write to the same file one after another, in the order the writes were issued. Returns the
+    instrumentation events of the writes. Defined at module level so it can be used in a worker process.
+    """
+    events = []
+
+    for job in jobs:
+        events.extend(_writeDetached(job))
+
+    return events
+
+
+def _writeDetached(job):
+    """
+    Write a file object through a new database session. Returns the instrumentation events of the write. Defined at
+    module level so it can be used in a worker process.
+    """
+    url, fileIO, fileID, directory, name, kwargs, references, context = job
+
+    engine = create_engine(url)
+    session = sessionmaker(bind=engine)()
+
+    try:
+        for key, (referenceIO, referenceID) in references.items():
+            kwargs[key] = session.query(referenceIO).get(referenceID)
+
+        instance = session.query(fileIO).get(fileID)
+
+        with instrumentation.capture() as sink, instrumentation.file_context(**context):
+            instance.write(session=session, directory=directory, name=name, **kwargs)
+    finally:
+        session.close()
+        engine.dispose()
+
+    return sink.events
+
+
 class ProjectCard(DeclarativeBase):
     """
     Object containing data for a single card in the project file.
@@ -2049,3 +2786,91 @@ class ProjectCard(DeclarativeBase):
             else:
                 line = '%s%s%s\n' % (self.name, ' ' * numSpaces, self.value)
         return line
+
+
+class ProjectLoadedFile(DeclarativeBase):
+    """
+    Object containing the size and modification time of a file that was read by a project read. Used by
+    :meth:`gsshapy.orm.ProjectFile.refresh` to find the files that changed since the project was read. Files that are
+    read with another file (e.g.: the index maps of the mapping table file) are stored as included files of that file.
+    """
+    __tablename__ = 'prj_loaded_files'
+
+    tableName = __tablename__  #: Database tablename
+
+    # Primary and Foreign Keys
+    id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
+    projectFileID = Column(Integer, ForeignKey('prj_project_files.id'))  #: FK
+    parentID = Column(Integer, ForeignKey('prj_loaded_files.id'))  #: FK
+
+    # Value Columns
+    path = Column(String, nullable=False)  #: STRING
+    size = Column(BigInteger)  #: BIGINT
+    modifiedTime = Column(Float)  #: FLOAT
+    fileClass = Column(String)  #: STRING
+    fileID = Column(Integer)  #: INTEGER
+
+    # Relationship Properties
+    projectFile = relationship('ProjectFile', back_populates='loadedFiles')  #: RELATIONSHIP
+    includedFiles = relationship('ProjectLoadedFile', cascade='all, delete-orphan')  #: RELATIONSHIP
+
+    def __init__(self, path):
+        """
+        Constructor
+        """
+        self.path = path
+
+    def __repr__(self):
+        return '<ProjectLoadedFile: Path=%s, Size=%s, ModifiedTime=%s>' % (self.path, self.size, self.modifiedTime)
+
+    def setFileObject(self, instance):
+        """
+        Record the file object read from the file and the current size and modification time of the file.
+
+        Args:
+            instance: File object read from the file.
+        """
+        self.fileClass = type(instance).__name__
+        self.fileID = instance.id
+        self.size, self.modifiedTime = self._getSignature(self.path)
+
+    def getFileObject(self, session):
+        """
+        Retrieve the file object read from the file.
+
+        Args:
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database
+
+        Returns:
+            File object or None if it no longer exists.
+        """
+        if self.fileClass == ProjectFile.__name__:
+            fileIO = ProjectFile
+        else:
+            fileIO = getattr(file_io, self.fileClass)
+
+        return session.query(fileIO).get(self.fileID)
+
+    def isChanged(self):
+        """
+        Check whether the file or one of its included files changed since it was read.
+
+        Returns:
+            bool: True if the size or modification time of the file or an included file changed.
+        """
+        if self._getSignature(self.path) != (self.size, self.modifiedTime):
+            return True
+
+        return any(includedFile.isChanged() for includedFile in self.includedFiles)
+
+    @staticmethod
+    def _getSignature(path):
+        """
+        Size and modification time of a file or (None, None) if it doesn't exist
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, None
+
+        return stat.st_size, stat.st_mtime
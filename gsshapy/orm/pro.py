@@ -37,6 +37,7 @@ class ProjectionFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'pro_projection_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
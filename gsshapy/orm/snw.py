@@ -35,6 +35,7 @@ class NwsrfsFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'snw_nwsrfs_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
@@ -188,6 +189,7 @@ class OrographicGageFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'snw_orographic_gage_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
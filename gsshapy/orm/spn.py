@@ -16,7 +16,6 @@ __all__ = ['StormPipeNetworkFile',
            'SuperJunction',
            'Connection']
 
-from future.utils import iteritems
 from sqlalchemy import ForeignKey, Column
 from sqlalchemy.types import Integer, Float, String
 from sqlalchemy.orm import relationship
@@ -40,6 +39,7 @@ class StormPipeNetworkFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'spn_storm_pipe_network_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
@@ -78,14 +78,9 @@ class StormPipeNetworkFile(DeclarativeBase, GsshaPyFileObjectBase):
         slinks = []
         connections = []
 
-        # Parse file into chunks associated with keywords/cards
+        # Parse chunks associated with each key as the file is read
         with open(path, 'r') as f:
-            chunks = pt.chunk(KEYWORDS, f)
-
-        # Parse chunks associated with each key
-        for key, chunkList in iteritems(chunks):
-            # Parse each chunk in the chunk list
-            for chunk in chunkList:
+            for key, chunk in pt.chunkIter(KEYWORDS, f):
                 # Call chunk specific parsers for each chunk
                 result = KEYWORDS[key](key, chunk)
 
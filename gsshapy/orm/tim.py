@@ -39,6 +39,7 @@ class TimeSeriesFile(DeclarativeBase, GsshaPyFileObjectBase):
     __tablename__ = 'tim_time_series_files'
 
     tableName = __tablename__  #: Database tablename
+    PARALLEL_READ_SAFE = True  #: Can be parsed without a database session
 
     # Primary and Foreign Keys
     id = Column(Integer, autoincrement=True, primary_key=True)  #: PK
@@ -151,6 +152,14 @@ class TimeSeriesFile(DeclarativeBase, GsshaPyFileObjectBase):
 
             for record in timeSeries:
                 for index, value in enumerate(record['values']):
+                    # Queue values for bulk insert
+                    if self._bulkRows is not None:
+                        self._addBulkRow(TimeSeriesValue,
+                                         timeSeriesID=series[index],
+                                         simTime=record['time'],
+                                         value=value)
+                        continue
+
                     # Create GSSHAPY TimeSeriesValue objects
                     tsVal = TimeSeriesValue(simTime=record['time'],
                                             value=value)
@@ -14,18 +14,28 @@ __all__ = ['WMSDatasetFile', 'WMSDatasetRaster']
 from datetime import datetime, timedelta
 import logging
 import os
+import re
+import time
 from zipfile import ZipFile
 
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, event, inspect
 from sqlalchemy.types import Integer, String, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship, deferred, defer, undefer
 from mapkit.RasterLoader import RasterLoader
 from mapkit.RasterConverter import RasterConverter
 from mapkit.sqlatypes import Raster
+import numpy as np
 
 from . import DeclarativeBase
 from ..base.file_base import GsshaPyFileObjectBase
-from ..lib import parsetools as pt, wms_dataset_chunk as wdc
+from ..lib import wms_dataset_chunk as wdc
+from ..lib.grass_ascii import _parse_values
+from ..lib.text_compression import CompressedText
+from ..lib.watershed_mask import WatershedMask
+from ..lib.wms_aggregate import DEFAULT_REDUCTIONS, TimeStepAggregator
+from ..lib.wms_cube import WMSDatasetCube, WMSDatasetCubeWriter, cube_exists, remove_cube
+from ..lib.wms_export import write_netcdf, write_zarr
+from ..lib.write_tools import open_output
 from .map import RasterMapFile
 from ..base.rast import RasterObjectBase
 
@@ -61,6 +71,7 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
     numberData = Column(Integer)  #: INTEGER
     numberCells = Column(Integer)  #: INTEGER
     name = Column(String)  #: STRING
+    cubePath = Column(String)  #: STRING
 
     # Relationship Properties
     projectFile = relationship('ProjectFile', back_populates='wmsDatasets')  #: RELATIONSHIP
@@ -70,6 +81,10 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
     SCALAR_TYPE = 1
     VECTOR_TYPE = 0
     VALID_DATASET_TYPES = (VECTOR_TYPE, SCALAR_TYPE)
+    WRITE_BATCH_SIZE = 100  # Time steps loaded per batch when the file is written
+
+    _cube = None  # Cached cube of getCube
+    _streamedObjects = 0  # Objects flushed while the file was read
 
     def __init__(self):
         """
@@ -108,9 +123,19 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
                 self.numberCells,
                 self.fileExtension)
 
-    def read(self, directory, filename, session, maskMap, spatial=False, spatialReferenceID=4236):
+    def read(self, directory, filename, session, maskMap, spatial=False, spatialReferenceID=4236, cubeDirectory=None,
+             callback=None):
         """
         Read file into the database.
+
+        The file is streamed one time step at a time. Each time step is added to the database, written to the cube and
+        passed to the callback before the next one is read, so memory is bounded by one time step.
+
+        If cubeDirectory is given, the values of all time steps are also written to a memory-mapped (time, active
+        cell) cube in that directory while the file is read (see ``getCube``).
+
+        If callback is given, it is called with the number of each time step (starting at 1) and a dictionary with its
+        'iStatus', 'timestamp', 'cellValues' (array with shape (rows, columns) or None) and 'rasterText'.
         """
 
         # Read parameter derivatives
@@ -129,10 +154,17 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
             session.add(self)
 
             # Read
-            self._read(directory, filename, session, path, name, extension, spatial, spatialReferenceID, maskMap)
+            start = time.time()
+            self._streamedObjects = 0
+            self._read(directory, filename, session, path, name, extension, spatial, spatialReferenceID, maskMap,
+                       cubeDirectory=cubeDirectory, callback=callback)
+            parseTime = time.time() - start
+            objects = self._countReadObjects(session.new) + self._streamedObjects
 
             # Commit to database
+            start = time.time()
             self._commit(session, self.COMMIT_ERROR_MESSAGE)
+            self._emitReadEvent(path, parseTime, objects, time.time() - start)
 
         else:
             # Rollback the session if the file doesn't exist
@@ -150,35 +182,16 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
         *name* = name of file that will be written (e.g.: 'my_project.ext')\n
         """
 
-        # Assemble Path to file
-        name_split = name.split('.')
-        name = name_split[0]
-
-        # Default extension
-        extension = ''
-
-        if len(name_split) >= 2:
-            extension = name_split[-1]
-
-        # Run name preprocessor method if present
-        try:
-            name = self._namePreprocessor(name)
-        except:
-            'DO NOTHING'
+        filePath = self._getWritePath(directory, name)
 
-        if extension == '':
-            filename = '{0}.{1}'.format(name, self.fileExtension)
-        else:
-            filename = '{0}.{1}'.format(name, extension)
-
-        filePath = os.path.join(directory, filename)
-
-        with open(filePath, 'w') as openFile:
+        with open_output(filePath) as openFile:
             # Write Lines
             self._write(session=session,
                         openFile=openFile,
                         maskMap=maskMap)
 
+        self._emitWriteEvent(openFile)
+
 
 
     def getAsKmlGridAnimation(self, session, projectFile=None, path=None, documentName=None, colorRamp=None, alpha=1.0, noDataValue=0.0):
@@ -305,9 +318,203 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
 
         return kmlString, binaryPngStrings
 
-    def _read(self, directory, filename, session, path, name, extension, spatial, spatialReferenceID, maskMap):
+    def to_netcdf(self, session, path, variableName=None, chunks=None, complevel=4, noDataValue=-9999.0):
+        """
+        Write the WMS dataset to a CF-compliant NetCDF4 file with a (time, y, x) variable. The coordinates are the
+        cell centers of the project grid and the projection is the projection of the project. The time steps are
+        written one at a time, so only one time step is in memory. Requires the netCDF4 package.
+
+        Args:
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
+            path (str): Path to the NetCDF file.
+            variableName (str, optional): Name of the variable. Defaults to the name of the dataset.
+            chunks (tuple, optional): Chunk sizes of the (time, y, x) dimensions. Defaults to one time step in tiles of at
+                most 256 x 256 cells.
+            complevel (int, optional): zlib compression level from 0 (none) to 9. Defaults to 4.
+            noDataValue (float, optional): Value of the cells outside of the watershed. Defaults to -9999.0.
+
+        Returns:
+            int: Number of time steps written.
+        """
+        return self._export(write_netcdf, session, path, variableName, chunks=chunks, complevel=complevel,
+                            noDataValue=noDataValue)
+
+    def to_zarr(self, session, path, variableName=None, chunks=None, compressor=None, noDataValue=-9999.0):
+        """
+        Write the WMS dataset to a CF-compliant Zarr store with a (time, y, x) variable. The coordinates are the cell
+        centers of the project grid and the projection is the projection of the project. The time steps are appended one
+        at a time, so only one time step is in memory. Requires the xarray and zarr packages.
+
+        Args:
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
+            path (str): Path to the Zarr store.
+            variableName (str, optional): Name of the variable. Defaults to the name of the dataset.
+            chunks (tuple, optional): Chunk sizes of the (time, y, x) dimensions. Defaults to one time step in tiles of at
+                most 256 x 256 cells.
+            compressor (object, optional): Zarr compressor (e.g.: numcodecs.Blosc(cname='zstd', clevel=5)). Defaults to
+                the default compressor of zarr.
+            noDataValue (float, optional): Value of the cells outside of the watershed. Defaults to -9999.0.
+
+        Returns:
+            int: Number of time steps written.
+        """
+        return self._export(write_zarr, session, path, variableName, chunks=chunks, compressor=compressor,
+                            noDataValue=noDataValue)
+
+    def aggregate(self, session, reductions=DEFAULT_REDUCTIONS, threshold=0.0, noDataValue=None):
+        """
+        Compute per-cell reductions of the time steps in a single pass, e.g.: the maximum depth, the time of the peak,
+        the duration above a threshold and the final state of a flood. Only the running accumulators and one time step
+        are held in memory. To compute the reductions while the file is read, pass the ``addTimeStep`` method of a
+        :class:`gsshapy.lib.wms_aggregate.TimeStepAggregator` as the callback of ``read`` and convert the aggregator
+        with ``getAggregateMaps``.
+
+        Args:
+            session (:mod:`sqlalchemy.orm.session.Session`): SQLAlchemy session object bound to PostGIS enabled database.
+            reductions (iterable, optional): Names of the reductions (see :data:`gsshapy.lib.wms_aggregate.REDUCTIONS`).
+                Defaults to max, time_of_max, duration_above and final.
+            threshold (float, optional): Threshold of first_above and duration_above. Defaults to 0.0.
+            noDataValue (float, optional): Value of the cells outside of the watershed and of the cells that never
+                exceed the threshold in first_above. Defaults to the no data value of raster maps.
+
+        Returns:
+            dict: Raster maps of the reductions keyed by name (see ``getAggregateMaps``).
+        """
+        watershedMask = self._getProjectWatershedMask(session)
+        aggregator = TimeStepAggregator.fromWatershedMask(watershedMask, reductions=reductions, threshold=threshold)
+
+        for timestamp, grid in self._iterTimeStepGrids(session, watershedMask):
+            aggregator.update(timestamp, grid)
+
+        return self.getAggregateMaps(aggregator, noDataValue=noDataValue)
+
+    def getAggregateMaps(self, aggregator, noDataValue=None):
+        """
+        Convert the reductions of an aggregator into raster maps. The maps are not added to the session. Write them as
+        GRASS ASCII maps with ``RasterMapFile.write``.
+
+        Args:
+            aggregator (:class:`gsshapy.lib.wms_aggregate.TimeStepAggregator`): Aggregator of the time steps of the
+                dataset.
+            noDataValue (float, optional): Value of the cells without a result. Defaults to the no data value of raster
+                maps.
+
+        Returns:
+            dict: :class:`gsshapy.orm.RasterMapFile` objects keyed by the name of the reduction. The file extension of
+            each map is the file extension of the dataset followed by the name of the reduction (e.g.: 'dep_max').
+        """
+        aggregateMaps = dict()
+
+        for reduction, array in aggregator.results().items():
+            rasterMap = RasterMapFile()
+            rasterMap.fileExtension = '{0}_{1}'.format(self.fileExtension, reduction)
+            rasterMap.from_array(array, aggregator.geotransform, noDataValue=noDataValue)
+            aggregateMaps[reduction] = rasterMap
+
+        return aggregateMaps
+
+    def _getProjectWatershedMask(self, session):
+        """
+        Retrieve the parsed watershed mask of the project of the dataset.
+        """
+        if self.projectFile is None:
+            raise ValueError('The WMS dataset {0} does not belong to a project.'.format(self.fileExtension))
+
+        watershedMask = self.projectFile.getWatershedMask(session)
+
+        if watershedMask is None:
+            raise ValueError('The mask map of the project has no values.')
+
+        return watershedMask
+
+    def _export(self, writer, session, path, variableName, **kwargs):
+        """
+        Write the time steps of the dataset on the grid of the project with one of the writers of wms_export.
+        """
+        projectFile = self.projectFile
+        watershedMask = self._getProjectWatershedMask(session)
+
+        if variableName is None:
+            variableName = re.sub(r'\W+', '_', (self.name or '').strip('"')).strip('_') or self.fileExtension
+
+        return writer(path,
+                      self._iterTimeStepGrids(session, watershedMask),
+                      watershedMask.shape,
+                      watershedMask.geotransform,
+                      variableName,
+                      self._getStartDateTime(projectFile),
+                      wkt=self._getProjectWkt(projectFile),
+                      attributes={'long_name': (self.name or variableName).strip('"')},
+                      **kwargs)
+
+    def _iterTimeStepGrids(self, session, watershedMask):
+        """
+        Generate the timestamps and grids of the time steps one at a time. The cells outside of the watershed are NaN.
+        The cube is used if there is one, otherwise the raster of each time step is parsed and released.
+        """
+        cube = self.getCube()
+
+        if cube is not None:
+            for index, timestamp in enumerate(cube.timestamps):
+                yield float(timestamp), cube.getTimeStep(index, noDataValue=np.nan)
+            return
+
+        rows, columns = watershedMask.shape
+        inactive = ~watershedMask.array
+
+        if inspect(self).persistent and 'rasters' not in self.__dict__:
+            # Query the time steps instead of loading the relationship, so the rasters are loaded one at a time
+            rasters = session.query(WMSDatasetRaster).\
+                with_parent(self).\
+                options(defer(WMSDatasetRaster.raster)).\
+                order_by(WMSDatasetRaster.timeStep)
+        else:
+            rasters = sorted(self.rasters, key=lambda r: r.timeStep)
+
+        for raster in rasters:
+            values = _parse_values(raster.getAsWmsDatasetString(session) or '', 'float32')
+
+            if values.size == rows * columns:
+                grid = values.reshape(rows, columns)
+            elif values.size == len(watershedMask.activeCells):
+                grid = np.zeros(rows * columns, dtype=np.float32)
+                grid[watershedMask.activeCells] = values
+                grid = grid.reshape(rows, columns)
+            else:
+                raise ValueError('Time step {0} of {1} has {2} values, but the grid has {3} cells.'.format(
+                    raster.timeStep, self.fileExtension, values.size, rows * columns))
+
+            grid[inactive] = np.nan
+
+            # Release the values of the time step, they are loaded again on access
+            loaded = [key for key in ('raster', 'rasterText') if key in raster.__dict__]
+
+            if loaded and inspect(raster).persistent and raster not in session.dirty:
+                session.expire(raster, loaded)
+
+            yield raster.timestamp, grid
+
+    @staticmethod
+    def _getProjectWkt(projectFile):
+        """
+        Retrieve the projection of the project or None if the project has no projection file.
+        """
+        if projectFile.project_directory is None or projectFile.getCard('#PROJECTION_FILE') is None:
+            return None
+
+        try:
+            return projectFile.getWkt()
+        except (IOError, OSError):
+            log.warning('Could not read the projection file of the project.')
+            return None
+
+    def _read(self, directory, filename, session, path, name, extension, spatial, spatialReferenceID, maskMap,
+              cubeDirectory=None, callback=None):
         """
         WMS Dataset File Read from File Method
+
+        The file is read in a single pass and each time step is emitted before the next one is read, so only one time
+        step is held in memory.
         """
         # Assign file extension attribute to file object
         self.fileExtension = extension
@@ -323,64 +530,81 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
             cellSizeX = int(abs(maskMap.west - maskMap.east) / columns)
             cellSizeY = -1 * cellSizeX
 
-            # Dictionary of keywords/cards and parse function names
-            KEYWORDS = {'DATASET': wdc.datasetHeaderChunk,
-                        'TS': wdc.datasetScalarTimeStepChunk}
-
-            # Open file and read plain text into text field
-            with open(path, 'r') as f:
-                chunks = pt.chunk(KEYWORDS, f)
-
-            # Parse header chunk first
-            header = wdc.datasetHeaderChunk('DATASET', chunks['DATASET'][0])
-
-            # Parse each time step chunk and aggregate
-            timeStepRasters = []
-
-            for chunk in chunks['TS']:
-                timeStepRasters.append(wdc.datasetScalarTimeStepChunk(chunk, columns, header['numberCells']))
-
-            # Set WMS dataset file properties
-            self.name = header['name']
-            self.numberCells = header['numberCells']
-            self.numberData = header['numberData']
-            self.objectID = header['objectID']
-
-            if header['type'] == 'BEGSCL':
-                self.objectType = header['objectType']
-                self.type = self.SCALAR_TYPE
-
-            elif header['type'] == 'BEGVEC':
-                self.vectorType = header['objectType']
-                self.type = self.VECTOR_TYPE
-
-            # Create WMS raster dataset files for each raster
-            for timeStep, timeStepRaster in enumerate(timeStepRasters):
-                # Create new WMS raster dataset file object
-                wmsRasterDatasetFile = WMSDatasetRaster()
-
-                # Set the wms dataset for this WMS raster dataset file
-                wmsRasterDatasetFile.wmsDataset = self
-
-                # Set the time step and timestamp and other properties
-                wmsRasterDatasetFile.iStatus = timeStepRaster['iStatus']
-                wmsRasterDatasetFile.timestamp = timeStepRaster['timestamp']
-                wmsRasterDatasetFile.timeStep = timeStep + 1
-
-                # If spatial is enabled create PostGIS rasters
-                if spatial:
-                    # Process the values/cell array
-                    wmsRasterDatasetFile.raster = RasterLoader.makeSingleBandWKBRaster(session,
-                                                                                       columns, rows,
-                                                                                       upperLeftX, upperLeftY,
-                                                                                       cellSizeX, cellSizeY,
-                                                                                       0, 0,
-                                                                                       spatialReferenceID,
-                                                                                       timeStepRaster['cellArray'])
-
-                # Otherwise, set the raster text properties
-                else:
-                    wmsRasterDatasetFile.rasterText = timeStepRaster['rasterText']
+            # Values of time steps with only the active cells are scattered to the grid through the mask
+            activeCells = None
+            watershedMask = None
+            parseValues = spatial or cubeDirectory is not None or callback is not None
+            if parseValues:
+                watershedMask = self._getWatershedMask(maskMap, session)
+                activeCells = watershedMask.activeCells if watershedMask is not None else None
+
+            cubeWriter = None
+            if cubeDirectory is not None:
+                cubeWriter = self._openCube(cubeDirectory, filename, watershedMask)
+
+            # Rows are flushed and their values released as they are read if the session is bound to a database
+            flush = session.bind is not None
+            timeStep = 0
+
+            try:
+                with open(path, 'r') as f:
+                    # Each time step is emitted to the rows, the cube and the callback before the next one is read
+                    for key, result in wdc.datasetChunkIter(f, columns, activeCells=activeCells,
+                                                            parseValues=parseValues):
+                        if key == 'DATASET':
+                            self._setHeader(result)
+                            continue
+
+                        timeStep += 1
+
+                        if cubeWriter is not None:
+                            cubeWriter = self._appendCube(cubeWriter, filename, result)
+
+                        if callback is not None:
+                            callback(timeStep, result)
+
+                        # Create new WMS raster dataset file object
+                        wmsRasterDatasetFile = WMSDatasetRaster()
+
+                        # Set the wms dataset for this WMS raster dataset file
+                        wmsRasterDatasetFile.wmsDataset = self
+
+                        # Set the time step and timestamp and other properties
+                        wmsRasterDatasetFile.iStatus = result['iStatus']
+                        wmsRasterDatasetFile.timestamp = result['timestamp']
+                        wmsRasterDatasetFile.timeStep = timeStep
+
+                        # If spatial is enabled create PostGIS rasters (unless the values don't fill the grid)
+                        cellValues = result['cellValues']
+
+                        if spatial and cellValues is not None:
+                            # Process the values/cell array
+                            wmsRasterDatasetFile.raster = RasterLoader.makeSingleBandWKBRaster(session,
+                                                                                               columns, rows,
+                                                                                               upperLeftX, upperLeftY,
+                                                                                               cellSizeX, cellSizeY,
+                                                                                               0, 0,
+                                                                                               spatialReferenceID,
+                                                                                               cellValues.tolist())
+
+                        # Otherwise, set the raster text properties
+                        else:
+                            wmsRasterDatasetFile.rasterText = result['rasterText']
+
+                        if flush:
+                            self._streamedObjects += len(session.new)
+                            session.flush()
+                            session.expire(wmsRasterDatasetFile, ['raster', 'rasterText'])
+
+            except Exception:
+                if cubeWriter is not None:
+                    cubeWriter.abort()
+                raise
+
+            if cubeWriter is not None:
+                cubeWriter.close()
+                self.cubePath = cubeWriter.prefix
+                self._cube = None
 
             # Add current file object to the session
             session.add(self)
@@ -393,9 +617,6 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
         """
         WMS Dataset File Write to File Method
         """
-        # Magic numbers
-        FIRST_VALUE_INDEX = 12
-
         # Write the header
         openFile.write('DATASET\r\n')
 
@@ -415,21 +636,24 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
         # Retrieve the mask map to use as the status rasters
         statusString = ''
         if isinstance(maskMap, RasterMapFile):
-            # Convert Mask Map to GRASS ASCII Raster
-            statusGrassRasterString = maskMap.getAsGrassAsciiGrid(session)
-
-            if statusGrassRasterString is not None:
-                # Split by lines
-                statusValues = statusGrassRasterString.split()
-            else:
-                statusValues = maskMap.rasterText.split()
-
-            # Assemble into a string in the WMS Dataset format
-            for i in range(FIRST_VALUE_INDEX, len(statusValues)):
-                statusString += statusValues[i] + '\r\n'
+            watershedMask = self._getWatershedMask(maskMap, session)
+
+            if watershedMask is not None:
+                statusString = watershedMask.statusString
+
+        if inspect(self).persistent and 'rasters' not in self.__dict__:
+            # Query the time steps with their raster text in batches instead of loading the relationship, which would
+            # load the deferred raster text of each time step with a query of its own
+            rasters = session.query(WMSDatasetRaster).\
+                with_parent(self).\
+                options(undefer(WMSDatasetRaster.rasterText)).\
+                order_by(WMSDatasetRaster.timeStep).\
+                yield_per(self.WRITE_BATCH_SIZE)
+        else:
+            rasters = sorted(self.rasters, key=lambda r: r.timeStep)
 
         # Write time steps
-        for timeStepRaster in self.rasters:
+        for timeStepRaster in rasters:
             # Write time step header
             openFile.write('TS {0} {1}\r\n'.format(timeStepRaster.iStatus, timeStepRaster.timestamp))
 
@@ -449,9 +673,86 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
         # Write ending tag for the dataset
         openFile.write('ENDDS\r\n')
 
-    def _assembleRasterParams(self, projectFile, rasters):
-        # Assemble input for converter method
-        timeStampedRasters = []
+    def getCube(self):
+        """
+        Retrieve the values of all time steps as a memory-mapped (time, active cell) cube. The cube is built when the
+        file is read with a cubeDirectory. Slices of time steps, time series of cells (e.g.: hydrographs) and xarray
+        views are read from the cube without parsing the raster text of the time steps.
+
+        Returns:
+            :class:`gsshapy.lib.wms_cube.WMSDatasetCube`: The cube or None if the dataset was read without a cube or
+            the files of the cube were removed.
+        """
+        if self.cubePath is None:
+            return None
+
+        if not cube_exists(self.cubePath):
+            log.warning('The cube of {0} could not be found at {1}.'.format(self.filename, self.cubePath))
+            self._cube = None
+            return None
+
+        if self._cube is None or self._cube.prefix != self.cubePath:
+            self._cube = WMSDatasetCube(self.cubePath)
+
+        return self._cube
+
+    def _setHeader(self, header):
+        """
+        Set the properties of the WMS dataset file from the parsed header.
+        """
+        self.name = header['name']
+        self.numberCells = header['numberCells']
+        self.numberData = header['numberData']
+        self.objectID = header['objectID']
+
+        if header['type'] == 'BEGSCL':
+            self.objectType = header['objectType']
+            self.type = self.SCALAR_TYPE
+
+        elif header['type'] == 'BEGVEC':
+            self.vectorType = header['objectType']
+            self.type = self.VECTOR_TYPE
+
+    def _openCube(self, cubeDirectory, filename, watershedMask):
+        """
+        Open a writer for the cube of the time steps in the cube directory.
+        """
+        if watershedMask is None:
+            log.warning('Could not build the cube of {0}. The mask map has no values.'.format(filename))
+            return None
+
+        prefix = os.path.join(os.path.abspath(cubeDirectory), filename.replace('.', '_'))
+
+        return WMSDatasetCubeWriter(prefix, watershedMask.activeCells, watershedMask.shape,
+                                    geotransform=watershedMask.geotransform)
+
+    def _appendCube(self, cubeWriter, filename, timeStepRaster):
+        """
+        Append a time step to the cube. The cube is discarded if the time step does not have one value per cell.
+        """
+        if timeStepRaster['cellValues'] is None:
+            log.warning('Could not build the cube of {0}. Time steps must have one value per cell.'.format(filename))
+            cubeWriter.abort()
+            return None
+
+        cubeWriter.append(timeStepRaster['timestamp'], timeStepRaster['iStatus'], timeStepRaster['cellValues'])
+        return cubeWriter
+
+    def _getWatershedMask(self, maskMap, session):
+        """
+        Retrieve the parsed mask map from the mask cache of its project, so it is parsed once for all WMS dataset files.
+        """
+        if maskMap.projectFile is not None:
+            return maskMap.projectFile.getWatershedMask(session, maskMap=maskMap)
+
+        return WatershedMask.fromMaskMap(maskMap, session)
+
+    @staticmethod
+    def _getStartDateTime(projectFile):
+        """
+        Retrieve the start of the simulation from the START_DATE and START_TIME cards of the project file. Timestamps of
+        the time steps are minutes since the start. Defaults to January 1, 1970.
+        """
         startDateTime = datetime(1970, 1, 1)
 
         if projectFile is not None:
@@ -471,6 +772,13 @@ class WMSDatasetFile(DeclarativeBase, GsshaPyFileObjectBase):
                     minute = int(startTimeParts[1])
                     startDateTime = datetime(year, month, day, hour, minute)
 
+        return startDateTime
+
+    def _assembleRasterParams(self, projectFile, rasters):
+        # Assemble input for converter method
+        timeStampedRasters = []
+        startDateTime = self._getStartDateTime(projectFile)
+
         for raster in rasters:
             # Create dictionary and populate
             timeStampedRaster = dict()
@@ -511,7 +819,7 @@ class WMSDatasetRaster(DeclarativeBase, RasterObjectBase):
     timeStep = Column(Integer)  #: INTEGER
     timestamp = Column(Float)  #: FLOAT
     iStatus = Column(Integer)  #: INTEGER
-    rasterText = Column(String)  #: STRING
+    rasterText = deferred(Column(CompressedText))  #: STRING
     raster = Column(Raster)  #: RASTER
 
     # Relationship Properties
@@ -551,3 +859,41 @@ class WMSDatasetRaster(DeclarativeBase, RasterObjectBase):
 
         else:
             wmsDatasetString = self.rasterText
+
+            return wmsDatasetString
+
+
+_DELETED_CUBES_KEY = 'gsshapy_deleted_wms_cubes'
+
+
+@event.listens_for(Session, 'before_flush')
+def _collectDeletedCubes(session, flushContext, instances):
+    """
+    Collect the cubes of WMS dataset files that are deleted (e.g.: when a dataset is replaced by ProjectFile.refresh).
+    The paths are read before the flush, because the attributes of deleted rows can not be loaded afterwards.
+    """
+    keptPaths = set(obj.cubePath for obj in session.identity_map.values()
+                    if isinstance(obj, WMSDatasetFile) and obj not in session.deleted)
+    keptPaths.update(obj.cubePath for obj in session.new if isinstance(obj, WMSDatasetFile))
+
+    for obj in session.deleted:
+        if isinstance(obj, WMSDatasetFile) and obj.cubePath is not None and obj.cubePath not in keptPaths:
+            session.info.setdefault(_DELETED_CUBES_KEY, set()).add(obj.cubePath)
+            obj._cube = None
+
+
+@event.listens_for(Session, 'after_flush')
+def _removeDeletedCubes(session, flushContext):
+    """
+    Remove the cubes of deleted WMS dataset files, so that they are not picked up by a later load.
+    """
+    for cubePath in session.info.pop(_DELETED_CUBES_KEY, ()):
+        remove_cube(cubePath)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _keepDeletedCubes(session):
+    """
+    Keep the cubes of WMS dataset files when their deletion is rolled back.
+    """
+    session.info.pop(_DELETED_CUBES_KEY, None)
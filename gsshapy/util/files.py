@@ -0,0 +1,13 @@
+"""The purpose of this module is to provide file system helpers."""
+
+import os
+
+
+def replace_file(source, destination):
+    """Atomically replace destination with source."""
+    if hasattr(os, 'replace'):
+        os.replace(source, destination)
+    else:
+        if os.name == 'nt' and os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
@@ -47,6 +47,7 @@ setup(name='gsshapy',
       extras_require={
         'tests': [
             'coveralls',
+            'mock',
             'pytest',
             'pytest-cov',
         ],
@@ -0,0 +1,51 @@
+"""
+Bulk Tools Tests
+"""
+from datetime import datetime
+import unittest
+
+import numpy as np
+
+from gsshapy.lib import db_tools as dbt
+from gsshapy.lib.bulk_tools import bulk_insert, _copy_value
+from gsshapy.orm import TimeSeriesValue
+
+
+class TestBulkTools(unittest.TestCase):
+    def test_copy_value(self):
+        """
+        Test formatting values for the PostgreSQL COPY text format
+        """
+        value = 0.12345678901234567
+
+        # Tests
+        self.assertEqual(float(_copy_value(value)), value)
+        self.assertEqual(float(_copy_value(np.float64(value))), value)
+        self.assertEqual(float(_copy_value(123456.78901234567)), 123456.78901234567)
+        self.assertEqual(_copy_value(None), '\\N')
+        self.assertEqual(_copy_value(3), '3')
+        self.assertEqual(_copy_value(datetime(2017, 1, 2, 3, 4)), '2017-01-02 03:04:00')
+        self.assertEqual(_copy_value('a\tb\nc'), 'a\\tb\\nc')
+
+    def test_bulk_insert(self):
+        """
+        Test inserting rows with executemany
+        """
+        sqlalchemy_url, sql_engine = dbt.init_sqlite_memory()
+        session = dbt.get_sessionmaker(sqlalchemy_url, sql_engine)()
+        value = 0.12345678901234567
+
+        bulk_insert(session, TimeSeriesValue.__table__, [{'simTime': 1.0, 'value': value},
+                                                         {'simTime': 2.0, 'value': -value}])
+        session.commit()
+
+        values = [v.value for v in session.query(TimeSeriesValue).order_by(TimeSeriesValue.simTime)]
+
+        # Tests
+        self.assertEqual(values, [value, -value])
+
+        session.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
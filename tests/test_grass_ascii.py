@@ -0,0 +1,118 @@
+"""
+GRASS ASCII Tools Tests
+"""
+import os
+import unittest
+
+import numpy as np
+
+from gsshapy.lib import grass_ascii as ga
+
+
+class TestGrassAscii(unittest.TestCase):
+    def setUp(self):
+        # Find db directory path
+        here = os.path.abspath(os.path.dirname(__file__))
+
+        # Define directory of test files to read
+        self.directory = os.path.join(here, 'standard')
+
+    def _read_text(self, filename):
+        with open(os.path.join(self.directory, filename)) as f:
+            return f.read()
+
+    def test_parse_grass_ascii(self):
+        """
+        Test parsing a GRASS ASCII raster into an array
+        """
+        array, geotransform = ga.parse_grass_ascii(self._read_text('standard.ele'))
+
+        # Tests
+        self.assertEqual(array.shape, (70, 75))
+        self.assertEqual(array.dtype, np.float32)
+        self.assertEqual(geotransform, (238467.146238, 90.0, 0.0, 4297782.463636, 0.0, -90.0))
+
+    def test_read_header(self):
+        """
+        Test reading only the header of a raster file
+        """
+        header = ga.read_header(os.path.join(self.directory, 'standard.msk'))
+
+        # Tests
+        self.assertEqual(header, {'north': 4501028.972140,
+                                  'south': 4494548.972140,
+                                  'east': 460348.288604,
+                                  'west': 454318.288604,
+                                  'rows': 72,
+                                  'cols': 67})
+
+    def test_read_window(self):
+        """
+        Test reading a window of a raster file with and without a row index
+        """
+        path = os.path.join(self.directory, 'standard.ele')
+        array, geotransform = ga.parse_grass_ascii(self._read_text('standard.ele'))
+        rowIndex = ga.build_row_index(path)
+
+        # Tests
+        self.assertEqual(len(rowIndex[1]), 71)
+        for index in (None, rowIndex):
+            window, windowGeotransform = ga.read_window(path, 10, 20, 5, 7, rowIndex=index)
+            np.testing.assert_array_equal(window, array[10:15, 20:27])
+            self.assertEqual(windowGeotransform, (240267.146238, 90.0, 0.0, 4296882.463636, 0.0, -90.0))
+
+        np.testing.assert_array_equal(ga.read_window(path, 69, 0, 1, 75, rowIndex=rowIndex)[0], array[69:])
+        self.assertRaises(ValueError, ga.read_window, path, 69, 0, 2, 75)
+
+    def test_format_round_trip(self):
+        """
+        Test that formatting a parsed index map reproduces the file
+        """
+        text = self._read_text('standard.msk')
+        array, geotransform = ga.parse_grass_ascii(text, dtype='int32')
+
+        # Tests
+        self.assertEqual(array.dtype, np.int32)
+        self.assertEqual(ga.format_grass_ascii(array, geotransform), text)
+
+        floats = np.linspace(0, 1, 12, dtype=np.float32).reshape(3, 4)
+        parsed, _ = ga.parse_grass_ascii(ga.format_grass_ascii(floats, geotransform))
+        np.testing.assert_array_equal(parsed, floats)
+
+    def test_format_precision_and_no_data(self):
+        """
+        Test formatting with a fixed precision and a no data value in chunks
+        """
+        geotransform = (0.0, 30.0, 0.0, 90.0, 0.0, -30.0)
+        array = np.ma.array([[1.5, np.nan, 2.0],
+                             [-2.25, 3.0, 4.0],
+                             [5.0, 6.0, 7.125]], mask=[[0, 0, 0], [0, 1, 0], [0, 0, 0]])
+
+        chunks = list(ga.iter_grass_ascii(array, geotransform, precision=2, noDataValue=-9999, chunkSize=2))
+
+        # Tests
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(''.join(chunks),
+                         'north: 90.000000\n'
+                         'south: 0.000000\n'
+                         'east: 90.000000\n'
+                         'west: 0.000000\n'
+                         'rows: 3\n'
+                         'cols: 3\n'
+                         '1.50 -9999.00 2.00 \n'
+                         '-2.25 -9999.00 4.00 \n'
+                         '5.00 6.00 7.12 \n')
+
+    def test_parse_invalid(self):
+        """
+        Test parsing rasters with a missing header or the wrong number of values
+        """
+        text = self._read_text('standard.msk')
+
+        # Tests
+        self.assertRaises(ValueError, ga.parse_grass_ascii, text.replace('rows: 72\n', ''))
+        self.assertRaises(ValueError, ga.parse_grass_ascii, text.replace('rows: 72', 'rows: 73'))
+
+
+if __name__ == '__main__':
+    unittest.main()
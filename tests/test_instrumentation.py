@@ -0,0 +1,133 @@
+"""
+Instrumentation Tests
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from gsshapy.lib import instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        # Find db directory path
+        here = os.path.abspath(os.path.dirname(__file__))
+
+        # Define directory of test files to read
+        self.directory = os.path.join(here, 'standard')
+        self.writeDirectory = tempfile.mkdtemp()
+
+    def test_sinks(self):
+        """
+        Test emitting events to the memory and JSON lines sinks
+        """
+        memorySink = instrumentation.add_sink(instrumentation.MemorySink())
+        jsonPath = os.path.join(self.writeDirectory, 'events.jsonl')
+        instrumentation.add_sink(instrumentation.JsonLinesSink(jsonPath))
+
+        with instrumentation.file_context(card='PRECIP_FILE'):
+            instrumentation.emit(**{'operation': 'read', 'class': 'PrecipFile', 'bytes': 10})
+
+        instrumentation.emit(operation='write')
+
+        with open(jsonPath) as f:
+            events = [json.loads(line) for line in f]
+
+        # Tests
+        self.assertTrue(instrumentation.is_enabled())
+        self.assertEqual(len(memorySink.events), 2)
+        self.assertEqual(events, memorySink.events)
+        self.assertEqual(events[0]['card'], 'PRECIP_FILE')
+        self.assertEqual(events[0]['class'], 'PrecipFile')
+        self.assertEqual(events[0]['bytes'], 10)
+        self.assertIsNone(events[1]['card'])
+        self.assertEqual(set(events[1]), set(instrumentation.EVENT_KEYS))
+
+        instrumentation.clear_sinks()
+        instrumentation.emit(operation='read')
+
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual(len(memorySink.events), 2)
+
+    def test_capture(self):
+        """
+        Test capturing events instead of sending them to the sinks
+        """
+        memorySink = instrumentation.add_sink(instrumentation.MemorySink())
+
+        with instrumentation.capture() as captured:
+            instrumentation.emit(operation='write')
+
+            # Other threads still send their events to the sinks
+            thread = threading.Thread(target=instrumentation.emit, kwargs={'operation': 'read'})
+            thread.start()
+            thread.join()
+
+        # Tests
+        self.assertEqual(len(captured.events), 1)
+        self.assertEqual([event['operation'] for event in memorySink.events], ['read'])
+        memorySink.clear()
+
+        instrumentation.emit_event(captured.events[0])
+        self.assertEqual(memorySink.events, captured.events)
+
+    def test_project_read_write_events(self):
+        """
+        Test the events of reading and writing a project
+        """
+        from gsshapy.orm import ProjectFile
+        from gsshapy.lib import db_tools as dbt
+
+        memorySink = instrumentation.add_sink(instrumentation.MemorySink())
+
+        sqlalchemy_url, sql_engine = dbt.init_sqlite_memory()
+        session = dbt.get_sessionmaker(sqlalchemy_url, sql_engine)()
+
+        projectFile = ProjectFile()
+        projectFile.readProject(directory=self.directory,
+                                projectFileName='standard.prj',
+                                session=session)
+
+        reads = [event for event in memorySink.events if event['operation'] == 'read']
+        cards = dict((event['card'], event) for event in reads)
+
+        # Tests
+        self.assertIn('PRECIP_FILE', cards)
+        self.assertEqual(cards['PRECIP_FILE']['class'], 'PrecipFile')
+        self.assertEqual(cards['PRECIP_FILE']['bytes'],
+                         os.path.getsize(os.path.join(self.directory, 'standard.gag')))
+        self.assertGreater(cards['PRECIP_FILE']['objects'], 1)
+
+        for event in reads:
+            self.assertGreaterEqual(event['parse_time'], 0)
+            self.assertGreaterEqual(event['commit_time'], 0)
+
+        memorySink.clear()
+        projectFile.writeProject(session=session, directory=self.writeDirectory, name='standard')
+
+        writes = [event for event in memorySink.events if event['operation'] == 'write']
+
+        self.assertGreater(len(writes), 0)
+
+        # Files written more than once (e.g.: both replacement files) have the size of the last write
+        lastWrites = dict((event['path'], event) for event in writes)
+
+        for path, event in lastWrites.items():
+            self.assertEqual(event['bytes'], os.path.getsize(path))
+
+        writeCards = [event['card'] for event in writes]
+        self.assertIn('REPLACE_PARAMS', writeCards)
+        self.assertIn('REPLACE_VALS', writeCards)
+
+        session.close()
+
+    def tearDown(self):
+        instrumentation.clear_sinks()
+        shutil.rmtree(self.writeDirectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
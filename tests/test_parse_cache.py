@@ -0,0 +1,90 @@
+"""
+Parse Cache Tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from gsshapy.orm import ProjectFile, PrecipFile, PrecipValue, TimeSeriesValue
+from gsshapy.lib import db_tools as dbt
+from gsshapy.lib.parse_cache import enable_parse_cache, disable_parse_cache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        # Find db directory path
+        here = os.path.abspath(os.path.dirname(__file__))
+
+        # Define directory of test files to read
+        self.directory = os.path.join(here, 'standard')
+
+        # Cache in a temporary directory
+        self.cacheDirectory = tempfile.mkdtemp()
+        self.cache = enable_parse_cache(directory=self.cacheDirectory)
+
+    def _read_project(self):
+        """
+        Read the standard project into a new database and return the session
+        """
+        sqlalchemy_url, sql_engine = dbt.init_sqlite_memory()
+        session = dbt.get_sessionmaker(sqlalchemy_url, sql_engine)()
+
+        projectFile = ProjectFile()
+        projectFile.readProject(directory=self.directory,
+                                projectFileName='standard.prj',
+                                session=session)
+        return session
+
+    def test_read_from_cache(self):
+        """
+        Test reading a project twice with the parse cache enabled
+        """
+        sessionOne = self._read_project()
+        entries = self.cache.info()['entries']
+
+        # Tests
+        self.assertGreater(entries, 0)
+
+        sessionTwo = self._read_project()
+
+        self.assertEqual(self.cache.info()['entries'], entries)
+
+        for fileIO in (PrecipFile, PrecipValue, TimeSeriesValue):
+            objectsOne = sessionOne.query(fileIO).order_by(fileIO.id).all()
+            objectsTwo = sessionTwo.query(fileIO).order_by(fileIO.id).all()
+
+            self.assertEqual(len(objectsOne), len(objectsTwo))
+
+            for objectOne, objectTwo in zip(objectsOne, objectsTwo):
+                for column in fileIO.__table__.columns:
+                    self.assertEqual(getattr(objectOne, column.key), getattr(objectTwo, column.key))
+
+        sessionOne.close()
+        sessionTwo.close()
+
+    def test_clear_and_evict(self):
+        """
+        Test clearing and evicting entries from the parse cache
+        """
+        self._read_project().close()
+
+        # Tests
+        self.assertGreater(self.cache.info()['size'], 0)
+
+        self.cache.max_size = 0
+        self.cache.evict()
+        self.assertEqual(self.cache.info()['entries'], 0)
+
+        self.cache.max_size = 2 * 1024 ** 3
+        self._read_project().close()
+        self.cache.clear()
+        self.assertEqual(self.cache.info()['entries'], 0)
+
+    def tearDown(self):
+        disable_parse_cache()
+        shutil.rmtree(self.cacheDirectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Parse Tools Tests
+"""
+import glob
+import os
+import shlex
+import unittest
+
+from gsshapy.lib import parsetools as pt
+
+
+class TestParseTools(unittest.TestCase):
+    def setUp(self):
+        # Find db directory path
+        here = os.path.abspath(os.path.dirname(__file__))
+
+        # Define directory of test files to read
+        self.directory = os.path.join(here, 'standard')
+
+    def test_chunk_iter(self):
+        """
+        Test streaming chunks in file order
+        """
+        lines = ['HEADER\n',
+                 'ONE 1\n',
+                 'a\n',
+                 '\n',
+                 'TWO 2\n',
+                 'ONE 3\n',
+                 'b\n']
+
+        chunks = list(pt.chunkIter(('ONE', 'TWO'), lines))
+
+        # Tests
+        self.assertEqual(chunks, [('ONE', ['ONE 1\n', 'a\n']),
+                                  ('TWO', ['TWO 2\n']),
+                                  ('ONE', ['ONE 3\n', 'b\n'])])
+
+    def test_chunk_iter_matches_chunk(self):
+        """
+        Test that streaming chunks match the chunks grouped by chunk
+        """
+        keywords = ('EVENT', 'NRGAG', 'NRPDS', 'COORD', 'GAGES', 'ACCUM', 'RATES')
+
+        with open(os.path.join(self.directory, 'standard.gag')) as f:
+            lines = f.readlines()
+
+        chunks = pt.chunk(keywords, lines)
+
+        grouped = dict((keyword, []) for keyword in keywords)
+        for keyword, chunk in pt.chunkIter(keywords, lines):
+            grouped[keyword].append(chunk)
+
+        # Tests
+        self.assertEqual(chunks, grouped)
+
+    def test_split_line(self):
+        """
+        Test that splitLine produces the same tokens as shlex
+        """
+        lines = ['ROUGHNESS "Soil" \n',
+                 'PRECIP_FILE              "standard.gag"\n',
+                 'COORD 204236.64 4323046.87 "Gage \'1\'"\n',
+                 'a"b c"d \'\' ""\n',
+                 'REPLACE_FOLDER "C:\\\\path\\\\"\n',
+                 'ACCUM   2002 08 21 06 00 0.0\n',
+                 '\x0cFORM FEED\n',
+                 '']
+
+        for path in glob.glob(os.path.join(self.directory, '*.*')):
+            if path.endswith(('.prj', '.cmt', '.gag', '.cif', '.spn')):
+                with open(path) as f:
+                    lines.extend(f.readlines())
+
+        # Tests
+        for line in lines:
+            self.assertEqual(pt.splitLine(line), shlex.split(line))
+
+    def test_split_line_unbalanced_quotes(self):
+        """
+        Test that splitLine raises the same error as shlex on unbalanced quotes
+        """
+        # Tests
+        self.assertRaises(ValueError, pt.splitLine, 'NAME "unbalanced\n')
+        self.assertRaises(ValueError, pt.splitLine, "NAME it's\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
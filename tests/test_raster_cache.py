@@ -0,0 +1,64 @@
+"""
+Raster Cache Tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gsshapy.lib.raster_cache import enable_raster_cache, disable_raster_cache, load_raster_array
+
+
+class TestRasterCache(unittest.TestCase):
+    def setUp(self):
+        # Find db directory path
+        here = os.path.abspath(os.path.dirname(__file__))
+
+        # Copy a raster to a temporary directory
+        self.directory = tempfile.mkdtemp()
+        shutil.copy(os.path.join(here, 'standard', 'standard.ele'), self.directory)
+        self.path = os.path.join(self.directory, 'standard.ele')
+
+    def test_load_from_cache(self):
+        """
+        Test memory-mapping a raster from the cache
+        """
+        cache = enable_raster_cache(directory=os.path.join(self.directory, 'cache'))
+
+        array, geotransform = load_raster_array(self.path)
+        cachedArray, cachedGeotransform = load_raster_array(self.path)
+
+        # Tests
+        self.assertIsInstance(cachedArray, np.memmap)
+        np.testing.assert_array_equal(array, cachedArray)
+        self.assertEqual(geotransform, cachedGeotransform)
+
+        # Touching the file keeps the entry, because the contents are unchanged
+        os.utime(self.path, (0, 0))
+        self.assertIsNotNone(cache.get(self.path, 'float32'))
+
+        # Changing the contents invalidates the entry
+        with open(self.path, 'a') as f:
+            f.write('\n')
+        self.assertIsNone(cache.get(self.path, 'float32'))
+
+    def test_sidecar(self):
+        """
+        Test storing the cache entries next to the raster
+        """
+        enable_raster_cache(sidecar=True)
+        load_raster_array(self.path, dtype='int32')
+
+        # Tests
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['standard.ele', 'standard_ele_int32.json', 'standard_ele_int32.npy'])
+
+    def tearDown(self):
+        disable_raster_cache()
+        shutil.rmtree(self.directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+Raster Render Tests
+"""
+import os
+import shutil
+import struct
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+import unittest
+from zipfile import ZipFile
+import zlib
+
+import numpy as np
+
+from gsshapy.base.rast import RasterObjectBase
+from gsshapy.lib import raster_render as rr
+
+
+class TestRasterRender(unittest.TestCase):
+    def setUp(self):
+        # Find db directory path
+        here = os.path.abspath(os.path.dirname(__file__))
+
+        # Define directory of test files to read
+        self.directory = os.path.join(here, 'standard')
+        self.tempDirectory = tempfile.mkdtemp()
+
+    def _decode_png(self, png):
+        """
+        Decode a PNG written by encode_png into an array of RGBA pixels
+        """
+        self.assertEqual(png[:8], b'\x89PNG\r\n\x1a\n')
+        width, height = struct.unpack('>II', png[16:24])
+        length = struct.unpack('>I', png[33:37])[0]
+        self.assertEqual(png[37:41], b'IDAT')
+        scanlines = np.frombuffer(zlib.decompress(png[41:41 + length]), dtype=np.uint8)
+        return scanlines.reshape(height, width * 4 + 1)[:, 1:].reshape(height, width, 4)
+
+    def test_render_png(self):
+        """
+        Test rendering an array with no data cells to a scaled PNG image
+        """
+        array = np.array([[0.0, 1.0, 2.0],
+                          [3.0, np.nan, -1.0]], dtype=np.float32)
+
+        rgba = rr.render_rgba(array, alpha=0.5, noDataValue=-1.0, scale=2)
+        pixels = self._decode_png(rr.encode_png(rgba))
+
+        # Tests
+        self.assertEqual(pixels.shape, (4, 6, 4))
+        np.testing.assert_array_equal(pixels, rgba)
+        np.testing.assert_array_equal(pixels[2:, 2:, 3], 0)
+        np.testing.assert_array_equal(pixels[:2, :, 3], 127)
+        np.testing.assert_array_equal(pixels[0, 0], pixels[1, 1])
+        self.assertFalse(np.array_equal(pixels[0, 0], pixels[0, 4]))
+
+    def test_warp_to_lat_lon(self):
+        """
+        Test that the image of a projected raster is registered to longitude and latitude
+        """
+        rows, columns = 60, 80
+        geotransform = (300000.0, 500.0, 0, 4500000.0, 0, -500.0)
+
+        # Each pixel stores its column and row
+        rgba = np.zeros((rows, columns, 4), dtype=np.uint8)
+        rgba[:, :, 0] = np.arange(columns)[np.newaxis, :]
+        rgba[:, :, 1] = np.arange(rows)[:, np.newaxis]
+        rgba[:, :, 3] = 255
+
+        warped, (north, south, east, west) = rr.warp_to_lat_lon(rgba, geotransform, 32612)
+        unwarped, bounds = rr.warp_to_lat_lon(rgba, geotransform, None)
+
+        # Tests
+        self.assertEqual(warped.shape, rgba.shape)
+        self.assertIs(unwarped, rgba)
+        self.assertEqual(bounds, (4500000.0, 4470000.0, 340000.0, 300000.0))
+        self.assertEqual(warped[0, 0, 3], 0)
+
+        # Near the corners the warped image differs from the stretched image
+        row, column = 5, 5
+        self.assertNotEqual(warped[row, column, 1], row)
+        lon = west + (column + 0.5) * (east - west) / columns
+        lat = north - (row + 0.5) * (north - south) / rows
+        x, y = rr._transform([lon], [lat], 4326, 32612)
+        self.assertEqual(warped[row, column, 3], 255)
+        self.assertEqual(warped[row, column, 0], int((x[0] - 300000.0) // 500.0))
+        self.assertEqual(warped[row, column, 1], int((4500000.0 - y[0]) // 500.0))
+
+    def test_render_million_cells(self):
+        """
+        Test the time to render a projected raster with a million cells and the error of the interpolated warp
+        """
+        array = np.random.RandomState(0).rand(1000, 1000).astype(np.float32)
+        geotransform = (300000.0, 30.0, 0, 4500000.0, 0, -30.0)
+
+        # Initialize pyproj before timing
+        rr._transform([0.0], [0.0], 4326, 32612)
+
+        start = time.time()
+        rgba = rr.render_rgba(array, noDataValue=0.0)
+        warped, bounds = rr.warp_to_lat_lon(rgba, geotransform, 32612)
+        rr.encode_png(warped)
+        elapsed = time.time() - start
+
+        exact, _ = rr.warp_to_lat_lon(rgba, geotransform, 32612, controlSpacing=1)
+
+        # Tests
+        self.assertLess(elapsed, 1.0)
+        self.assertLess(np.any(warped != exact, axis=2).mean(), 0.001)
+
+    def test_kml_png_without_postgis(self):
+        """
+        Test writing a KMZ ground overlay of a raster that is not stored in PostGIS
+        """
+        class Raster(RasterObjectBase):
+            filename = 'standard.msk'
+            discreet = True
+
+        raster = Raster()
+        with open(os.path.join(self.directory, 'standard.msk')) as f:
+            raster.rasterText = f.read()
+
+        path = os.path.join(self.tempDirectory, 'mask.kml')
+        kmlString, pngBinary = raster.getAsKmlPng(None, path=path, drawOrder=2, srid=4326)
+
+        # Tests
+        self.assertIn('<drawOrder>2</drawOrder>', kmlString)
+        self.assertIn('<north>4501028.97214</north>', kmlString)
+        self.assertEqual(self._decode_png(pngBinary).shape, (72, 67, 4))
+
+        with ZipFile(os.path.join(self.tempDirectory, 'mask.kmz')) as kmz:
+            self.assertEqual(sorted(kmz.namelist()), ['mask.kml', 'raster.png'])
+
+    def test_kml_grid_and_clusters_without_postgis(self):
+        """
+        Test writing KML grids and clusters of a raster that is not stored in PostGIS
+        """
+        class Raster(RasterObjectBase):
+            filename = 'standard.msk'
+            discreet = True
+
+        raster = Raster()
+        with open(os.path.join(self.directory, 'standard.msk')) as f:
+            raster.rasterText = f.read()
+
+        array = raster.as_array()[0]
+        path = os.path.join(self.tempDirectory, 'mask.kml')
+
+        gridString = raster.getAsKmlGrid(None, path=path, srid=26912)
+        clustersString = raster.getAsKmlClusters(None, srid=26912)
+
+        # Tests
+        with open(path) as f:
+            self.assertEqual(f.read(), gridString)
+
+        grid = ET.fromstring(gridString)
+        placemarks = grid.findall('.//{http://www.opengis.net/kml/2.2}Placemark')
+        self.assertEqual([p.find('{http://www.opengis.net/kml/2.2}name').text for p in placemarks], ['1.0'])
+        self.assertEqual(len(grid.findall('.//{http://www.opengis.net/kml/2.2}Polygon')), int((array == 1).sum()))
+
+        clusters = ET.fromstring(clustersString)
+        self.assertEqual(len(clusters.findall('.//{http://www.opengis.net/kml/2.2}Polygon')), 1)
+        coordinates = clusters.find('.//{http://www.opengis.net/kml/2.2}coordinates').text.split()
+        lon, lat = [float(c) for c in coordinates[0].split(',')]
+        self.assertEqual(coordinates[0], coordinates[-1])
+        self.assertTrue(-112.0 < lon < -111.0 and 40.0 < lat < 41.0)
+
+    def test_trace_clusters(self):
+        """
+        Test tracing clusters of cells with holes and corners where a cluster touches itself
+        """
+        array = np.array([[1, 1, 1, 2],
+                          [1, 0, 1, 2],
+                          [1, 1, 1, 0],
+                          [3, 0, 0, 3]])
+
+        labels = rr._label_clusters(array, array != 0)
+
+        # Tests
+        self.assertEqual(len(np.unique(labels[labels >= 0])), 4)
+        self.assertNotEqual(labels[3, 0], labels[3, 3])
+
+        ring = [(r, c) for r in range(3) for c in range(3) if array[r, c] == 1]
+        self.assertEqual(rr._trace_clusters(ring), [[[(0, 0), (0, 3), (3, 3), (3, 0), (0, 0)],
+                                                     [(1, 1), (2, 1), (2, 2), (1, 2), (1, 1)]]])
+
+        pinched = [(0, 0), (0, 1), (1, 0), (1, 1), (2, 1), (2, 2)]
+        self.assertEqual(rr._trace_clusters(pinched), [[[(0, 0), (0, 2), (2, 2), (2, 3), (3, 3), (3, 1), (2, 1),
+                                                         (2, 0), (0, 0)]]])
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDirectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
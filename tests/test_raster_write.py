@@ -0,0 +1,167 @@
+"""
+Raster Write Tests
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import numpy as np
+
+from gsshapy.orm.file_io import RasterMapFile, IndexMap
+from gsshapy.lib import db_tools as dbt
+from gsshapy.lib.grass_ascii import format_grass_ascii
+from gsshapy.lib.write_tools import open_output
+
+
+class TestRasterWrite(unittest.TestCase):
+    def setUp(self):
+        # Create Test DB
+        sqlalchemy_url, sql_engine = dbt.init_sqlite_memory()
+
+        # Create DB Sessions
+        session_maker = dbt.get_sessionmaker(sqlalchemy_url, sql_engine)
+        self.writeSession = session_maker()
+        self.querySession = session_maker()
+
+        self.tempDirectory = tempfile.mkdtemp()
+        self.geotransform = (0.0, 30.0, 0.0, 3000.0, 0.0, -30.0)
+
+    def _read(self, filename):
+        with open(os.path.join(self.tempDirectory, filename)) as f:
+            return f.read()
+
+    def test_raster_map_file_write_array(self):
+        """
+        Test writing a RasterMapFile replaced with an array before and after it is stored in the database
+        """
+        array = np.arange(100 * 80, dtype=np.float32).reshape(100, 80) / 8
+        rasterText = format_grass_ascii(array, self.geotransform)
+
+        mapW = RasterMapFile()
+        mapW.fileExtension = 'ele'
+        mapW.from_array(array, self.geotransform)
+        statistics = mapW.getStatistics()
+        mapW.write(session=self.writeSession, directory=self.tempDirectory, name='streamed')
+
+        # The text is streamed from the array without being formatted as a whole
+        self.assertIsNone(mapW._rasterText)
+        self.assertEqual(self._read('streamed.ele'), rasterText)
+
+        # The text is formatted when the map is stored
+        self.writeSession.add(mapW)
+        self.writeSession.commit()
+
+        mapQ = self.querySession.query(RasterMapFile).one()
+        mapQ.write(session=self.querySession, directory=self.tempDirectory, name='stored')
+
+        # Tests
+        self.assertEqual(mapQ.rasterText, rasterText)
+        self.assertEqual(mapQ.getStatistics(), statistics)
+        self.assertEqual(self._read('stored.ele'), rasterText)
+        np.testing.assert_array_equal(mapW.as_array()[0], array)
+        np.testing.assert_array_equal(mapW.read_window(10, 20, 5, 7)[0], array[10:15, 20:27])
+
+    def test_index_map_write_array(self):
+        """
+        Test writing an IndexMap replaced with an array
+        """
+        array = np.arange(30 * 20).reshape(30, 20) % 7
+
+        idxW = IndexMap(name='Soil')
+        idxW.fileExtension = 'idx'
+        idxW.from_array(array, self.geotransform)
+        idxW.write(directory=self.tempDirectory, name='streamed')
+
+        # Tests
+        self.assertIsNone(idxW._rasterText)
+        self.assertEqual(self._read('streamed.idx'), format_grass_ascii(array.astype('int32'), self.geotransform))
+        self.assertEqual(idxW.rasterText, self._read('streamed.idx'))
+
+    @unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+    def test_raster_map_file_write_array_benchmark(self):
+        """
+        Benchmark streaming a million cell array-backed map to file against writing the whole text at once, which is
+        how the text stored in the database and the text returned by the mapkit RasterConverter are written
+        """
+        array = np.random.RandomState(0).rand(1000, 1000).astype(np.float32) * 1000
+
+        mapW = RasterMapFile()
+        mapW.fileExtension = 'ele'
+        mapW.from_array(array, self.geotransform)
+
+        start = time.time()
+        mapW.write(session=self.writeSession, directory=self.tempDirectory, name='streamed')
+        streamedElapsed = time.time() - start
+
+        start = time.time()
+        rasterText = format_grass_ascii(array, self.geotransform)
+        with open_output(os.path.join(self.tempDirectory, 'text.ele')) as openFile:
+            openFile.write(rasterText)
+        textElapsed = time.time() - start
+
+        # Memory is traced separately, because tracing slows the formatting down
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        mapW.write(session=self.writeSession, directory=self.tempDirectory, name='traced')
+        streamedPeak = tracemalloc.get_traced_memory()[1]
+
+        # Tests
+        self.assertEqual(self._read('streamed.ele'), rasterText)
+        self.assertLess(streamedPeak * 2, len(rasterText))
+        self.assertLess(streamedElapsed, textElapsed * 1.5)
+
+    @unittest.skipUnless(os.environ.get('GSSHAPY_TEST_POSTGRESQL_URL'),
+                         'GSSHAPY_TEST_POSTGRESQL_URL is not set to a PostGIS enabled database')
+    def test_raster_map_file_write_mapkit_benchmark(self):
+        """
+        Benchmark streaming a million cell array-backed map to file against writing the same map from its PostGIS
+        raster with the mapkit RasterConverter
+        """
+        from mapkit.RasterLoader import RasterLoader
+
+        sqlalchemy_url = os.environ['GSSHAPY_TEST_POSTGRESQL_URL']
+        dbt.init_db(sqlalchemy_url)
+        session = dbt.get_sessionmaker(sqlalchemy_url)()
+        self.addCleanup(session.close)
+
+        array = np.random.RandomState(0).rand(1000, 1000).astype(np.float32) * 1000
+
+        mapW = RasterMapFile()
+        mapW.fileExtension = 'ele'
+        mapW.from_array(array, self.geotransform)
+
+        start = time.time()
+        mapW.write(session=session, directory=self.tempDirectory, name='streamed')
+        streamedElapsed = time.time() - start
+
+        mapW.raster = RasterLoader.grassAsciiRasterToWKB(session=session,
+                                                         grassRasterPath=os.path.join(self.tempDirectory,
+                                                                                      'streamed.ele'),
+                                                         srid='26912',
+                                                         noData='0',
+                                                         dataType=mapW.readDataType)
+        session.add(mapW)
+        session.commit()
+        self.addCleanup(session.delete, mapW)
+
+        start = time.time()
+        mapW.write(session=session, directory=self.tempDirectory, name='mapkit')
+        mapkitElapsed = time.time() - start
+
+        # Tests
+        self.assertLess(streamedElapsed, mapkitElapsed)
+
+    def tearDown(self):
+        self.writeSession.close()
+        self.querySession.close()
+        shutil.rmtree(self.tempDirectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,10 +10,20 @@
 from builtins import zip
 import unittest
 import os
+import shutil
+import tempfile
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy as np
 
 from gsshapy.orm.file_io import *
-from gsshapy.orm import ProjectFile
+from gsshapy.orm import (ProjectFile, PrecipValue, TimeSeriesValue, GridStreamCell, OutputLocation,
+                         NodeDataset, MTValue, LinkDataset)
 from gsshapy.lib import db_tools as dbt
+from gsshapy.orm import prj
 
 
 class TestReadMethods(unittest.TestCase):
@@ -180,6 +190,30 @@ class TestReadMethods(unittest.TestCase):
 
                 self.assertEqual(indexR, indexQ)
 
+    def test_map_table_file_parameter_grid(self):
+        """
+        Test materializing mapping table parameters to grids
+        """
+        cmtR = MapTableFile()
+        cmtR.read(directory=self.directory,
+                  filename='standard.cmt',
+                  session=self.readSession)
+
+        grid, geotransform = cmtR.parameterGrid('ROUGHNESS', 'ROUGH', self.readSession)
+        landUse = self.readSession.query(IndexMap).filter(IndexMap.name == 'LandUse').one()
+        indexArray, indexGeotransform = landUse.as_array()
+
+        # Tests
+        self.assertEqual(grid.shape, indexArray.shape)
+        self.assertEqual(geotransform, indexGeotransform)
+        self.assertTrue(np.allclose(grid[indexArray == 21], 0.035))
+        self.assertTrue(np.all(np.isnan(grid[~np.isin(indexArray, [11, 14, 16, 21, 41])])))
+        self.assertIs(cmtR.parameterGrid('ROUGHNESS', 'ROUGH', self.readSession)[0], grid)
+
+        grids = cmtR.parameterGrids(self.readSession)
+
+        self.assertIn(('ROUGHNESS', 'ROUGH', 0, None), grids)
+
     def test_precip_file_read(self):
         """
         Test PrecipFile read method
@@ -250,6 +284,114 @@ class TestReadMethods(unittest.TestCase):
 
         # Tests
 
+    def test_raster_map_file_read_reference(self):
+        """
+        Test RasterMapFile read method without storing the raster text
+        """
+        mapR = RasterMapFile()
+        mapR.read(directory=self.directory,
+                  filename='standard.msk',
+                  session=self.readSession,
+                  readRasterText=False)
+
+        mapQ = self.querySession.query(RasterMapFile).one()
+
+        with open(os.path.join(self.directory, 'standard.msk')) as f:
+            rasterText = f.read()
+
+        # Tests
+        self.assertEqual(mapQ.rows, 72)
+        self.assertEqual(mapQ.columns, 67)
+        self.assertIsNone(mapQ._rasterText)
+        self.assertEqual(mapQ.rasterPath, os.path.join(self.directory, 'standard.msk'))
+        self.assertEqual(mapQ.rasterText, rasterText)
+        self.assertIs(mapQ.rasterText, mapQ.rasterText)
+
+    def test_raster_map_file_read_window(self):
+        """
+        Test reading windows of a RasterMapFile with and without the raster text
+        """
+        mapR = RasterMapFile()
+        mapR.read(directory=self.directory,
+                  filename='standard.msk',
+                  session=self.readSession,
+                  readRasterText=False)
+
+        array, geotransform = mapR.as_array()
+        window, windowGeotransform = mapR.read_window(10, 20, 5, 7)
+
+        # Tests
+        self.assertIsNotNone(mapR._rowIndex)
+        np.testing.assert_array_equal(window, array[10:15, 20:27])
+        self.assertEqual(windowGeotransform[0], geotransform[0] + 20 * geotransform[1])
+        self.assertEqual(windowGeotransform[3], geotransform[3] + 10 * geotransform[5])
+
+        mapR.rasterText = mapR.rasterText
+        np.testing.assert_array_equal(mapR.read_window(10, 20, 5, 7)[0], window)
+        self.assertRaises(ValueError, mapR.read_window, 70, 0, 3, 1)
+
+    def test_raster_map_statistics(self):
+        """
+        Test computing, storing and invalidating raster map statistics
+        """
+        mapR = RasterMapFile()
+        mapR.read(directory=self.directory,
+                  filename='standard.msk',
+                  session=self.readSession)
+
+        statistics = mapR.getStatistics(bins=2)
+        self.readSession.commit()
+
+        mapQ = self.querySession.query(RasterMapFile).one()
+
+        # Tests
+        self.assertEqual(statistics['count'], 72 * 67)
+        self.assertEqual(statistics['minimum'], 0)
+        self.assertEqual(statistics['maximum'], 1)
+        self.assertEqual(sum(statistics['histogram']['counts']), 72 * 67)
+        self.assertEqual(mapQ.statMean, statistics['mean'])
+        self.assertEqual(mapQ._getStoredStatistics(), statistics)
+
+        mapR.rasterText = mapR.rasterText.replace(' 1 ', ' 2 ', 1)
+
+        self.assertIsNone(mapR.statHistogram)
+        self.assertEqual(mapR.getStatistics(bins=2)['maximum'], 2)
+
+    def test_raster_map_statistics_constant(self):
+        """
+        Test the statistics of a raster map with a single value
+        """
+        mapR = RasterMapFile()
+        mapR.from_array(np.full((4, 3), 5.0), (0.0, 30.0, 0.0, 120.0, 0.0, -30.0))
+
+        statistics = mapR.getStatistics(bins=2)
+
+        # Tests
+        self.assertEqual(statistics['minimum'], 5.0)
+        self.assertEqual(statistics['maximum'], 5.0)
+        self.assertEqual(statistics['std'], 0.0)
+        self.assertEqual(mapR.statMinimum, 5.0)
+        self.assertEqual(mapR.statMaximum, 5.0)
+
+    def test_raster_map_statistics_constant_no_data(self):
+        """
+        Test the statistics of a raster map with a single value besides the no data value
+        """
+        array = np.full((4, 3), 5.0)
+        array[0, :] = -9999.0
+
+        mapR = RasterMapFile()
+        mapR.from_array(array, (0.0, 30.0, 0.0, 120.0, 0.0, -30.0))
+
+        statistics = mapR.getStatistics(bins=2, noDataValue=-9999.0)
+
+        # Tests
+        self.assertEqual(statistics['count'], 9)
+        self.assertEqual(statistics['minimum'], 5.0)
+        self.assertEqual(statistics['maximum'], 5.0)
+        self.assertEqual(mapR.statMinimum, 5.0)
+        self.assertEqual(mapR.statMaximum, 5.0)
+
     def test_projection_file_read(self):
         """
         Test ProjectionFile read method
@@ -459,6 +601,177 @@ class TestReadMethods(unittest.TestCase):
 
         # Tests
 
+    def test_project_file_watershed_mask(self):
+        """
+        Test the parsed watershed mask shared by the project
+        """
+        prjR = ProjectFile()
+        prjR.readInput(directory=self.directory,
+                       projectFileName='standard.prj',
+                       session=self.readSession)
+
+        mask = prjR.getWatershedMask(self.readSession)
+        maskMap = prjR._getMaskMap(self.readSession)
+
+        # Tests
+        self.assertEqual(mask.shape, (72, 67))
+        self.assertEqual(mask.array.dtype, bool)
+        self.assertEqual(len(mask.activeCells), mask.array.sum())
+        self.assertIs(prjR.getWatershedMask(self.readSession), mask)
+
+        # Changing the mask map invalidates the parsed mask
+        maskMap.rasterText = maskMap.rasterText.replace(' 1 ', ' 0 ', 1)
+        changedMask = prjR.getWatershedMask(self.readSession)
+        self.assertIsNot(changedMask, mask)
+        self.assertEqual(len(changedMask.activeCells), len(mask.activeCells) - 1)
+
+    def test_project_file_read_all_parallel(self):
+        """
+        Test ProjectFile read all method with multiple workers
+        """
+        # Read in parallel
+        prjR = ProjectFile()
+
+        with mock.patch.object(prj, 'Pool', wraps=prj.Pool) as pool:
+            prjR.readProject(directory=self.directory,
+                             projectFileName='standard.prj',
+                             session=self.readSession,
+                             workers=4)
+
+        # Tests
+        self.assertTrue(pool.called)
+        self._serial_compare((RasterMapFile, PrecipFile, PrecipValue, TimeSeriesFile, TimeSeriesValue, GridPipeFile,
+                              GridStreamCell, OutputLocation, LinkNodeDatasetFile, NodeDataset, ProjectionFile))
+
+    def test_project_file_read_input_raster_reference(self):
+        """
+        Test ProjectFile read input method storing references to the raster files
+        """
+        prjR = ProjectFile()
+        prjR.readInput(directory=self.directory,
+                       projectFileName='standard.prj',
+                       session=self.readSession,
+                       readRasterText=False)
+
+        indexMapsQ = self.querySession.query(IndexMap).all()
+
+        # Tests
+        self.assertEqual(len(indexMapsQ), 5)
+
+        for indexMapQ in indexMapsQ:
+            with open(os.path.join(self.directory, indexMapQ.filename)) as f:
+                rasterText = f.read()
+
+            self.assertIsNone(indexMapQ._rasterText)
+            self.assertEqual(indexMapQ.rasterPath, os.path.join(self.directory, indexMapQ.filename))
+            self.assertEqual(indexMapQ.rasterText, rasterText)
+
+        for mapQ in self.querySession.query(RasterMapFile).all():
+            self.assertIsNone(mapQ._rasterText)
+
+    def test_project_file_read_all_bulk(self):
+        """
+        Test ProjectFile read all method with bulk inserts
+        """
+        # Read with bulk inserts
+        prjR = ProjectFile()
+        prjR.readProject(directory=self.directory,
+                         projectFileName='standard.prj',
+                         session=self.readSession,
+                         bulk=True)
+
+        # Tests
+        self._serial_compare((PrecipValue, TimeSeriesValue, NodeDataset, MTValue))
+
+        # Values are available through relationships
+        cmtQ = self.querySession.query(MapTableFile).one()
+
+        for mapTable in cmtQ.mapTables:
+            for value in mapTable.values:
+                self.assertIs(value.mapTable, mapTable)
+                self.assertIsNotNone(value.index)
+
+    def test_project_file_refresh(self):
+        """
+        Test ProjectFile refresh method
+        """
+        # Read a copy of the project
+        tempDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempDirectory)
+        directory = os.path.join(tempDirectory, 'standard')
+        shutil.copytree(self.directory, directory)
+
+        prjR = ProjectFile()
+        prjR.readProject(directory=directory,
+                         projectFileName='standard.prj',
+                         session=self.readSession)
+
+        cifID = prjR.channelInputFile.id
+        numValues = self.querySession.query(TimeSeriesValue).count()
+
+        # Nothing changed
+        changes = prjR.refresh(self.readSession)
+
+        self.assertEqual(changes, {'added': [], 'changed': [], 'removed': []})
+
+        # Change the hydrograph and remove the grid pipe file
+        ohlPath = os.path.join(directory, 'standard.ohl')
+        with open(ohlPath) as f:
+            lines = f.readlines()
+        with open(ohlPath, 'w') as f:
+            f.writelines(lines[:-1])
+
+        gpiPath = os.path.join(directory, 'standard.gpi')
+        os.remove(gpiPath)
+
+        changes = prjR.refresh(self.readSession)
+
+        # Tests
+        self.assertEqual(changes['added'], [])
+        self.assertEqual(changes['changed'], [os.path.abspath(ohlPath)])
+        self.assertEqual(changes['removed'], [os.path.abspath(gpiPath)])
+
+        self.querySession.expire_all()
+        timQ = self.querySession.query(TimeSeriesFile).filter(TimeSeriesFile.fileExtension == 'ohl').one()
+        cifQ = self.querySession.query(ChannelInputFile).one()
+
+        self.assertEqual(len(timQ.as_dataframe().index), 9)
+        self.assertEqual(self.querySession.query(GridPipeFile).count(), 0)
+        self.assertEqual(cifQ.id, cifID)
+        self.assertLess(self.querySession.query(TimeSeriesValue).count(), numValues)
+
+        # Link a link dataset to a stream link of the channel input file
+        linkDataset = self.readSession.query(LinkDataset).first()
+        linkDataset.link = prjR.channelInputFile.streamLinks[0]
+        self.readSession.commit()
+
+        # Touch the channel input file and an index map of the mapping table file
+        for filename in ('standard.cif', 'Soil.idx'):
+            path = os.path.join(directory, filename)
+            stat = os.stat(path)
+            os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+        # Refresh the project queried in another session
+        prjQ = self.querySession.query(ProjectFile).one()
+        changes = prjQ.refresh(self.querySession)
+
+        # Tests
+        self.assertEqual(changes['added'], [])
+        self.assertEqual(changes['removed'], [])
+        self.assertEqual(sorted(changes['changed']),
+                         sorted(os.path.abspath(os.path.join(directory, filename))
+                                for filename in ('standard.cif', 'standard.cmt', 'standard.cdp')))
+
+        self.readSession.expire_all()
+        self.assertEqual(self.readSession.query(ChannelInputFile).count(), 1)
+        self.assertEqual(self.readSession.query(MapTableFile).count(), 1)
+        self.assertEqual(self.readSession.query(LinkNodeDatasetFile).count(), 1)
+        self.assertEqual(self.readSession.query(IndexMap).count(), 5)
+        self.assertEqual(self.readSession.query(LinkDataset).filter(LinkDataset.streamLinkID.isnot(None)).count(), 0)
+
+        # Nothing changed since the last refresh
+        self.assertEqual(prjQ.refresh(self.querySession), {'added': [], 'changed': [], 'removed': []})
+
     def _read_n_query(self, fileIO, directory, filename):
         """
         Read to database and Query from database
@@ -476,6 +789,29 @@ class TestReadMethods(unittest.TestCase):
 
         return instanceR, instanceQ
 
+    def _serial_compare(self, fileIOs):
+        """
+        Read the project serially into a separate database and compare the rows of the given classes
+        """
+        sqlalchemy_url, sql_engine = dbt.init_sqlite_memory()
+        serialSession = dbt.get_sessionmaker(sqlalchemy_url, sql_engine)()
+        prjS = ProjectFile()
+        prjS.readProject(directory=self.directory,
+                         projectFileName='standard.prj',
+                         session=serialSession)
+
+        for fileIO in fileIOs:
+            objectsS = serialSession.query(fileIO).order_by(fileIO.id).all()
+            objectsQ = self.querySession.query(fileIO).order_by(fileIO.id).all()
+
+            self.assertEqual(len(objectsS), len(objectsQ))
+
+            for objectS, objectQ in zip(objectsS, objectsQ):
+                for column in fileIO.__table__.columns:
+                    self.assertEqual(getattr(objectS, column.key), getattr(objectQ, column.key))
+
+        serialSession.close()
+
     def _list_compare(self, listone, listtwo):
         for one, two in zip(listone, listtwo):
             self.assertEqual(one, two)
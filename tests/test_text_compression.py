@@ -0,0 +1,86 @@
+"""
+Text Compression Tests
+"""
+import os
+import unittest
+
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, func, select
+
+from gsshapy.lib.text_compression import CompressedText, enable_text_compression, disable_text_compression, \
+    get_text_compression
+
+
+class TestTextCompression(unittest.TestCase):
+    def setUp(self):
+        # Find db directory path
+        here = os.path.abspath(os.path.dirname(__file__))
+
+        with open(os.path.join(here, 'standard', 'standard.ele')) as f:
+            self.rasterText = f.read()
+
+        metadata = MetaData()
+        self.table = Table('rasters', metadata,
+                           Column('id', Integer, primary_key=True),
+                           Column('rasterText', CompressedText))
+        self.engine = create_engine('sqlite://')
+        metadata.create_all(self.engine)
+
+    def _store(self):
+        """
+        Store the raster text and return the number of characters stored in the database and the loaded text
+        """
+        with self.engine.begin() as connection:
+            result = connection.execute(self.table.insert().values(rasterText=self.rasterText))
+            rowId = result.inserted_primary_key[0]
+            stored = connection.execute(select([func.length(self.table.c.rasterText)])
+                                        .where(self.table.c.id == rowId)).scalar()
+            loaded = connection.execute(select([self.table.c.rasterText])
+                                        .where(self.table.c.id == rowId)).scalar()
+
+        return stored, loaded
+
+    def test_compressed_storage(self):
+        """
+        Benchmark the size of raster text stored with and without compression
+        """
+        uncompressedSize, uncompressed = self._store()
+
+        enable_text_compression()
+        compressedSize, compressed = self._store()
+
+        # Values stored before compression was enabled are still loaded
+        with self.engine.connect() as connection:
+            values = [row[0] for row in connection.execute(select([self.table.c.rasterText]))]
+
+        # Tests
+        self.assertEqual(uncompressed, self.rasterText)
+        self.assertEqual(compressed, self.rasterText)
+        self.assertEqual(values, [self.rasterText, self.rasterText])
+        self.assertEqual(uncompressedSize, len(self.rasterText))
+        self.assertLess(compressedSize, uncompressedSize / 2.5)
+
+    def test_engine_compression(self):
+        """
+        Test compressing the text of a single engine
+        """
+        otherEngine = create_engine('sqlite://')
+        enable_text_compression(engine=self.engine)
+        compressedSize, compressed = self._store()
+
+        # Tests
+        self.assertEqual(compressed, self.rasterText)
+        self.assertLess(compressedSize, len(self.rasterText) / 2.5)
+        self.assertEqual(get_text_compression(self.engine), 1)
+        self.assertIsNone(get_text_compression(otherEngine))
+        self.assertIsNone(get_text_compression())
+
+        disable_text_compression(engine=self.engine)
+        uncompressedSize, _ = self._store()
+        self.assertEqual(uncompressedSize, len(self.rasterText))
+
+    def tearDown(self):
+        disable_text_compression()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+"""
+Watershed Mask Tests
+"""
+import os
+import unittest
+
+import numpy as np
+
+from gsshapy.lib.grass_ascii import parse_grass_ascii
+from gsshapy.lib.watershed_mask import WatershedMask
+
+
+class TestWatershedMask(unittest.TestCase):
+    def setUp(self):
+        # Find db directory path
+        here = os.path.abspath(os.path.dirname(__file__))
+
+        with open(os.path.join(here, 'standard', 'standard.msk')) as f:
+            self.rasterText = f.read()
+
+    def test_watershed_mask(self):
+        """
+        Test the active cells and the WMS dataset status values of a mask
+        """
+        mask = WatershedMask(*parse_grass_ascii(self.rasterText))
+        values = self.rasterText.split()[12:]
+
+        # Tests
+        self.assertEqual(mask.shape, (72, 67))
+        self.assertEqual(mask.values.dtype, np.int32)
+        self.assertEqual(mask.array.sum(), values.count('1'))
+        np.testing.assert_array_equal(mask.activeCells, np.flatnonzero(np.array(values) == '1'))
+        self.assertEqual(mask.statusString, ''.join(value + '\r\n' for value in values))
+        self.assertFalse(mask.array.flags.writeable)
+
+
+if __name__ == '__main__':
+    unittest.main()
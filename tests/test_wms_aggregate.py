@@ -0,0 +1,143 @@
+"""
+WMS Dataset Aggregate Tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gsshapy.lib import db_tools as dbt
+from gsshapy.lib.wms_aggregate import TimeStepAggregator
+from gsshapy.orm import ProjectFile, WMSDatasetFile
+
+
+class TestWmsAggregate(unittest.TestCase):
+    def setUp(self):
+        self.mask = np.array([[False, True, True],
+                              [True, True, False]])
+        self.timeSteps = [(0.0, np.array([[0.0, 0.0, 1.0], [0.0, 0.2, 0.0]])),
+                          (10.0, np.array([[0.0, 0.5, 3.0], [0.0, 0.1, 0.0]])),
+                          (30.0, np.array([[0.0, 0.8, 2.0], [0.0, 0.0, 0.0]])),
+                          (40.0, np.array([[0.0, 0.4, 0.0], [0.3, 0.0, 0.0]]))]
+
+    def test_reductions(self):
+        """
+        Test the reductions of the time steps
+        """
+        aggregator = TimeStepAggregator((2, 3), reductions=('max', 'min', 'mean', 'time_of_max', 'first_above',
+                                                            'duration_above', 'final'),
+                                        threshold=0.15, mask=self.mask)
+
+        for timestamp, grid in self.timeSteps:
+            aggregator.update(timestamp, grid)
+
+        results = aggregator.results()
+        nan = np.nan
+
+        # Tests
+        np.testing.assert_array_equal(results['max'], [[nan, 0.8, 3.0], [0.3, 0.2, nan]])
+        np.testing.assert_array_equal(results['min'], [[nan, 0.0, 0.0], [0.0, 0.0, nan]])
+        np.testing.assert_allclose(results['mean'], [[nan, 0.425, 1.5], [0.075, 0.075, nan]])
+        np.testing.assert_array_equal(results['time_of_max'], [[nan, 30.0, 10.0], [40.0, 0.0, nan]])
+        np.testing.assert_array_equal(results['first_above'], [[nan, 10.0, 0.0], [40.0, 0.0, nan]])
+        np.testing.assert_array_equal(results['duration_above'], [[nan, 40.0, 30.0], [10.0, 0.0, nan]])
+        np.testing.assert_array_equal(results['final'], [[nan, 0.4, 0.0], [0.3, 0.0, nan]])
+
+    def test_time_step_callback(self):
+        """
+        Test adding parsed time steps and rejecting time steps that don't fill the grid
+        """
+        aggregator = TimeStepAggregator((2, 3), reductions=('final',))
+
+        grid = self.timeSteps[0][1].copy()
+        aggregator.addTimeStep(1, {'timestamp': 0.0, 'cellValues': grid})
+        grid[:] = -1.0
+
+        # Tests
+        self.assertEqual(list(aggregator.results()), ['final'])
+        np.testing.assert_array_equal(aggregator.results()['final'], self.timeSteps[0][1])
+        self.assertRaises(ValueError, aggregator.addTimeStep, 2, {'timestamp': 10.0, 'cellValues': None})
+        self.assertRaises(ValueError, TimeStepAggregator, (2, 3), reductions=('peak',))
+        self.assertRaises(ValueError, TimeStepAggregator((2, 3)).results)
+
+    def test_wms_dataset_aggregate(self):
+        """
+        Test aggregating a WMS dataset file with and without a cube and while the file is read
+        """
+        here = os.path.abspath(os.path.dirname(__file__))
+        directory = tempfile.mkdtemp()
+        sqlalchemy_url, sql_engine = dbt.init_sqlite_memory()
+        session = dbt.get_sessionmaker(sqlalchemy_url, sql_engine)()
+
+        try:
+            projectFile = ProjectFile()
+            projectFile.readInput(directory=os.path.join(here, 'standard'),
+                                  projectFileName='standard.prj',
+                                  session=session)
+            maskMap = projectFile._getMaskMap(session)
+            mask = projectFile.getWatershedMask(session)
+
+            # Write a dataset with one value per cell of the grid
+            base = (np.arange(mask.array.size) % 7).reshape(mask.shape).astype(np.float64)
+            grids = [base * step for step in range(3)]
+
+            with open(os.path.join(directory, 'standard.dep'), 'w') as f:
+                f.write('DATASET\nOBJTYPE "grid"\nBEGSCL\nND {0}\nNC {0}\nNAME "depth"\n'.format(base.size))
+
+                for step, grid in enumerate(grids):
+                    f.write('TS 0 {0:.6f}\n'.format(step * 15.0))
+                    f.write(''.join('{0:.6f}\n'.format(value) for value in grid.ravel()))
+
+                f.write('ENDDS\n')
+
+            # Without a cube
+            wmsDataset = WMSDatasetFile()
+            wmsDataset.projectFile = projectFile
+            wmsDataset.read(directory=directory,
+                            filename='standard.dep',
+                            session=session,
+                            maskMap=maskMap)
+
+            # With a cube and aggregated while the file is read
+            aggregator = TimeStepAggregator.fromWatershedMask(mask)
+            cubeDataset = WMSDatasetFile()
+            cubeDataset.projectFile = projectFile
+            cubeDataset.read(directory=directory,
+                             filename='standard.dep',
+                             session=session,
+                             maskMap=maskMap,
+                             cubeDirectory=directory,
+                             callback=aggregator.addTimeStep)
+
+            expected = {'max': grids[2],
+                        'time_of_max': np.where(base > 0, 30.0, 0.0),
+                        'duration_above': np.where(base > 0, 30.0, 0.0),
+                        'final': grids[2]}
+            noDataValue = -1.0
+
+            # Tests
+            self.assertIsNone(wmsDataset.getCube())
+            self.assertIsNotNone(cubeDataset.getCube())
+            self.assertEqual(aggregator.count, 3)
+
+            for aggregateMaps in (wmsDataset.aggregate(session, noDataValue=noDataValue),
+                                  cubeDataset.aggregate(session, noDataValue=noDataValue),
+                                  cubeDataset.getAggregateMaps(aggregator, noDataValue=noDataValue)):
+                self.assertEqual(sorted(aggregateMaps), sorted(expected))
+                self.assertEqual(aggregateMaps['max'].fileExtension, 'dep_max')
+
+                for reduction, values in expected.items():
+                    array, geotransform = aggregateMaps[reduction].as_array()
+                    self.assertEqual(geotransform, mask.geotransform)
+                    np.testing.assert_array_equal(array[mask.array], values[mask.array])
+                    np.testing.assert_array_equal(array[~mask.array], noDataValue)
+
+        finally:
+            session.close()
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+WMS Dataset Cube Tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gsshapy.lib import db_tools as dbt
+from gsshapy.lib.wms_cube import WMSDatasetCube, WMSDatasetCubeWriter, cube_exists
+from gsshapy.orm import ProjectFile, WMSDatasetFile
+
+
+class TestWmsCube(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.prefix = os.path.join(self.directory, 'cube', 'standard_dep')
+        self.activeCells = np.array([1, 2, 5, 6, 9, 10])
+        self.grids = [np.arange(12, dtype=np.float32).reshape(3, 4) * step for step in range(5)]
+
+    def _write(self):
+        with WMSDatasetCubeWriter(self.prefix, self.activeCells, (3, 4)) as writer:
+            for step, grid in enumerate(self.grids):
+                writer.append(step * 0.5, 1, grid)
+
+        return WMSDatasetCube(self.prefix)
+
+    def test_cube(self):
+        """
+        Test reading time steps, slices and cell series from a cube
+        """
+        cube = self._write()
+
+        # Tests
+        self.assertEqual(len(cube), 5)
+        self.assertIsInstance(cube.values, np.memmap)
+        self.assertEqual(cube.timeSlice(0.5, 1.5), slice(1, 4))
+        self.assertEqual(cube.getValues(0.5, 1.5).shape, (3, 6))
+
+        expected = np.where(np.isin(np.arange(12), self.activeCells), self.grids[3].ravel(), -1).reshape(3, 4)
+        np.testing.assert_array_equal(cube.getTimeStep(3, noDataValue=-1), expected)
+
+        timestamps, values = cube.getCellSeries(1, 2, start=1.0)
+        np.testing.assert_array_equal(timestamps, [1.0, 1.5, 2.0])
+        np.testing.assert_array_equal(values, [12.0, 18.0, 24.0])
+        self.assertRaises(ValueError, cube.getCellSeries, 0, 0)
+
+        dataArray = cube.to_xarray(end=0.5)
+        self.assertEqual(dataArray.dims, ('time', 'cell'))
+        np.testing.assert_array_equal(dataArray.sel(cell=6).values, [0.0, 6.0])
+
+    def test_abort(self):
+        """
+        Test that an aborted cube leaves no files
+        """
+        with self.assertRaises(ValueError):
+            with WMSDatasetCubeWriter(self.prefix, self.activeCells, (3, 4)) as writer:
+                writer.append(0.0, 1, np.zeros(5))
+
+        # Tests
+        self.assertEqual(os.listdir(os.path.dirname(self.prefix)), [])
+
+    def test_wms_dataset_cube_removed(self):
+        """
+        Test that the cube of a WMS dataset file is removed when the file is deleted, but kept on rollback
+        """
+        here = os.path.abspath(os.path.dirname(__file__))
+        sqlalchemy_url, sql_engine = dbt.init_sqlite_memory()
+        session = dbt.get_sessionmaker(sqlalchemy_url, sql_engine)()
+        self.addCleanup(session.close)
+
+        projectFile = ProjectFile()
+        projectFile.readInput(directory=os.path.join(here, 'standard'),
+                              projectFileName='standard.prj',
+                              session=session)
+        maskMap = projectFile._getMaskMap(session)
+        mask = projectFile.getWatershedMask(session)
+
+        with open(os.path.join(self.directory, 'standard.dep'), 'w') as f:
+            f.write('DATASET\nOBJTYPE "grid"\nBEGSCL\nND {0}\nNC {0}\nNAME "depth"\n'.format(mask.array.size))
+            f.write('TS 0 0.000000\n')
+            f.write('1.000000\n' * mask.array.size)
+            f.write('ENDDS\n')
+
+        wmsDataset = WMSDatasetFile()
+        wmsDataset.projectFile = projectFile
+        wmsDataset.read(directory=self.directory,
+                        filename='standard.dep',
+                        session=session,
+                        maskMap=maskMap,
+                        cubeDirectory=self.directory)
+        session.commit()
+        cubePath = wmsDataset.cubePath
+
+        # Tests
+        self.assertTrue(cube_exists(cubePath))
+
+        session.delete(wmsDataset)
+        session.rollback()
+        self.assertTrue(cube_exists(cubePath))
+
+        session.delete(wmsDataset)
+        session.flush()
+        self.assertFalse(cube_exists(cubePath))
+        session.commit()
+
+        # A dataset with a missing cube has no cube
+        wmsDataset = WMSDatasetFile()
+        wmsDataset.filename = 'standard.dep'
+        wmsDataset.cubePath = cubePath
+        self.assertIsNone(wmsDataset.getCube())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
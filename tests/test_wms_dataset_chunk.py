@@ -0,0 +1,81 @@
+"""
+WMS Dataset Chunk Tests
+"""
+import json
+import unittest
+
+import numpy as np
+
+from gsshapy.lib import wms_dataset_chunk as wdc
+
+
+class TestWmsDatasetChunk(unittest.TestCase):
+    def setUp(self):
+        self.values = np.arange(12, dtype=np.float64).reshape(3, 4) / 4.0
+        self.lines = ['TS 1 1.500000\r\n'] + ['1\r\n'] * 12 + \
+                     ['{0:.6f}\r\n'.format(value) for value in self.values.ravel()] + ['ENDDS\r\n']
+
+    def test_time_step_array(self):
+        """
+        Test parsing a time step into an array
+        """
+        result = wdc.datasetScalarTimeStepArray(self.lines, 4, 12)
+
+        # Tests
+        self.assertEqual(result['iStatus'], 1)
+        self.assertEqual(result['timestamp'], 1.5)
+        np.testing.assert_array_equal(result['cellValues'], self.values)
+        self.assertEqual(result['rasterText'], ''.join(self.lines[13:25]))
+
+    def test_time_step_chunk(self):
+        """
+        Test parsing a time step into the string of a nested list
+        """
+        result = wdc.datasetScalarTimeStepChunk(self.lines, 4, 12)
+
+        # Tests
+        self.assertEqual(sorted(result), ['cellArray', 'iStatus', 'rasterText', 'timestamp'])
+        self.assertEqual(result['iStatus'], 1)
+        self.assertEqual(result['timestamp'], 1.5)
+        self.assertTrue(result['cellArray'].startswith('[[0.000000, 0.250000, 0.500000, 0.750000], [1.000000'))
+        np.testing.assert_array_equal(np.array(json.loads(result['cellArray'])), self.values)
+        self.assertEqual(result['rasterText'], ''.join(self.lines[13:25]))
+
+    def test_time_step_active_cells(self):
+        """
+        Test scattering the values of the active cells to the grid
+        """
+        activeCells = np.array([1, 2, 5, 6, 9, 10])
+        lines = ['TS 0 2.0\n'] + ['{0}\n'.format(value) for value in self.values.ravel()[activeCells]]
+
+        result = wdc.datasetScalarTimeStepArray(lines, 4, 12, activeCells=activeCells)
+        expected = np.zeros(12)
+        expected[activeCells] = self.values.ravel()[activeCells]
+
+        # Tests
+        self.assertEqual(result['iStatus'], 0)
+        np.testing.assert_array_equal(result['cellValues'], expected.reshape(3, 4))
+        self.assertIsNone(wdc.datasetScalarTimeStepArray(lines, 4, 12)['cellValues'])
+
+    def test_chunk_iter(self):
+        """
+        Test streaming the header and the time steps of a dataset
+        """
+        header = ['DATASET\r\n', 'OBJTYPE "grid"\r\n', 'BEGSCL\r\n', 'ND 12\r\n', 'NC 12\r\n',
+                  'NAME "depth"\r\n']
+        timeStep = self.lines[:-1]
+        lines = header + timeStep + ['TS 1 3.000000\r\n'] + timeStep[1:] + ['ENDDS\r\n']
+
+        results = list(wdc.datasetChunkIter(iter(lines), 4))
+
+        # Tests
+        self.assertEqual([key for key, _ in results], ['DATASET', 'TS', 'TS'])
+        self.assertEqual(results[0][1]['numberCells'], 12)
+        self.assertEqual(results[0][1]['name'], 'depth')
+        self.assertEqual([result['timestamp'] for _, result in results[1:]], [1.5, 3.0])
+        np.testing.assert_array_equal(results[2][1]['cellValues'], self.values)
+        self.assertRaises(ValueError, list, wdc.datasetChunkIter(iter(timeStep), 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+WMS Dataset Export Tests
+"""
+from datetime import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from gsshapy.lib import db_tools as dbt
+from gsshapy.lib.wms_export import grid_coordinates, write_netcdf
+from gsshapy.orm import ProjectFile, WMSDatasetFile
+
+try:
+    import netCDF4
+except ImportError:
+    netCDF4 = None
+
+
+class TestWmsExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.geotransform = (100.0, 30.0, 0.0, 1000.0, 0.0, -30.0)
+        self.grids = [np.arange(12, dtype=np.float32).reshape(3, 4) * step for step in range(3)]
+        self.grids[1][0, 0] = np.nan
+
+    def test_grid_coordinates(self):
+        """
+        Test the coordinates of the cell centers
+        """
+        x, y = grid_coordinates(self.geotransform, (3, 4))
+
+        # Tests
+        np.testing.assert_array_equal(x, [115.0, 145.0, 175.0, 205.0])
+        np.testing.assert_array_equal(y, [985.0, 955.0, 925.0])
+
+    @unittest.skipIf(netCDF4 is None, 'netCDF4 is not installed')
+    def test_write_netcdf(self):
+        """
+        Test writing time steps to a NetCDF file
+        """
+        path = os.path.join(self.directory, 'depth.nc')
+        timeSteps = ((step * 15.0, grid) for step, grid in enumerate(self.grids))
+
+        count = write_netcdf(path, timeSteps, (3, 4), self.geotransform, 'depth', datetime(2017, 1, 1),
+                             chunks=(1, 3, 2))
+
+        # Tests
+        self.assertEqual(count, 3)
+
+        with netCDF4.Dataset(path) as dataset:
+            variable = dataset.variables['depth']
+            self.assertEqual(variable.dimensions, ('time', 'y', 'x'))
+            self.assertEqual(variable.chunking(), [1, 3, 2])
+            self.assertEqual(dataset.variables['time'].units, 'minutes since 2017-01-01 00:00:00')
+            np.testing.assert_array_equal(dataset.variables['time'][:], [0.0, 15.0, 30.0])
+            self.assertTrue(np.ma.is_masked(variable[1, 0, 0]))
+            np.testing.assert_array_equal(variable[2], self.grids[2])
+            self.assertEqual(dataset.variables['x'].standard_name, 'projection_x_coordinate')
+            self.assertEqual(dataset.variables['y'].units, 'm')
+
+    @unittest.skipIf(netCDF4 is None, 'netCDF4 is not installed')
+    def test_write_netcdf_geographic(self):
+        """
+        Test writing time steps of a grid in a geographic projection to a NetCDF file
+        """
+        path = os.path.join(self.directory, 'depth.nc')
+        geotransform = (-111.6, 0.001, 0.0, 40.7, 0.0, -0.001)
+        wkt = 'GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984",SPHEROID["WGS_1984",6378137.0,298.257223563]],' \
+              'PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]]'
+
+        write_netcdf(path, iter([(0.0, self.grids[0])]), (3, 4), geotransform, 'depth', datetime(2017, 1, 1),
+                     wkt=wkt)
+
+        # Tests
+        with netCDF4.Dataset(path) as dataset:
+            x, y = dataset.variables['x'], dataset.variables['y']
+            self.assertEqual((x.standard_name, x.units), ('longitude', 'degrees_east'))
+            self.assertEqual((y.standard_name, y.units), ('latitude', 'degrees_north'))
+            np.testing.assert_allclose(x[:], grid_coordinates(geotransform, (3, 4))[0])
+            self.assertEqual(dataset.variables['crs'].crs_wkt, wkt)
+
+    @unittest.skipIf(netCDF4 is None, 'netCDF4 is not installed')
+    def test_wms_dataset_to_netcdf(self):
+        """
+        Test writing the time steps of a WMS dataset read without a cube to a NetCDF file
+        """
+        here = os.path.abspath(os.path.dirname(__file__))
+        sqlalchemy_url, sql_engine = dbt.init_sqlite_memory()
+        session = dbt.get_sessionmaker(sqlalchemy_url, sql_engine)()
+
+        projectFile = ProjectFile()
+        projectFile.readInput(directory=os.path.join(here, 'standard'),
+                              projectFileName='standard.prj',
+                              session=session)
+        maskMap = projectFile._getMaskMap(session)
+        mask = projectFile.getWatershedMask(session)
+
+        # Write a dataset with one value per cell of the grid
+        grids = [(np.arange(mask.array.size, dtype=np.float32) % 7).reshape(mask.shape) * step for step in range(3)]
+
+        with open(os.path.join(self.directory, 'standard.dep'), 'w') as f:
+            f.write('DATASET\nOBJTYPE "grid"\nBEGSCL\nND {0}\nNC {0}\nNAME "depth"\n'.format(mask.array.size))
+
+            for step, grid in enumerate(grids):
+                f.write('TS 0 {0:.6f}\n'.format(step * 15.0))
+                f.write(''.join('{0:.6f}\n'.format(value) for value in grid.ravel()))
+
+            f.write('ENDDS\n')
+
+        wmsDataset = WMSDatasetFile()
+        wmsDataset.projectFile = projectFile
+        wmsDataset.read(directory=self.directory,
+                        filename='standard.dep',
+                        session=session,
+                        maskMap=maskMap)
+
+        path = os.path.join(self.directory, 'depth.nc')
+        count = wmsDataset.to_netcdf(session, path)
+
+        # Tests
+        self.assertIsNone(wmsDataset.getCube())
+        self.assertEqual(count, 3)
+
+        with netCDF4.Dataset(path) as dataset:
+            np.testing.assert_array_equal(dataset.variables['time'][:], [0.0, 15.0, 30.0])
+
+            for step, grid in enumerate(grids):
+                values = dataset.variables['depth'][step]
+                np.testing.assert_array_equal(values.mask, ~mask.array)
+                np.testing.assert_array_equal(values[mask.array], grid[mask.array])
+
+        session.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
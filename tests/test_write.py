@@ -7,12 +7,21 @@
 * License: BSD 2-Clause
 ********************************************************************************
 """
+import filecmp
+import shutil
 import sys
+import tempfile
 import unittest, itertools, os, uuid
+from collections import OrderedDict
+try:
+    from unittest import mock
+except ImportError:
+    import mock
 
 from gsshapy.orm.file_io import *
 from gsshapy.orm import ProjectFile
 from gsshapy.lib import db_tools as dbt
+from gsshapy.orm import prj
 
 
 class TestWriteMethods(unittest.TestCase):
@@ -343,6 +352,63 @@ class TestWriteMethods(unittest.TestCase):
         # Compare all files
         self._compare_directories(self.readDirectory, self.writeDirectory)
 
+    def test_project_file_write_all_parallel(self):
+        """
+        Test ProjectFile write all method with multiple workers
+        """
+        serialDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, serialDirectory)
+        parallelDirectory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, parallelDirectory)
+
+        # Retrieve ProjectFile from database
+        projectFile = self.writeSession.query(ProjectFile).one()
+
+        # Write serially and in parallel
+        projectFile.writeProject(session=self.writeSession,
+                                 directory=serialDirectory,
+                                 name='standard')
+
+        with mock.patch.object(prj, 'Pool', wraps=prj.Pool) as pool:
+            projectFile.writeProject(session=self.writeSession,
+                                     directory=parallelDirectory,
+                                     name='standard',
+                                     workers=4)
+
+        # Tests
+        self.assertTrue(pool.called)
+
+        serialFiles = sorted(os.listdir(serialDirectory))
+        self.assertEqual(serialFiles, sorted(os.listdir(parallelDirectory)))
+        serialFiles = [f for f in serialFiles if os.path.isfile(os.path.join(serialDirectory, f))]
+
+        match, mismatch, errors = filecmp.cmpfiles(serialDirectory, parallelDirectory, serialFiles, shallow=False)
+        self.assertEqual(mismatch, [])
+        self.assertEqual(errors, [])
+
+    def test_project_file_write_queue_groups(self):
+        """
+        Test that queued writes are grouped by the path the write of the file object produces
+        """
+        projectFile = self.writeSession.query(ProjectFile).one()
+        projectionFile = self.writeSession.query(ProjectionFile).one()
+
+        projectFile._writeJobs = OrderedDict()
+        self.addCleanup(setattr, projectFile, '_writeJobs', None)
+
+        # The name preprocessor of the projection file appends _prj to the name
+        projectFile._writeFile(projectionFile, session=self.writeSession, directory=self.writeDirectory,
+                               name='standard')
+        projectFile._writeFile(projectionFile, session=self.writeSession, directory=self.writeDirectory,
+                               name='standard_prj.pro')
+
+        # Tests
+        path = os.path.join(os.path.abspath(self.writeDirectory), 'standard_prj.pro')
+        self.assertEqual(list(projectFile._writeJobs), [path])
+        self.assertEqual(len(projectFile._writeJobs[path]), 2)
+        self.assertEqual(projectionFile._getWritePath(self.writeDirectory, 'standard'),
+                         os.path.join(self.writeDirectory, 'standard_prj.pro'))
+
     def _query_n_write(self, fileIO):
         """
         Query database and write file method
@@ -0,0 +1,83 @@
+"""
+Write Tools Tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from gsshapy.lib.write_tools import BufferedFileWriter, open_output, set_write_mode, get_write_mode
+
+
+class TestWriteTools(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'out.txt')
+
+    def test_buffered_write(self):
+        """
+        Test writing with a buffer smaller than the output
+        """
+        lines = ['line {0}\n'.format(i) for i in range(1000)]
+
+        with BufferedFileWriter(self.path, buffer_size=64) as openFile:
+            openFile.write('HEADER\n')
+            openFile.writelines(lines)
+
+        with open(self.path) as f:
+            contents = f.read()
+
+        # Tests
+        self.assertEqual(contents, 'HEADER\n' + ''.join(lines))
+        self.assertEqual(openFile.bytes_written, len(contents))
+        self.assertGreaterEqual(openFile.elapsed, 0)
+        self.assertEqual(openFile.name, self.path)
+
+    def test_atomic_write_failure(self):
+        """
+        Test that a failed atomic write leaves the existing file untouched
+        """
+        with open(self.path, 'w') as f:
+            f.write('original\n')
+
+        set_write_mode('atomic')
+
+        try:
+            with open_output(self.path) as openFile:
+                openFile.write('partial\n')
+                openFile.flush()
+                raise RuntimeError('failed')
+        except RuntimeError:
+            pass
+
+        with open(self.path) as f:
+            contents = f.read()
+
+        # Tests
+        self.assertEqual(get_write_mode(), 'atomic')
+        self.assertEqual(contents, 'original\n')
+        self.assertEqual(os.listdir(self.directory), ['out.txt'])
+
+        with open_output(self.path) as openFile:
+            openFile.write('replaced\n')
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'replaced\n')
+
+        self.assertEqual(os.listdir(self.directory), ['out.txt'])
+
+    def test_invalid_mode(self):
+        """
+        Test selecting an invalid write mode
+        """
+        # Tests
+        self.assertRaises(ValueError, set_write_mode, 'buffered')
+        self.assertEqual(get_write_mode(), 'direct')
+
+    def tearDown(self):
+        set_write_mode('direct')
+        shutil.rmtree(self.directory)
+
+
+if __name__ == '__main__':
+    unittest.main()